@@ -6,7 +6,7 @@ import pages.pronunciation as pronunciation
 import pages.vocabulary as vocabulary
 import pages.grammar as grammar
 import pages.progress as progress_page
-from utils.database import init_db, get_user_stats
+from utils.database import init_db, get_user_stats, get_or_create_user
 from components.header import render_header
 from components.sidebar import render_sidebar
 import time
@@ -83,28 +83,23 @@ st.markdown("""
 def init_session_state():
     if 'page' not in st.session_state:
         st.session_state.page = "Dashboard"
-    if 'user_stats' not in st.session_state:
-        st.session_state.user_stats = {
-            'streak': 7,
-            'points': 1250,
-            'practice_time': 45,
-            'vocabulary': 42,
-            'level': 'B1 Intermediate'
-        }
     if 'conversation_history' not in st.session_state:
         st.session_state.conversation_history = []
-    if 'vocabulary_list' not in st.session_state:
-        st.session_state.vocabulary_list = []
     if 'username' not in st.session_state:
         st.session_state.username = "Student"
+    if 'user_id' not in st.session_state:
+        st.session_state.user_id = get_or_create_user(st.session_state.username)
+    
+    # User stats are cached in utils.database, so refreshing every rerun is cheap
+    st.session_state.user_stats = get_user_stats(st.session_state.user_id)
 
 # Main app
 def main():
-    init_session_state()
-    
-    # Initialize database
+    # Initialize database (migrations run once per process)
     init_db()
     
+    init_session_state()
+    
     # Render header
     render_header()
     
@@ -0,0 +1 @@
+"""Reproducible benchmarks for the performance work (run from the repo root with python -m benchmarks.<name>)"""
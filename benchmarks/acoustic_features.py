@@ -0,0 +1,89 @@
+"""Time to analyze a recording against its own length.
+
+Generates a seeded speech-like clip (a harmonic voice with intonation,
+syllable-rate loudness and pauses, plus background noise), times
+analyze_pcm on it and reports the real-time factor. Also prints what the
+analysis found, next to what the clip was built with, and checks that the
+frames are views of the PCM buffer. Exits non-zero if analysis is not at
+least --min-speedup times faster than real time or the frames are copies.
+
+Examples:
+    python -m benchmarks.acoustic_features
+    python -m benchmarks.acoustic_features --seconds 30 --runs 50
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from utils.acoustic_features import FRAME_MS, HOP_MS, analyze_pcm, as_samples, frame_signal
+
+SAMPLE_RATE = 16000
+TEXT = "The quick brown fox jumps over the lazy dog near the river bank today"
+
+
+def voice(seconds, f0=150.0, syllable_rate=4.0, glide=0.15):
+    """Five harmonics on a slow pitch glide, loudness pulsing at the syllable rate"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    frequency = f0 * (1 + glide * np.sin(2 * np.pi * 0.5 * t))
+    phase = 2 * np.pi * np.cumsum(frequency) / SAMPLE_RATE
+    tone = sum(np.sin(k * phase) / k for k in range(1, 6))
+    return tone * (0.25 + 0.75 * np.abs(np.sin(np.pi * syllable_rate * t)))
+
+
+def make_clip(seconds, seed=0):
+    """Speech in three phrases separated by pauses, ~0.5 s of silence at each end, as PCM bytes"""
+    rng = np.random.default_rng(seed)
+    speech = seconds - 2.0
+    parts = [np.zeros(int(0.5 * SAMPLE_RATE))]
+    for i, share in enumerate((0.35, 0.35, 0.3)):
+        if i:
+            parts.append(np.zeros(int(0.5 * SAMPLE_RATE)))
+        parts.append(voice(speech * share))
+    parts.append(np.zeros(int(seconds * SAMPLE_RATE) - sum(len(p) for p in parts)))
+    signal = np.concatenate(parts)
+    signal = signal / np.abs(signal).max() * 12000 + rng.normal(0, 80, signal.size)
+    return signal.astype('<i2').tobytes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--min-speedup', type=float, default=20.0,
+                        help='fail unless analysis runs at least this many times faster than real time')
+    args = parser.parse_args(argv)
+
+    pcm = make_clip(args.seconds)
+    analyze_pcm(pcm, SAMPLE_RATE, text=TEXT)  # warm up NumPy's FFT plans
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = analyze_pcm(pcm, SAMPLE_RATE, text=TEXT)
+        timings.append(time.perf_counter() - started)
+
+    median = statistics.median(timings)
+    speedup = args.seconds / median
+    print(f"{args.seconds:.0f} s clip: median {median * 1000:.1f} ms, min {min(timings) * 1000:.1f} ms "
+          f"over {args.runs} runs -> {speedup:.0f}x real time")
+    print(f"speaking rate {result['speaking_rate']} syllables/s (built with 4.0), "
+          f"pauses {result['pause_count']} (built with 2), mean pitch {result['mean_pitch']} Hz "
+          f"(150 Hz glide), SNR {result['snr_db']} dB")
+    samples = as_samples(pcm)
+    frames = frame_signal(samples, SAMPLE_RATE * FRAME_MS // 1000, SAMPLE_RATE * HOP_MS // 1000)
+    shared = np.shares_memory(samples, frames)
+    print(f"frames share memory with the PCM buffer: {shared}")
+
+    failures = []
+    if speedup < args.min_speedup:
+        failures.append(f"{speedup:.0f}x real time, expected at least {args.min_speedup:.0f}x")
+    if not shared:
+        failures.append("frames are copies of the PCM buffer")
+    if failures:
+        raise SystemExit("FAILED: " + "; ".join(failures))
+    print("All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Time, disk and memory cost of the text-to-speech pipeline.
+
+Synthesizes clips with the offline tone engine (no network) through the old
+write-to-NamedTemporaryFile-and-read-back path and through the in-memory
+pipeline (text_to_speech -> get_audio_html), and reports time per clip, the
+temp files each path leaves behind and traced Python memory. Exits non-zero
+if traced memory grows over the run; the temp-file and sweeper checks are
+in tests/test_audio_files.py.
+
+Examples:
+    python -m benchmarks.audio_memory
+    python -m benchmarks.audio_memory --clips 5000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+SCRATCH = tempfile.mkdtemp(prefix='bench-audio-')
+# Read by utils.speech_utils at import
+os.environ['AUDIO_TEMP_DIR'] = os.path.join(SCRATCH, 'swept')
+
+from utils import speech_utils  # noqa: E402
+from utils.audio_cache import AudioCache  # noqa: E402
+
+
+def legacy_clip(handler, text):
+    """The pre-fix path: every clip written to a temp file that is never deleted, then read back"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as fp:
+        fp.write(handler.synthesize(text))
+    return handler.get_audio_html(fp.name)
+
+
+def run_clips(label, clips, make_clip):
+    """Render clips, reporting time per clip, new temp files and traced memory"""
+    temp_dir = tempfile.gettempdir()
+    before = set(os.listdir(temp_dir))
+    # Timed on its own: tracing slows allocation-heavy code down
+    started = time.perf_counter()
+    for i in range(clips):
+        make_clip(f"practice phrase number {i % 50}")
+    per_clip = (time.perf_counter() - started) / clips
+    tracemalloc.start()
+    for i in range(clips):
+        make_clip(f"practice phrase number {i % 50}")
+        if i == clips // 10:
+            warm, _ = tracemalloc.get_traced_memory()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    created = set(os.listdir(temp_dir)) - before
+    size = sum(os.path.getsize(os.path.join(temp_dir, name)) for name in created)
+    print(f"{label:10} {per_clip * 1000:6.3f} ms/clip  new temp files {len(created):5} ({size / 1e6:6.1f} MB)  "
+          f"traced KB after 10%/end/peak {warm // 1024}/{current // 1024}/{peak // 1024}")
+    return created, current - warm
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clips', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    handler = speech_utils.SpeechHandler(audio_cache=AudioCache(os.path.join(SCRATCH, 'cache')), tts_engine='tone')
+    failures = []
+    try:
+        leaked, _ = run_clips('legacy', args.clips, lambda text: legacy_clip(handler, text))
+        for name in leaked:
+            os.remove(os.path.join(tempfile.gettempdir(), name))
+
+        _, growth = run_clips('in-memory', args.clips, lambda text: handler.get_audio_html(
+            handler.text_to_speech(text, use_cache=False)))
+        if growth > 256 * 1024:
+            failures.append(f"traced memory grew by {growth // 1024} KB over the run")
+    finally:
+        shutil.rmtree(SCRATCH, ignore_errors=True)
+
+    if failures:
+        raise SystemExit("FAILED: " + "; ".join(failures))
+    print("All checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Cold-start cost of the assessment layer, each step in a fresh interpreter.
+
+Measures, as the median of several new processes:
+- import nltk on its own (what Assessment() used to pay up front)
+- import utils.assessment + Assessment()
+- the first tokenization with NLTK punkt (if installed) and with TOKENIZER=regex
+- the first assess_all(), which also loads the vocabulary lexicon (NumPy)
+
+Examples:
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+STEPS = {
+    'import nltk': ('', 'import nltk', {}),
+    'import utils.assessment + Assessment()': (
+        '', 'from utils.assessment import Assessment; Assessment()', {}),
+    'first analyze_text (NLTK if available)': (
+        'from utils.text_analysis import analyze_text',
+        'analyze_text("I goes to school every day. She have a apple.")', {}),
+    'first analyze_text (TOKENIZER=regex)': (
+        'from utils.text_analysis import analyze_text',
+        'analyze_text("I goes to school every day. She have a apple.")', {'TOKENIZER': 'regex'}),
+    'first assess_all (TOKENIZER=regex)': (
+        'from utils.assessment import Assessment; a = Assessment()',
+        'a.assess_all("I goes to school every day. She have a apple.")', {'TOKENIZER': 'regex'}),
+}
+
+TIMER = '''
+import time
+{setup}
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started)
+'''
+
+
+def time_in_fresh_process(setup, statement, env):
+    """Seconds `statement` takes after `setup` in a new interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-c', TIMER.format(setup=setup, statement=statement)],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, 'NLTK_AUTO_DOWNLOAD': '0', **env},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for name, (setup, statement, env) in STEPS.items():
+        try:
+            times = [time_in_fresh_process(setup, statement, env) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:42} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{name:42} {statistics.median(times) * 1000:7.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
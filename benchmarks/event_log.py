@@ -0,0 +1,114 @@
+"""Throughput of the batched event log against one write per event.
+
+Appends events to a scratch database one transaction at a time (what an
+inline write on the rerun path costs), then through EventLog, and reports
+events/s and the latency of record() itself. Also checks that events queued
+by a process that exits straight away are flushed at exit, and that the
+events table rejects updates and deletes. Exits non-zero if a check fails.
+
+Examples:
+    python -m benchmarks.event_log
+    python -m benchmarks.event_log --events 100000
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from utils import database
+from utils.events import EventLog
+
+EXIT_SCRIPT = '''
+from utils import database
+database.set_database_path({path!r})
+from utils.events import record_event
+for i in range({count}):
+    record_event(1, 'exercise', {{'i': i}})
+'''
+
+
+def sync_writes(user_ids, count):
+    """Seconds per event with one append_events transaction each"""
+    started = time.perf_counter()
+    for i in range(count):
+        database.append_events([(user_ids[i % len(user_ids)], 'quiz', None, 5, datetime.now(timezone.utc))])
+    return (time.perf_counter() - started) / count
+
+
+def batched_writes(user_ids, count):
+    """record() latencies, total seconds until written, and the log's stats"""
+    log = EventLog()
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        before = time.perf_counter()
+        log.record(user_ids[i % len(user_ids)], 'quiz', {'q': i}, points=5)
+        latencies.append(time.perf_counter() - before)
+    log.flush()
+    total = time.perf_counter() - started
+    log.close()
+    return sorted(latencies), total, log.stats
+
+
+def count_events(kind):
+    with database.get_connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM events WHERE kind = ?', (kind,)).fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--sync-events', type=int, default=2000)
+    parser.add_argument('--exit-events', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix='bench-events-')
+    path = os.path.join(scratch, 'bench.db')
+    failures = []
+    try:
+        database.set_database_path(path)
+        database.init_db()
+        user_ids = [database.get_or_create_user(f'user{i}') for i in range(10)]
+
+        per_event = sync_writes(user_ids, args.sync_events)
+        print(f"one transaction per event: {per_event * 1000:.3f} ms/event, {1 / per_event:,.0f} events/s")
+
+        latencies, total, stats = batched_writes(user_ids, args.events)
+        p50, p99 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+        print(f"EventLog.record():         p50 {p50 * 1e6:.1f} us, p99 {p99 * 1e6:.1f} us")
+        print(f"EventLog batched writes:   {stats['written']:,} events in {total:.2f} s "
+              f"({stats['written'] / total:,.0f} events/s, {stats['batches']} batches)")
+        if count_events('quiz') != args.sync_events + args.events:
+            failures.append('batched events missing from the table')
+
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        subprocess.run([sys.executable, '-c', EXIT_SCRIPT.format(path=path, count=args.exit_events)],
+                       check=True, env=env)
+        flushed = count_events('exercise')
+        print(f"flushed at exit:           {flushed}/{args.exit_events} events")
+        if flushed != args.exit_events:
+            failures.append('events lost at interpreter exit')
+
+        for statement in ('UPDATE events SET points = 0', 'DELETE FROM events'):
+            try:
+                with database.transaction() as conn:
+                    conn.execute(statement)
+                failures.append(f'{statement.split()[0]} allowed on events')
+            except sqlite3.DatabaseError as e:
+                print(f"{statement.split()[0]:26} blocked ({e})")
+    finally:
+        database.close_connections()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if failures:
+        raise SystemExit("FAILED: " + "; ".join(failures))
+    print("All checks passed")
+
+
+if __name__ == '__main__':
+    main()
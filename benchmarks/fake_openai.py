@@ -0,0 +1,122 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers POST /chat/completions after a configurable "think" time, either as
+one JSON body or, for stream=true, as server-sent-event deltas spaced
+`interval` seconds apart. Point the app at it with OPENAI_BASE_URL to try
+streaming without a key or network access.
+
+For tests, `serve()` also takes a list of error statuses to answer with
+before succeeding and a `reply` function building the content from the
+request body; the server counts requests and the most it saw in flight.
+
+Examples:
+    python -m benchmarks.fake_openai --port 8765
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_DELTAS = ['Hello', ' there', ', student', '! How', ' was', ' your', ' day?']
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+    def do_POST(self):
+        if self.path.rstrip('/').split('/')[-1] != 'completions':
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failure = server.failures.pop(0) if server.failures else None
+        try:
+            time.sleep(server.think_time)
+            self._respond(body, failure)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _respond(self, body, failure):
+        server = self.server
+        if failure:
+            headers = [('Retry-After', str(server.retry_after))] if server.retry_after is not None else []
+            self._send_json(failure, {'error': {'message': f'fake error {failure}'}}, headers)
+            return
+
+        if not body.get('stream'):
+            content = server.reply(body) if server.reply else ''.join(server.deltas)
+            self._send_json(200, {'choices': [{'message': {'role': 'assistant', 'content': content}}]})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i, delta in enumerate(server.deltas):
+            if i:
+                time.sleep(server.interval)
+            self._send_chunk('data: ' + json.dumps({'choices': [{'delta': {'content': delta}}]}) + '\n\n')
+        self._send_chunk('data: [DONE]\n\n')
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+
+def serve(port=0, think_time=0.3, interval=0.05, deltas=DEFAULT_DELTAS, failures=(), retry_after=None,
+          reply=None):
+    """Start the fake API on a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.think_time = think_time
+    server.interval = interval
+    server.deltas = list(deltas)
+    server.failures = list(failures)
+    server.retry_after = retry_after
+    server.reply = reply
+    server.lock = threading.Lock()
+    server.requests = server.in_flight = server.max_in_flight = 0
+    threading.Thread(target=server.serve_forever, name='fake-openai', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--think-time', type=float, default=0.3, help='seconds before the first delta')
+    parser.add_argument('--interval', type=float, default=0.05, help='seconds between deltas')
+    args = parser.parse_args(argv)
+    server, url = serve(args.port, args.think_time, args.interval)
+    print(f"Fake OpenAI API on {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
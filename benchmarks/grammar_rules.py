@@ -0,0 +1,96 @@
+"""Single-pass RuleEngine vs running each grammar rule separately.
+
+Generates a seeded corpus of essays (clean ones, and ones with the mistakes
+the rules look for mixed in), then times, per corpus:
+- per-rule re.search: the pre-engine assess_grammar loop, first hit only
+- per-rule finditer: every hit of every rule, one scan per rule
+- RuleEngine.scan: every hit of every rule in one pass
+It also checks that the engine reports exactly the per-rule hits.
+
+Examples:
+    python -m benchmarks.grammar_rules
+    python -m benchmarks.grammar_rules --essays 1000 --words 800
+"""
+import argparse
+import random
+import re
+import time
+
+from utils.grammar_rules import DEFAULT_ENGINE
+
+VOCABULARY = (
+    "the student wrote one long essay about travel and learning new languages while living abroad "
+    "teachers often say that practice every day makes reading and speaking much easier for everyone "
+    "we visited an old museum where history felt alive and the guide explained each painting slowly"
+).split()
+MISTAKES = ["i think", "they is", "a apple", "dont", "cant", "their", "there", "your", "you're", "we was"]
+
+
+def make_corpus(essays, words, with_errors, seed=0):
+    """Essays of `words` words, optionally with roughly one mistake per 25 words"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(essays):
+        tokens = [rng.choice(VOCABULARY) for _ in range(words)]
+        if with_errors:
+            for i in rng.sample(range(words), words // 25):
+                tokens[i] = rng.choice(MISTAKES)
+        sentences = [' '.join(tokens[i:i + 12]).capitalize() + '.' for i in range(0, len(tokens), 12)]
+        corpus.append(' '.join(sentences))
+    return corpus
+
+
+def per_rule_search(text, rules):
+    return [rule.message for rule in rules
+            if re.search(rule.pattern, text, re.IGNORECASE if rule.ignore_case else 0)]
+
+
+def per_rule_finditer(text, rules):
+    hits = []
+    for index, rule in enumerate(rules):
+        # Zero-width lookahead so overlapping matches are reported, as the engine does
+        lookahead = '(?=(' + rule.pattern + '))'
+        for m in re.finditer(lookahead, text, re.IGNORECASE if rule.ignore_case else 0):
+            hits.append((m.start(), index, m.end(1)))
+    return hits
+
+
+def best_of(runs, fn, corpus):
+    best = float('inf')
+    for _ in range(runs):
+        started = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--essays', type=int, default=200)
+    parser.add_argument('--words', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rules = DEFAULT_ENGINE.rules
+    rule_index = {rule.id: index for index, rule in enumerate(rules)}
+    print(f"{len(rules)} rules, {args.essays} essays of {args.words} words (best of {args.runs})")
+    print(f"{'corpus':12} {'re.search':>11} {'finditer':>11} {'engine':>11}  hits")
+    for label, with_errors in (('clean', False), ('with errors', True)):
+        corpus = make_corpus(args.essays, args.words, with_errors)
+        search = best_of(args.runs, lambda text: per_rule_search(text, rules), corpus)
+        finditer = best_of(args.runs, lambda text: per_rule_finditer(text, rules), corpus)
+        engine = best_of(args.runs, DEFAULT_ENGINE.scan, corpus)
+
+        total = 0
+        for text in corpus:
+            hits = sorted((h['start'], rule_index[h['rule']], h['end']) for h in DEFAULT_ENGINE.scan(text))
+            if hits != sorted(per_rule_finditer(text, rules)):
+                raise SystemExit(f"Engine hits differ from per-rule hits in: {text[:80]}...")
+            total += len(hits)
+        print(f"{label:12} {search:9.1f}ms {finditer:9.1f}ms {engine:9.1f}ms  {total}")
+    print("Engine hits match the per-rule hits")
+
+
+if __name__ == '__main__':
+    main()
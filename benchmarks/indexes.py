@@ -0,0 +1,106 @@
+"""Query latency on the main tables before and after the migration 3 indexes.
+
+Fills a scratch database with users x days rows in progress, conversations
+and vocabulary (1M rows each by default) using the schema of migrations 1-2,
+times the hot queries, then applies migration 3 and times them again.
+
+Examples:
+    python -m benchmarks.indexes
+    python -m benchmarks.indexes --users 100 --days 100
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+from utils import database
+
+QUERIES = {
+    'progress by (user, date)': (
+        'SELECT SUM(practice_minutes) FROM progress WHERE user_id = ? AND date = ?', 'day'),
+    'progress 90-day range': (
+        'SELECT date, practice_minutes FROM progress WHERE user_id = ? AND date BETWEEN ? AND ?', 'range'),
+    'conversations latest 20': (
+        'SELECT * FROM conversations WHERE user_id = ? ORDER BY timestamp DESC LIMIT 20', None),
+    'vocabulary by (user, word)': (
+        'SELECT id FROM vocabulary WHERE user_id = ? AND word = ?', 'word'),
+}
+
+
+def fill(users, days):
+    """Insert users x days rows into progress, conversations and vocabulary"""
+    start = date(2022, 1, 1)
+    with database.transaction() as conn:
+        conn.executemany('INSERT INTO users (id, username) VALUES (?, ?)',
+                         ((u, f'user{u}') for u in range(1, users + 1)))
+        conn.executemany('''
+            INSERT INTO progress (user_id, date, practice_minutes, new_words, accuracy)
+            VALUES (?, ?, 10, 1, 80.0)
+        ''', ((u, str(start + timedelta(days=d))) for d in range(days) for u in range(1, users + 1)))
+        conn.executemany('''
+            INSERT INTO conversations (user_id, topic, user_input, ai_response, timestamp)
+            VALUES (?, 'Travel', 'hello', 'hi there', ?)
+        ''', ((u, f'{start + timedelta(days=d)} 10:00:00') for d in range(days) for u in range(1, users + 1)))
+        conn.executemany("INSERT INTO vocabulary (user_id, word, meaning) VALUES (?, ?, 'meaning')",
+                         ((u, f'word{d}') for d in range(days) for u in range(1, users + 1)))
+    return start
+
+
+def time_queries(users, days, start, runs):
+    """Mean latency in ms per query, for a user in the middle of the table"""
+    user_id = users // 2 or 1
+    middle = start + timedelta(days=days // 2)
+    params = {
+        'day': (user_id, str(middle)),
+        'range': (user_id, str(middle), str(middle + timedelta(days=89))),
+        'word': (user_id, f'word{days // 2}'),
+        None: (user_id,),
+    }
+    timings = {}
+    with database.get_connection() as conn:
+        for name, (query, kind) in QUERIES.items():
+            conn.execute(query, params[kind]).fetchall()  # warm the page cache
+            started = time.perf_counter()
+            for _ in range(runs):
+                conn.execute(query, params[kind]).fetchall()
+            timings[name] = (time.perf_counter() - started) / runs * 1000
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix='bench-indexes-')
+    path = os.path.join(scratch, 'bench.db')
+    migrations = database.MIGRATIONS
+    try:
+        # Schema as it was before the indexes
+        database.MIGRATIONS = [m for m in migrations if m[0] < 3]
+        database.set_database_path(path)
+        database.init_db()
+        print(f"Filling {args.users * args.days:,} rows per table...")
+        start = fill(args.users, args.days)
+        before = time_queries(args.users, args.days, start, args.runs)
+
+        database.MIGRATIONS = [m for m in migrations if m[0] <= 3]
+        with database.get_connection() as conn:
+            database.migrate(conn)
+        after = time_queries(args.users, args.days, start, args.runs)
+    finally:
+        database.MIGRATIONS = migrations
+        database.close_connections()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"{'query':30} {'before':>10} {'after':>10}")
+    for name in QUERIES:
+        print(f"{name:30} {before[name]:8.3f}ms {after[name]:8.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Time-to-first-token vs full-response latency for streamed conversation replies.
+
+Starts the fake API from benchmarks.fake_openai and runs
+AIHandler.stream_conversation_response() against it with the response
+cache off, reporting what the student waits for before text appears
+(first delta) and before the reply is complete.
+
+Examples:
+    python -m benchmarks.streaming
+    python -m benchmarks.streaming --think-time 0.8 --interval 0.1 --runs 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+
+from benchmarks.fake_openai import serve
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--think-time', type=float, default=0.3, help='server seconds before the first delta')
+    parser.add_argument('--interval', type=float, default=0.05, help='server seconds between deltas')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    server, url = serve(think_time=args.think_time, interval=args.interval)
+    # The client is configured from the environment on first use
+    os.environ['OPENAI_API_KEY'] = 'benchmark'
+    os.environ['OPENAI_BASE_URL'] = url
+    # Keep the benchmark's replies out of the app's response cache
+    os.environ['RESPONSE_CACHE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='bench-streaming-'), 'cache.db')
+    from utils.ai_handler import AIHandler
+
+    handler = AIHandler()
+    first, total = [], []
+    for i in range(args.runs):
+        reply = ''.join(handler.stream_conversation_response(f"Tell me about your day ({i})", use_cache=False))
+        first.append(handler.last_timing['time_to_first_token'])
+        total.append(handler.last_timing['total'])
+    server.shutdown()
+
+    print(f"Reply: {reply!r} ({len(server.deltas)} deltas)")
+    print(f"{'':22} {'median':>8} {'min':>8} {'max':>8}")
+    for name, values in (('time to first token', first), ('full response', total)):
+        print(f"{name:22} {statistics.median(values) * 1000:6.0f}ms {min(values) * 1000:6.0f}ms "
+              f"{max(values) * 1000:6.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,82 @@
+import json
 import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+import threading
+import time
+from collections import OrderedDict
 
-def create_activity_chart():
-    """Create weekly activity chart"""
-    data = pd.DataFrame({
-        'Day': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
-        'Speaking': [25, 30, 20, 35, 40, 25, 30],
-        'Listening': [15, 20, 25, 15, 20, 30, 25],
-        'Vocabulary': [10, 15, 10, 20, 15, 10, 15],
-        'Grammar': [5, 10, 15, 10, 5, 20, 10]
-    })
+FIGURE_CACHE_SIZE = 128
+
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+# Chart type -> build/hit counts and total seconds, for chart_timing_report()
+chart_timings = {}
+
+def _record_timing(chart_type, kind, seconds):
+    with _figures_lock:
+        timing = chart_timings.setdefault(chart_type, {'builds': 0, 'build_s': 0.0, 'hits': 0, 'hit_s': 0.0})
+        timing[kind + 's'] += 1
+        timing[kind + '_s'] += seconds
+
+def cached_figure(chart_type, user_id, data_version, build, *args, **kwargs):
+    """Return build(*args, **kwargs), reused until the user's data version changes.
+
+    The figure is cached as its JSON, and every call gets a new Figure built
+    from it, so callers may modify what they get back.
+    """
+    key = (chart_type, user_id, data_version)
+    start = time.perf_counter()
+    with _figures_lock:
+        spec = _figures.get(key)
+        if spec is not None:
+            _figures.move_to_end(key)
+    if spec is None:
+        spec = build(*args, **kwargs).to_json()
+        kind = 'build'
+        with _figures_lock:
+            _figures[key] = spec
+            while len(_figures) > FIGURE_CACHE_SIZE:
+                _figures.popitem(last=False)
+    else:
+        kind = 'hit'
+    # The spec came from a validated figure, so skip validating it again
+    # (plotly.io.from_json would, at ~10x the cost)
+    fig = go.Figure(json.loads(spec), _validate=False)
+    _record_timing(chart_type, kind, time.perf_counter() - start)
+    return fig
+
+def invalidate_figures(user_id=None):
+    """Drop cached figures for one user (or everyone)"""
+    with _figures_lock:
+        for key in [k for k in _figures if user_id is None or k[1] == user_id]:
+            del _figures[key]
+
+def chart_timing_report():
+    """Average milliseconds per chart for a fresh build and for a cache hit"""
+    with _figures_lock:
+        return [{
+            'chart': chart_type,
+            'builds': t['builds'],
+            'build_ms': round(1000 * t['build_s'] / t['builds'], 2) if t['builds'] else None,
+            'hits': t['hits'],
+            'hit_ms': round(1000 * t['hit_s'] / t['hits'], 3) if t['hits'] else None,
+        } for chart_type, t in chart_timings.items()]
+
+def create_activity_chart(data):
+    """Create daily activity chart from chart_data.activity() arrays"""
+    days = [str(d) for d in data['date']]
+    labels = [f"{d.astype(object):%a}" for d in data['date']]
     
     fig = go.Figure(data=[
-        go.Bar(name='Speaking', x=data['Day'], y=data['Speaking'], marker_color='#667eea'),
-        go.Bar(name='Listening', x=data['Day'], y=data['Listening'], marker_color='#4facfe'),
-        go.Bar(name='Vocabulary', x=data['Day'], y=data['Vocabulary'], marker_color='#43e97b'),
-        go.Bar(name='Grammar', x=data['Day'], y=data['Grammar'], marker_color='#fa709a')
+        go.Bar(name='Practice (min)', x=days, y=data['practice_minutes'], marker_color='#667eea'),
+        go.Bar(name='Conversations', x=days, y=data['conversations'], marker_color='#4facfe'),
+        go.Bar(name='New Words', x=days, y=data['new_words'], marker_color='#43e97b')
     ])
     
     fig.update_layout(
-        barmode='stack',
+        barmode='group',
         height=300,
         margin=dict(l=10, r=10, t=30, b=10),
+        xaxis=dict(tickmode='array', tickvals=days, ticktext=labels),
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     
@@ -54,18 +108,60 @@ def create_skill_radar():
     
     return fig
 
-def create_progress_timeline():
-    """Create progress timeline"""
-    data = pd.DataFrame({
-        'Date': pd.date_range('2024-01-01', periods=30, freq='D'),
-        'Score': [50 + i*2 + (i%3)*5 for i in range(30)]
-    })
+def create_progress_timeline(data):
+    """Create progress timeline from chart_data.activity() arrays"""
+    fig = go.Figure(go.Scatter(
+        x=data['date'], y=data['accuracy'],
+        mode='lines',
+        line=dict(color='#667eea', width=3, shape='spline'),
+        connectgaps=True
+    ))
     
-    fig = px.line(data, x='Date', y='Score', 
-                  title="Daily Assessment Scores",
-                  line_shape='spline')
+    fig.update_layout(title="Daily Assessment Scores", yaxis_title='Score',
+                      height=250, margin=dict(l=10, r=10, t=30, b=10))
     
-    fig.update_traces(line_color='#667eea', line_width=3)
-    fig.update_layout(height=250, margin=dict(l=10, r=10, t=30, b=10))
+    return fig
+
+def create_waveform_chart(view):
+    """Create waveform envelope chart with the pitch contour overlaid"""
+    fig = go.Figure()
+    
+    # Envelope: the max line, then the min line filled up to it
+    fig.add_trace(go.Scatter(
+        x=view['time'], y=view['high'],
+        mode='lines',
+        line=dict(color='#667eea', width=1),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+    fig.add_trace(go.Scatter(
+        x=view['time'], y=view['low'],
+        mode='lines',
+        fill='tonexty',
+        fillcolor='rgba(102, 126, 234, 0.35)',
+        line=dict(color='#667eea', width=1),
+        name='Waveform'
+    ))
+    
+    if len(view['pitch']):
+        fig.add_trace(go.Scatter(
+            x=view['pitch_time'], y=view['pitch'],
+            mode='lines',
+            line=dict(color='#fa709a', width=2),
+            connectgaps=False,
+            name='Pitch (Hz)',
+            yaxis='y2'
+        ))
     
-    return fig
\ No newline at end of file
+    fig.update_layout(
+        height=220,
+        margin=dict(l=10, r=10, t=10, b=10),
+        xaxis=dict(showgrid=False, title='Seconds', range=[0, view['duration']]),
+        yaxis=dict(showgrid=False, showticklabels=False, range=[-1, 1]),
+        yaxis2=dict(overlaying='y', side='right', showgrid=False, title='Hz', rangemode='tozero'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    return fig
@@ -1,5 +1,5 @@
 import streamlit as st
-import datetime
+from utils.database import user_today
 
 def render_header():
     col1, col2, col3 = st.columns([3, 2, 1])
@@ -11,7 +11,7 @@ def render_header():
         """, unsafe_allow_html=True)
     
     with col2:
-        today = datetime.datetime.now().strftime("%A, %B %d")
+        today = user_today(st.session_state.get('user_id', 1)).strftime("%A, %B %d")
         st.markdown(f"""
         <div style='text-align: center; padding: 10px; background: #f8f9fa; border-radius: 10px;'>
             <p style='margin: 0; color: #667eea; font-weight: bold;'>{today}</p>
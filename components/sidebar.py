@@ -52,7 +52,7 @@ def render_sidebar():
     stats = [
         ("⏱️", "Practice Time", f"{st.session_state.user_stats['practice_time']} min"),
         ("📚", "Vocabulary", f"{st.session_state.user_stats['vocabulary']} words"),
-        ("💬", "Conversations", "12 sessions"),
+        ("💬", "Conversations", f"{st.session_state.user_stats['conversations']} sessions"),
         ("🎯", "Accuracy", "85%")
     ]
     
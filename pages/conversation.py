@@ -1,8 +1,9 @@
 import streamlit as st
-import time
 import random
 from datetime import datetime
 from components.cards import create_feature_card
+from utils.ai_handler import AIHandler
+from utils.events import record_conversation
 
 def render():
     st.markdown("## 💬 AI Conversation Practice")
@@ -44,6 +45,7 @@ def render():
         with col2:
             if st.button("🔁 Change Topic"):
                 del st.session_state.selected_topic
+                st.session_state.pop('chat_context', None)
                 st.rerun()
         
         # Role assignment
@@ -69,30 +71,20 @@ def render():
             st.session_state.messages = [
                 {"role": "ai", "content": f"Hello! I'll be your {role[1].split(': ')[1].lower()} today. How can I help you?", "time": "Now"}
             ]
+        if 'chat_context' not in st.session_state:
+            # Bounded prompt context: recent turns verbatim, older ones summarized
+            st.session_state.chat_context = get_ai_handler().new_conversation()
+            for msg in st.session_state.messages:
+                st.session_state.chat_context.add(msg['role'], msg['content'])
         
         # Display chat
         chat_container = st.container()
         with chat_container:
             for msg in st.session_state.messages:
                 if msg['role'] == 'user':
-                    st.markdown(f"""
-                    <div style='display: flex; justify-content: flex-end; margin: 10px 0;'>
-                        <div style='background: linear-gradient(45deg, #667eea, #764ba2); color: white; 
-                             padding: 12px 18px; border-radius: 18px 18px 4px 18px; max-width: 70%;'>
-                            {msg['content']}
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(user_bubble(msg['content']), unsafe_allow_html=True)
                 else:
-                    st.markdown(f"""
-                    <div style='display: flex; justify-content: flex-start; margin: 10px 0;'>
-                        <div style='background: #f0f2f6; color: #333; padding: 12px 18px; 
-                             border-radius: 18px 18px 18px 4px; max-width: 70%;'>
-                            {msg['content']}
-                            <div style='font-size: 0.8em; color: #666; margin-top: 5px;'>{msg['time']}</div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(ai_bubble(msg['content'], msg['time']), unsafe_allow_html=True)
         
         # Input area
         st.divider()
@@ -109,7 +101,10 @@ def render():
             if st.button("🎤 Speak", use_container_width=True, disabled=True):
                 st.info("Voice input coming soon!")
         
-        if user_input:
+        # Text inputs keep their value across reruns, so only answer new messages
+        if user_input and user_input != st.session_state.get('last_chat_input'):
+            st.session_state.last_chat_input = user_input
+            
             # Add user message
             st.session_state.messages.append({
                 "role": "user", 
@@ -117,15 +112,22 @@ def render():
                 "time": "Now"
             })
             
-            # Generate AI response
-            with st.spinner("AI is thinking..."):
-                time.sleep(1)  # Simulate thinking
-                ai_response = generate_ai_response(user_input, topic['name'])
-                st.session_state.messages.append({
-                    "role": "ai",
-                    "content": ai_response,
-                    "time": "Now"
-                })
+            # Stream the AI response into the chat as it is generated
+            with chat_container:
+                st.markdown(user_bubble(user_input), unsafe_allow_html=True)
+                placeholder = st.empty()
+            
+            ai_response = ""
+            for delta in stream_ai_response(user_input, topic['name'], role[1]):
+                ai_response += delta
+                placeholder.markdown(ai_bubble(ai_response, "Now"), unsafe_allow_html=True)
+            
+            st.session_state.messages.append({
+                "role": "ai",
+                "content": ai_response,
+                "time": "Now"
+            })
+            st.session_state.chat_context.add_turn(user_input, ai_response)
             
             # Add to conversation history
             st.session_state.conversation_history.append({
@@ -134,6 +136,9 @@ def render():
                 "ai_response": ai_response,
                 "timestamp": datetime.now()
             })
+            # Queued for the event log's writer thread, which stores the turn in the
+            # conversations table (stats, rollups, charts) off the rerun path
+            record_conversation(st.session_state.get('user_id', 1), topic['name'], user_input, ai_response)
             
             st.rerun()
         
@@ -165,8 +170,49 @@ def render():
                 st.session_state.messages = [
                     {"role": "ai", "content": f"Let's try a different scene. {random.choice(topic['scenes'])}", "time": "Now"}
                 ]
+                st.session_state.pop('chat_context', None)
                 st.rerun()
 
+def user_bubble(content):
+    """HTML for a student chat message"""
+    return f"""
+    <div style='display: flex; justify-content: flex-end; margin: 10px 0;'>
+        <div style='background: linear-gradient(45deg, #667eea, #764ba2); color: white; 
+             padding: 12px 18px; border-radius: 18px 18px 4px 18px; max-width: 70%;'>
+            {content}
+        </div>
+    </div>
+    """
+
+def ai_bubble(content, time_label):
+    """HTML for an AI chat message"""
+    return f"""
+    <div style='display: flex; justify-content: flex-start; margin: 10px 0;'>
+        <div style='background: #f0f2f6; color: #333; padding: 12px 18px; 
+             border-radius: 18px 18px 18px 4px; max-width: 70%;'>
+            {content}
+            <div style='font-size: 0.8em; color: #666; margin-top: 5px;'>{time_label}</div>
+        </div>
+    </div>
+    """
+
+@st.cache_resource
+def get_ai_handler():
+    """Shared AI handler (and its connection pool) for all sessions"""
+    return AIHandler()
+
+def stream_ai_response(user_input, topic, ai_role):
+    """Yield the AI response in pieces, falling back to canned replies offline"""
+    handler = get_ai_handler()
+    if not handler.api_key:
+        yield generate_ai_response(user_input, topic)
+        return
+    
+    context = f"Role play about {topic}. You are the {ai_role.split(': ')[1].lower()}."
+    yield from handler.stream_conversation_response(
+        user_input, context, conversation=st.session_state.get('chat_context')
+    )
+
 def generate_ai_response(user_input, topic):
     """Generate AI response based on topic"""
     responses = {
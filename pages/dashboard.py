@@ -2,7 +2,12 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from components.cards import create_feature_card, create_stats_card
-from components.charts import create_activity_chart, create_skill_radar, create_progress_timeline
+from components.charts import (create_activity_chart, create_skill_radar, create_progress_timeline,
+                               cached_figure, chart_timing_report)
+from utils.chart_data import activity
+from utils.database import get_data_version, user_today
+from datetime import timedelta
+import os
 import streamlit.components.v1 as components
 
 def render():
@@ -27,19 +32,28 @@ def render():
         st.markdown(create_stats_card("Vocabulary", "42 words", "+5", "📚", "#9C27B0"), 
                    unsafe_allow_html=True)
     
-    # Charts section
+    # Charts section (figures are rebuilt only when the user's data changes)
+    user_id = st.session_state.get('user_id', 1)
+    today = user_today(user_id)
+    # Ranges are relative to today, so a new day is a new version too
+    version = (get_data_version(user_id), today)
     col_left, col_right = st.columns([2, 1])
     
     with col_left:
         st.markdown("### 📈 Weekly Activity")
-        st.plotly_chart(create_activity_chart(), use_container_width=True)
+        fig = cached_figure('activity', user_id, version,
+                            lambda: create_activity_chart(activity(user_id, today - timedelta(days=6), today)))
+        st.plotly_chart(fig, use_container_width=True)
         
         st.markdown("### 📅 Progress Timeline")
-        st.plotly_chart(create_progress_timeline(), use_container_width=True)
+        fig = cached_figure('timeline', user_id, version,
+                            lambda: create_progress_timeline(activity(user_id, today - timedelta(days=29), today)))
+        st.plotly_chart(fig, use_container_width=True)
     
     with col_right:
         st.markdown("### 🎯 Skill Radar")
-        st.plotly_chart(create_skill_radar(), use_container_width=True)
+        st.plotly_chart(cached_figure('skill_radar', user_id, version, create_skill_radar),
+                        use_container_width=True)
         
         st.markdown("### 🏆 Recent Achievements")
         
@@ -110,4 +124,9 @@ def render():
         
         if st.button("Start Daily Challenge", type="primary", use_container_width=True):
             st.session_state.page = "Conversation"
-            st.rerun()
\ No newline at end of file
+            st.rerun()
+    
+    # Per-chart build vs cache-hit cost, for profiling dashboard reruns
+    if os.getenv('SHOW_CHART_TIMINGS', 'false').lower() in ('1', 'true', 'yes'):
+        with st.expander("⏱️ Chart timings"):
+            st.dataframe(pd.DataFrame(chart_timing_report()), use_container_width=True)
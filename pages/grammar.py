@@ -1,5 +1,11 @@
 import streamlit as st
 import random
+from utils.events import record_answer
+
+def log_answer(question, answer, correct, default=None):
+    """Log an exercise answer to the activity log once per change"""
+    record_answer(st.session_state.get('user_id'), 'exercise', question, answer, correct,
+                  st.session_state.setdefault('logged_answers', {}), default)
 
 def render():
     st.markdown("## 📝 Grammar Mastery")
@@ -174,6 +180,7 @@ def render_tenses_exercises():
             placeholder="Type the correct verb form"
         )
         user_answers.append(answer)
+        log_answer(ex['sentence'], answer.strip(), answer.lower() == ex['correct'].lower())
         
         if answer:
             if answer.lower() == ex['correct'].lower():
@@ -213,6 +220,7 @@ def render_tenses_exercises():
             q["options"],
             key=f"mc_tense_{i}"
         )
+        log_answer(q["question"], answer, q["options"].index(answer) == q["correct"], default=q["options"][0])
         
         if answer:
             if q["options"].index(answer) == q["correct"]:
@@ -249,6 +257,7 @@ def render_articles_exercises():
             placeholder="a/an/the or leave empty"
         )
         user_answers.append(answer)
+        log_answer(sentence, answer.strip(), answer.lower() == answers[i].lower())
         
         if answer:
             if answer.lower() == answers[i].lower() or (answer == "" and answers[i] == ""):
@@ -287,6 +296,7 @@ def render_articles_exercises():
             q["rules"],
             key=f"rule_{i}"
         )
+        log_answer(q["sentence"], answer, q["rules"].index(answer) == q["correct"], default=q["rules"][0])
         
         if answer:
             if q["rules"].index(answer) == q["correct"]:
@@ -316,6 +326,7 @@ def render_prepositions_exercises():
             ["Select..."] + options,
             key=f"time_prep_{i}"
         )
+        log_answer(sentence, answer, answer in options and options.index(answer) == correct, default="Select...")
         
         if answer != "Select...":
             if options.index(answer) == correct:
@@ -340,6 +351,7 @@ def render_prepositions_exercises():
             ["Select..."] + options,
             key=f"place_prep_{i}"
         )
+        log_answer(sentence, answer, answer in options and options.index(answer) == correct, default="Select...")
         
         if answer != "Select...":
             if options.index(answer) == correct:
@@ -367,6 +379,7 @@ def render_prepositions_exercises():
             ["Select..."] + options,
             key=f"mixed_prep_{i}"
         )
+        log_answer(sentence, answer, answer == correct_answer, default="Select...")
         
         if answer != "Select...":
             if answer == correct_answer:
@@ -2,8 +2,11 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime, timedelta
-import random
+import numpy as np
+from datetime import timedelta
+from components.charts import cached_figure
+from utils.chart_data import activity
+from utils.database import get_data_version, get_progress_totals, get_rollups, user_today
 
 def render():
     st.markdown("## 📈 Learning Progress")
@@ -23,24 +26,49 @@ def render():
 def render_overview():
     """Progress overview"""
     
-    # Summary stats
+    # Summary stats (all-time totals and this week, from the rollup tables)
+    user_id = st.session_state.get('user_id', 1)
+    totals = get_progress_totals(user_id)
+    this_week = get_rollups(user_id, 'week', start=user_today(user_id))
+    week = dict(this_week[-1]) if this_week else {'practice_minutes': 0, 'new_words': 0,
+                                                   'conversations': 0, 'accuracy': None}
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Practice", "45 hours", "+5 this week")
+        st.metric("Total Practice", f"{totals['practice_minutes'] / 60:.1f} hours",
+                  f"+{week['practice_minutes']} min this week")
     
     with col2:
-        st.metric("Words Learned", "156", "+12 this week")
+        st.metric("Words Learned", f"{totals['new_words']}", f"+{week['new_words']} this week")
     
     with col3:
-        st.metric("Conversations", "42", "+5 this week")
+        st.metric("Conversations", f"{totals['conversations']}", f"+{week['conversations']} this week")
     
     with col4:
-        st.metric("Accuracy", "85%", "+2%")
+        if totals['accuracy'] is None:
+            st.metric("Accuracy", "—")
+        elif week['accuracy'] is None:
+            st.metric("Accuracy", f"{totals['accuracy']:.0f}%")
+        else:
+            st.metric("Accuracy", f"{totals['accuracy']:.0f}%",
+                      f"{week['accuracy'] - totals['accuracy']:+.1f}% this week")
     
     # Skill radar chart
     st.markdown("### 🎯 Skill Assessment")
     
+    version = get_data_version(user_id)
+    st.plotly_chart(cached_figure('progress_skill_radar', user_id, version, build_skill_radar),
+                    use_container_width=True)
+    
+    # Detailed skill breakdown
+    st.markdown("### 📋 Skill Breakdown")
+    
+    st.plotly_chart(cached_figure('progress_skill_breakdown', user_id, version, build_skill_breakdown),
+                    use_container_width=True)
+
+def build_skill_radar():
+    """Skill assessment radar chart"""
     categories = ['Speaking', 'Listening', 'Vocabulary', 'Grammar', 'Pronunciation', 'Fluency']
     values = [85, 78, 92, 76, 82, 88]
     
@@ -66,11 +94,10 @@ def render_overview():
         margin=dict(l=20, r=20, t=40, b=20)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Detailed skill breakdown
-    st.markdown("### 📋 Skill Breakdown")
-    
+    return fig
+
+def build_skill_breakdown():
+    """Current vs target level bar chart"""
     skills_data = {
         'Skill': ['Speaking', 'Listening', 'Vocabulary', 'Grammar', 'Pronunciation', 'Fluency'],
         'Current': [85, 78, 92, 76, 82, 88],
@@ -90,25 +117,28 @@ def render_overview():
         margin=dict(l=20, r=20, t=40, b=20)
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 def render_timeline():
     """Progress timeline"""
     
-    # Generate sample timeline data
-    dates = pd.date_range(start='2024-01-01', end='2024-01-30', freq='D')
+    user_id = st.session_state.get('user_id', 1)
+    today = user_today(user_id)
+    date_range = st.date_input(
+        "Date range",
+        value=(today - timedelta(days=29), today),
+        max_value=today
+    )
+    start, end = date_range if len(date_range) == 2 else (date_range[0], date_range[0])
     
-    timeline_data = pd.DataFrame({
-        'Date': dates,
-        'Practice Minutes': [random.randint(15, 60) for _ in range(len(dates))],
-        'New Words': [random.randint(0, 5) for _ in range(len(dates))],
-        'Accuracy': [random.randint(70, 95) for _ in range(len(dates))]
-    })
+    # Daily totals for the range, aggregated in SQL
+    timeline_data = activity(user_id, start, end)
     
     # Practice time chart
     st.markdown("### ⏰ Practice Time")
     
-    fig = px.line(timeline_data, x='Date', y='Practice Minutes',
+    fig = px.line(x=timeline_data['date'], y=timeline_data['practice_minutes'],
+                  labels={'x': 'Date', 'y': 'Practice Minutes'},
                   title="Daily Practice Minutes",
                   markers=True)
     
@@ -120,7 +150,8 @@ def render_timeline():
     # New words chart
     st.markdown("### 📚 New Words Learned")
     
-    fig = px.bar(timeline_data, x='Date', y='New Words',
+    fig = px.bar(x=timeline_data['date'], y=timeline_data['new_words'],
+                 labels={'x': 'Date', 'y': 'New Words'},
                  title="Daily New Vocabulary Words")
     
     fig.update_traces(marker_color='#4CAF50')
@@ -131,11 +162,12 @@ def render_timeline():
     # Accuracy trend
     st.markdown("### 🎯 Accuracy Trend")
     
-    fig = px.line(timeline_data, x='Date', y='Accuracy',
+    fig = px.line(x=timeline_data['date'], y=timeline_data['accuracy'],
+                  labels={'x': 'Date', 'y': 'Accuracy'},
                   title="Daily Accuracy Percentage",
                   markers=True)
     
-    fig.update_traces(line_color='#FF9800', line_width=3)
+    fig.update_traces(line_color='#FF9800', line_width=3, connectgaps=True)
     fig.update_layout(height=300, margin=dict(l=20, r=20, t=40, b=20))
     
     st.plotly_chart(fig, use_container_width=True)
@@ -143,26 +175,20 @@ def render_timeline():
     # Weekly summary
     st.markdown("### 📅 Weekly Summary")
     
-    # Create weekly data
-    timeline_data['Week'] = timeline_data['Date'].dt.isocalendar().week
-    weekly_summary = timeline_data.groupby('Week').agg({
-        'Practice Minutes': 'sum',
-        'New Words': 'sum',
-        'Accuracy': 'mean'
-    }).reset_index()
-    
-    weekly_summary['Week'] = 'Week ' + weekly_summary['Week'].astype(str)
+    # Monday-based weeks, bucketed by the database
+    weekly_summary = activity(user_id, start, end, bucket='week')
+    weekly_accuracy = weekly_summary['accuracy'][-1]
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Weekly Practice", f"{weekly_summary['Practice Minutes'].iloc[-1]} min")
+        st.metric("Weekly Practice", f"{weekly_summary['practice_minutes'][-1]} min")
     
     with col2:
-        st.metric("Weekly Words", f"{weekly_summary['New Words'].iloc[-1]} words")
+        st.metric("Weekly Words", f"{weekly_summary['new_words'][-1]} words")
     
     with col3:
-        st.metric("Weekly Accuracy", f"{weekly_summary['Accuracy'].iloc[-1]:.1f}%")
+        st.metric("Weekly Accuracy", "—" if np.isnan(weekly_accuracy) else f"{weekly_accuracy:.1f}%")
 
 def render_achievements():
     """Achievements display"""
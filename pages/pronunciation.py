@@ -1,8 +1,85 @@
 import streamlit as st
-import plotly.graph_objects as go
-import numpy as np
+import hashlib
+import re
 import time
 from components.cards import create_feature_card
+from components.charts import create_waveform_chart
+from utils.acoustic_features import TARGET_RATE, analyze_pcm
+from utils.speech_engines import word_error_rate
+from utils.speech_utils import get_speech_handler
+from utils.waveform import waveform_view
+
+# Practice phrases by difficulty
+PHRASES = {
+    "Beginner": [
+        "Hello, how are you today?",
+        "I would like a cup of coffee.",
+        "Where is the nearest station?",
+        "Thank you very much for your help.",
+        "Could you repeat that, please?"
+    ],
+    "Intermediate": [
+        "The quick brown fox jumps over the lazy dog.",
+        "She sells seashells by the seashore.",
+        "Peter Piper picked a peck of pickled peppers.",
+        "How much wood would a woodchuck chuck?",
+        "Unique New York, New York's unique."
+    ],
+    "Advanced": [
+        "The sixth sick sheik's sixth sheep's sick.",
+        "Betty Botter bought some butter.",
+        "Fuzzy Wuzzy was a bear. Fuzzy Wuzzy had no hair.",
+        "I slit the sheet, the sheet I slit, and on the slitted sheet I sit.",
+        "Six thick thistle sticks."
+    ]
+}
+
+def analysis_metrics(analysis, phrase, transcript):
+    """Scores and feedback for the analysis panel from a recording's acoustic features"""
+    rate = analysis['speaking_rate']
+    low, high = TARGET_RATE
+    if not analysis['voiced']:
+        pace_feedback = "No speech detected"
+    elif rate > high:
+        pace_feedback = f"{rate:.1f} syllables/s - slightly fast, try slowing down"
+    elif rate < low:
+        pace_feedback = f"{rate:.1f} syllables/s - a little slow, try to keep it flowing"
+    else:
+        pace_feedback = f"{rate:.1f} syllables/s - natural pace"
+    
+    if analysis['clarity_score'] >= 70:
+        clarity_feedback = "Clear pronunciation"
+    else:
+        clarity_feedback = "Speak a bit louder or move closer to the microphone"
+    
+    if analysis['pitch_score'] >= 70:
+        pitch_feedback = "Good intonation"
+    elif analysis['pitch_variation'] < 2.0:
+        pitch_feedback = "Quite flat - let your voice rise and fall more"
+    else:
+        pitch_feedback = "Pitch jumps around a lot - aim for smoother intonation"
+    
+    metrics = {
+        "Clarity": {"score": analysis['clarity_score'], "feedback": clarity_feedback},
+        "Pace": {"score": analysis['pace_score'], "feedback": pace_feedback},
+        "Pitch": {"score": analysis['pitch_score'], "feedback": pitch_feedback}
+    }
+    if transcript:
+        # How much of the phrase the recognizer heard
+        reference = re.sub(r"[^\w\s']", " ", phrase)
+        hypothesis = re.sub(r"[^\w\s']", " ", transcript)
+        accuracy = round(100 * max(0.0, 1 - word_error_rate(reference, hypothesis)))
+        if accuracy >= 90:
+            accuracy_feedback = "Every word came through"
+        else:
+            accuracy_feedback = "Some words were not recognized - compare with the model audio"
+        metrics["Accuracy"] = {"score": accuracy, "feedback": accuracy_feedback}
+    return metrics
+
+@st.cache_data(max_entries=32)
+def waveform_data(recording_id, _samples, _pitch_track=None, hop_seconds=None):
+    """Decimated waveform and pitch for a recording, computed once per recording id"""
+    return waveform_view(_samples, 16000, _pitch_track, hop_seconds)
 
 def render():
     st.markdown("## 🎤 Pronunciation Trainer")
@@ -26,32 +103,7 @@ def render():
             index=1
         )
         
-        # Phrases by difficulty
-        phrases = {
-            "Beginner": [
-                "Hello, how are you today?",
-                "I would like a cup of coffee.",
-                "Where is the nearest station?",
-                "Thank you very much for your help.",
-                "Could you repeat that, please?"
-            ],
-            "Intermediate": [
-                "The quick brown fox jumps over the lazy dog.",
-                "She sells seashells by the seashore.",
-                "Peter Piper picked a peck of pickled peppers.",
-                "How much wood would a woodchuck chuck?",
-                "Unique New York, New York's unique."
-            ],
-            "Advanced": [
-                "The sixth sick sheik's sixth sheep's sick.",
-                "Betty Botter bought some butter.",
-                "Fuzzy Wuzzy was a bear. Fuzzy Wuzzy had no hair.",
-                "I slit the sheet, the sheet I slit, and on the slitted sheet I sit.",
-                "Six thick thistle sticks."
-            ]
-        }
-        
-        selected_phrases = phrases.get(difficulty, phrases["Intermediate"])
+        selected_phrases = PHRASES.get(difficulty, PHRASES["Intermediate"])
         
         # Display phrases
         for i, phrase in enumerate(selected_phrases):
@@ -61,6 +113,8 @@ def render():
             with col_b:
                 if st.button("🎤 Practice", key=f"phrase_{i}"):
                     st.session_state.current_phrase = phrase
+                    st.session_state.transcript = None
+                    st.session_state.pronunciation_analysis = None
                     st.session_state.recording = True
                     st.success(f"Recording: '{phrase}'")
     
@@ -92,12 +146,17 @@ def render():
             st.markdown(f"### 📝 Current Practice")
             st.markdown(f"**Phrase:** {st.session_state.current_phrase}")
             
+            if st.button("🔊 Listen", key="listen_phrase"):
+                # MP3 bytes go straight to the player, nothing is written to disk
+                speech = get_speech_handler()
+                audio_bytes = speech.text_to_speech(st.session_state.current_phrase)
+                if audio_bytes:
+                    st.audio(audio_bytes, format=speech.audio_format)
+            
             # Recording controls
             col_a, col_b, col_c = st.columns(3)
             with col_a:
-                if st.button("⏺️ Record", type="primary", use_container_width=True):
-                    st.session_state.recording = True
-                    st.success("Recording started... Speak now!")
+                record_clicked = st.button("⏺️ Record", type="primary", use_container_width=True)
             
             with col_b:
                 if st.button("⏸️ Pause", use_container_width=True):
@@ -107,50 +166,59 @@ def render():
             with col_c:
                 if st.button("▶️ Playback", use_container_width=True):
                     st.info("Playing back your recording...")
+            
+            transcript_box = st.empty()
+            if record_clicked:
+                st.session_state.recording = True
+                transcript_box.success("Recording started... Speak now!")
+                try:
+                    # Partial transcripts show up while the student is still speaking
+                    for event in get_speech_handler().listen_streaming():
+                        if event['type'] == 'partial':
+                            transcript_box.markdown(f"🗣️ *{event['text']}…*")
+                        else:
+                            st.session_state.transcript = event['text']
+                            st.session_state.recording_samples = event['samples']
+                            st.session_state.recording_id = hashlib.sha1(event['samples'].tobytes()).hexdigest()
+                            st.session_state.pronunciation_analysis = analyze_pcm(
+                                event['samples'], 16000, text=st.session_state.current_phrase
+                            )
+                except Exception as e:
+                    transcript_box.error(f"Recording error: {str(e)}")
+                st.session_state.recording = False
+            
+            if st.session_state.get('transcript'):
+                transcript_box.markdown(f"🗣️ **You said:** {st.session_state.transcript}")
         
         with col2:
             st.markdown("### 📊 Analysis")
             
-            # Simulated analysis metrics
-            metrics = {
-                "Clarity": {"score": 85, "feedback": "Clear pronunciation"},
-                "Pace": {"score": 70, "feedback": "Slightly fast, try slowing down"},
-                "Pitch": {"score": 90, "feedback": "Good intonation"},
-                "Accuracy": {"score": 80, "feedback": "Minor vowel sound issues"}
-            }
-            
-            for metric, data in metrics.items():
-                st.write(f"**{metric}:** {data['score']}%")
-                st.progress(data['score'] / 100)
-                st.caption(data['feedback'])
+            analysis = st.session_state.get('pronunciation_analysis')
+            if analysis:
+                metrics = analysis_metrics(
+                    analysis, st.session_state.current_phrase, st.session_state.get('transcript')
+                )
+                for metric, data in metrics.items():
+                    st.write(f"**{metric}:** {data['score']}%")
+                    st.progress(data['score'] / 100)
+                    st.caption(data['feedback'])
+            else:
+                st.caption("Record the phrase to see clarity, pace, pitch and accuracy scores.")
     
     # Waveform visualization
     st.divider()
     st.markdown("### 📈 Voice Waveform")
     
-    # Create simulated waveform
-    x = np.linspace(0, 4 * np.pi, 1000)
-    y = np.sin(x) * np.random.rand(1000)
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=x, y=y,
-        mode='lines',
-        fill='tozeroy',
-        fillcolor='rgba(102, 126, 234, 0.2)',
-        line=dict(color='#667eea', width=2)
-    ))
-    
-    fig.update_layout(
-        height=200,
-        margin=dict(l=10, r=10, t=10, b=10),
-        xaxis=dict(showgrid=False, showticklabels=False),
-        yaxis=dict(showgrid=False, showticklabels=False),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    samples = st.session_state.get('recording_samples')
+    if samples is not None and len(samples):
+        analysis = st.session_state.get('pronunciation_analysis') or {}
+        view = waveform_data(
+            st.session_state.recording_id, samples,
+            analysis.get('pitch_track'), analysis.get('hop_seconds')
+        )
+        st.plotly_chart(create_waveform_chart(view), use_container_width=True)
+    else:
+        st.caption("Your recording's waveform and pitch contour will appear here.")
     
     # Pronunciation tips
     st.markdown("### 💡 Pronunciation Tips")
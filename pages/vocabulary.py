@@ -2,6 +2,47 @@ import streamlit as st
 import random
 import pandas as pd
 from datetime import datetime, timedelta
+from utils.speech_utils import get_speech_handler
+from utils.events import record_event, record_answer
+from utils.database import (add_vocabulary, delete_vocabulary, get_vocabulary_summary,
+                            search_vocabulary, update_mastery)
+
+# Words per page in "My Words" (three cards per row)
+PAGE_SIZE = 30
+
+# "Sort by" choices -> utils.database.VOCABULARY_SORTS keys
+SORT_OPTIONS = {"Date Added": "added", "Alphabetical": "alphabetical", "Mastery": "mastery"}
+
+# Word decks (also pre-rendered into the speech cache, see utils/audio_cache.py)
+WORD_OF_DAY = {
+    "word": "Ubiquitous",
+    "phonetic": "/juːˈbɪk.wɪ.təs/",
+    "part_of_speech": "adjective",
+    "meaning": "Present, appearing, or found everywhere",
+    "example": "Mobile phones have become ubiquitous in modern society.",
+    "synonyms": ["omnipresent", "pervasive", "universal", "everywhere"],
+    "antonyms": ["rare", "scarce", "uncommon"],
+    "origin": "Mid 19th century: from Latin ubique 'everywhere' + -ous.",
+    "difficulty": "Intermediate",
+    "category": "Formal"
+}
+
+SAMPLE_WORDS = [
+    {"word": "Essential", "meaning": "Absolutely necessary", "level": "Beginner"},
+    {"word": "Challenge", "meaning": "A difficult task", "level": "Beginner"},
+    {"word": "Opportunity", "meaning": "A good chance for advancement", "level": "Intermediate"},
+    {"word": "Significant", "meaning": "Important or noticeable", "level": "Intermediate"},
+    {"word": "Comprehensive", "meaning": "Complete and including everything", "level": "Advanced"},
+    {"word": "Ambiguous", "meaning": "Having more than one possible meaning", "level": "Advanced"},
+]
+
+GAME_WORDS = [
+    {"word": "Benevolent", "meaning": "Well meaning and kindly"},
+    {"word": "Ephemeral", "meaning": "Lasting for a very short time"},
+    {"word": "Meticulous", "meaning": "Showing great attention to detail"},
+    {"word": "Ubiquitous", "meaning": "Present, appearing, or found everywhere"},
+    {"word": "Ambiguous", "meaning": "Having more than one possible meaning"},
+]
 
 def render():
     st.markdown("## 📚 Vocabulary Builder")
@@ -24,18 +65,7 @@ def render():
 def render_word_of_day():
     """Word of the day section"""
     
-    word_data = {
-        "word": "Ubiquitous",
-        "phonetic": "/juːˈbɪk.wɪ.təs/",
-        "part_of_speech": "adjective",
-        "meaning": "Present, appearing, or found everywhere",
-        "example": "Mobile phones have become ubiquitous in modern society.",
-        "synonyms": ["omnipresent", "pervasive", "universal", "everywhere"],
-        "antonyms": ["rare", "scarce", "uncommon"],
-        "origin": "Mid 19th century: from Latin ubique 'everywhere' + -ous.",
-        "difficulty": "Intermediate",
-        "category": "Formal"
-    }
+    word_data = dict(WORD_OF_DAY)
     
     # Word display
     col1, col2 = st.columns([3, 1])
@@ -65,16 +95,26 @@ def render_word_of_day():
     with col2:
         # Add to my words button
         if st.button("➕ Add to My Words", use_container_width=True, type="primary"):
-            if 'vocabulary_list' not in st.session_state:
-                st.session_state.vocabulary_list = []
-            
-            word_data['added_date'] = datetime.now()
-            word_data['mastery'] = 0
-            word_data['review_count'] = 0
-            
-            st.session_state.vocabulary_list.append(word_data)
+            user_id = st.session_state.get('user_id', 1)
+            add_vocabulary(
+                user_id,
+                word_data['word'],
+                meaning=word_data['meaning'],
+                phonetic=word_data['phonetic'],
+                example=word_data['example'],
+                category=word_data['category'],
+                difficulty=word_data['difficulty']
+            )
+            # Logged through the event queue; add_vocabulary already scored the word
+            record_event(user_id, 'vocabulary', {"word": word_data['word']}, points=0)
             st.success(f"'{word_data['word']}' added to your vocabulary!")
         
+        if st.button("🔊 Pronounce", use_container_width=True):
+            speech = get_speech_handler()
+            audio_bytes = speech.text_to_speech(word_data['word'])
+            if audio_bytes:
+                st.audio(audio_bytes, format=speech.audio_format)
+        
         # Word details
         st.markdown("### 📝 Details")
         
@@ -93,10 +133,15 @@ def render_word_of_day():
         if st.button("🔄 Practice This Word", use_container_width=True):
             st.info("Practice session started with 'Ubiquitous'")
 
+def set_mastery(word_id, key):
+    """Save a mastery slider change"""
+    update_mastery(st.session_state.get('user_id', 1), word_id, st.session_state[key])
+
 def render_my_words():
     """User's vocabulary list"""
     
     st.markdown("### 📖 My Vocabulary Collection")
+    user_id = st.session_state.get('user_id', 1)
     
     # Search and filter
     col1, col2, col3 = st.columns([3, 2, 1])
@@ -108,19 +153,28 @@ def render_my_words():
         filter_by = st.selectbox("Filter by", ["All", "Beginner", "Intermediate", "Advanced", "Needs Review"])
     
     with col3:
-        sort_by = st.selectbox("Sort by", ["Date Added", "Alphabetical", "Mastery"])
+        sort_by = st.selectbox("Sort by", list(SORT_OPTIONS))
+    
+    # Back to the first page whenever the search, filter or sort changes
+    view = (search_term, filter_by, sort_by)
+    if st.session_state.get('vocab_view') != view:
+        st.session_state.vocab_view = view
+        st.session_state.vocab_page = 0
+    page = st.session_state.get('vocab_page', 0)
+    
+    # Filtering, sorting and paging all happen in SQLite
+    words, total = search_vocabulary(
+        user_id,
+        query=search_term,
+        difficulty=filter_by if filter_by not in ("All", "Needs Review") else None,
+        needs_review=filter_by == "Needs Review",
+        sort=SORT_OPTIONS[sort_by],
+        limit=PAGE_SIZE,
+        offset=page * PAGE_SIZE
+    )
     
     # Display vocabulary list
-    if 'vocabulary_list' in st.session_state and st.session_state.vocabulary_list:
-        words = st.session_state.vocabulary_list
-        
-        # Filter and sort
-        if search_term:
-            words = [w for w in words if search_term.lower() in w['word'].lower()]
-        
-        if filter_by != "All":
-            words = [w for w in words if w['difficulty'] == filter_by]
-        
+    if words:
         # Display in grid
         cols = st.columns(3)
         for idx, word in enumerate(words):
@@ -131,60 +185,68 @@ def render_my_words():
                          margin-bottom: 15px; border: 1px solid #e0e0e0;'>
                         <h4 style='margin: 0;'>{word['word']}</h4>
                         <p style='margin: 5px 0; color: #666; font-size: 0.9em;'>
-                            <i>{word.get('phonetic', '')}</i>
+                            <i>{word.get('phonetic') or ''}</i>
                         </p>
                         <p style='margin: 10px 0; font-size: 0.9em;'>
-                            {word['meaning'][:60]}...
+                            {(word.get('meaning') or '')[:60]}...
                         </p>
                     </div>
                     """, unsafe_allow_html=True)
                     
                     # Mastery slider
-                    mastery = st.slider(
+                    mastery_key = f"mastery_{word['id']}"
+                    st.slider(
                         "Mastery",
                         0, 100, 
-                        word.get('mastery', 0),
-                        key=f"mastery_{word['word']}"
+                        word.get('mastery') or 0,
+                        key=mastery_key,
+                        on_change=set_mastery,
+                        args=(word['id'], mastery_key)
                     )
                     
                     # Actions
                     col_a, col_b = st.columns(2)
                     with col_a:
-                        if st.button("Review", key=f"review_{word['word']}"):
+                        if st.button("Review", key=f"review_word_{word['id']}"):
                             st.info(f"Reviewing {word['word']}")
                     with col_b:
-                        if st.button("❌", key=f"delete_{word['word']}"):
-                            st.session_state.vocabulary_list.pop(idx)
+                        if st.button("❌", key=f"delete_word_{word['id']}"):
+                            delete_vocabulary(user_id, word['id'])
                             st.rerun()
+        
+        # Pagination
+        pages = -(-total // PAGE_SIZE)  # ceil
+        col_prev, col_info, col_next = st.columns([1, 3, 1])
+        with col_prev:
+            if st.button("◀ Previous", disabled=page == 0):
+                st.session_state.vocab_page = page - 1
+                st.rerun()
+        with col_info:
+            st.caption(f"Showing {page * PAGE_SIZE + 1}–{page * PAGE_SIZE + len(words)} of {total} words "
+                       f"(page {page + 1} of {pages})")
+        with col_next:
+            if st.button("Next ▶", disabled=page + 1 >= pages):
+                st.session_state.vocab_page = page + 1
+                st.rerun()
+    elif page:
+        # The page emptied out (e.g. its last word was deleted): step back
+        st.session_state.vocab_page = page - 1
+        st.rerun()
+    elif search_term or filter_by != "All":
+        st.info("No words match your search.")
     else:
         st.info("Your vocabulary list is empty. Add words from 'Word of the Day' to get started!")
         
         # Sample words to add
         st.markdown("### 💡 Try These Common Words:")
-        sample_words = [
-            {"word": "Essential", "meaning": "Absolutely necessary", "level": "Beginner"},
-            {"word": "Challenge", "meaning": "A difficult task", "level": "Beginner"},
-            {"word": "Opportunity", "meaning": "A good chance for advancement", "level": "Intermediate"},
-            {"word": "Significant", "meaning": "Important or noticeable", "level": "Intermediate"},
-            {"word": "Comprehensive", "meaning": "Complete and including everything", "level": "Advanced"},
-            {"word": "Ambiguous", "meaning": "Having more than one possible meaning", "level": "Advanced"},
-        ]
         
         cols = st.columns(3)
-        for idx, word in enumerate(sample_words):
+        for idx, word in enumerate(SAMPLE_WORDS):
             with cols[idx % 3]:
                 if st.button(f"➕ {word['word']}", use_container_width=True):
-                    if 'vocabulary_list' not in st.session_state:
-                        st.session_state.vocabulary_list = []
-                    
-                    st.session_state.vocabulary_list.append({
-                        "word": word['word'],
-                        "meaning": word['meaning'],
-                        "difficulty": word['level'],
-                        "added_date": datetime.now(),
-                        "mastery": 0
-                    })
-                    st.success(f"Added '{word['word']}'")
+                    add_vocabulary(user_id, word['word'], meaning=word['meaning'], difficulty=word['level'])
+                    record_event(user_id, 'vocabulary', {"word": word['word']}, points=0)
+                    st.rerun()
 
 def render_word_games():
     """Vocabulary games"""
@@ -254,13 +316,7 @@ def render_match_game():
     st.markdown("### 🔤 Word Matching Game")
     
     # Game words
-    words = [
-        {"word": "Benevolent", "meaning": "Well meaning and kindly"},
-        {"word": "Ephemeral", "meaning": "Lasting for a very short time"},
-        {"word": "Meticulous", "meaning": "Showing great attention to detail"},
-        {"word": "Ubiquitous", "meaning": "Present, appearing, or found everywhere"},
-        {"word": "Ambiguous", "meaning": "Having more than one possible meaning"},
-    ]
+    words = list(GAME_WORDS)
     
     # Shuffle words and meanings
     random.shuffle(words)
@@ -285,6 +341,10 @@ def render_match_game():
                 label_visibility="collapsed"
             )
         
+        record_answer(st.session_state.get('user_id'), 'quiz', f"match:{word['word']}", selected,
+                      selected == word['meaning'], st.session_state.setdefault('logged_answers', {}),
+                      default="Choose...")
+        
         with col3:
             if selected == word['meaning']:
                 st.success("✓ Correct!")
@@ -346,6 +406,9 @@ def render_fill_game():
     if st.button("Check Answers"):
         correct = 0
         for i, (user_ans, correct_ans) in enumerate(zip(user_answers, answers)):
+            record_answer(st.session_state.get('user_id'), 'quiz', f"fill:{i}", user_ans,
+                          user_ans == correct_ans, st.session_state.setdefault('logged_answers', {}),
+                          default="Select...")
             if user_ans == correct_ans:
                 st.success(f"Sentence {i+1}: ✓ Correct!")
                 correct += 1
@@ -408,11 +471,14 @@ def render_quiz_game():
     
     if st.session_state.quiz_started:
         for i, q in enumerate(questions[:3]):  # Show only 3 for demo
-            st.radio(
+            choice = st.radio(
                 q["question"],
                 q["options"],
                 key=f"quiz_{i}"
             )
+            record_answer(st.session_state.get('user_id'), 'quiz', q["question"], choice,
+                          choice == q["options"][q["answer"]], st.session_state.setdefault('logged_answers', {}),
+                          default=q["options"][0])
 
 def render_vocabulary_progress():
     """Vocabulary progress tracking"""
@@ -421,17 +487,13 @@ def render_vocabulary_progress():
     # Stats
     col1, col2, col3 = st.columns(3)
     
+    summary = get_vocabulary_summary(st.session_state.get('user_id', 1))
+    
     with col1:
-        total_words = len(st.session_state.get('vocabulary_list', []))
-        st.metric("Total Words", total_words)
+        st.metric("Total Words", summary['total'])
     
     with col2:
-        # Calculate average mastery
-        if st.session_state.get('vocabulary_list'):
-            avg_mastery = sum(w.get('mastery', 0) for w in st.session_state.vocabulary_list) / len(st.session_state.vocabulary_list)
-            st.metric("Average Mastery", f"{avg_mastery:.0f}%")
-        else:
-            st.metric("Average Mastery", "0%")
+        st.metric("Average Mastery", f"{summary['average_mastery']:.0f}%")
     
     with col3:
         st.metric("Words This Week", "12")
@@ -459,11 +521,8 @@ def render_vocabulary_progress():
     # Word categories
     st.markdown("#### 🏷️ Word Categories")
     
-    if st.session_state.get('vocabulary_list'):
-        categories = {}
-        for word in st.session_state.vocabulary_list:
-            cat = word.get('category', 'General')
-            categories[cat] = categories.get(cat, 0) + 1
+    if summary['categories']:
+        categories = summary['categories']
         
         for category, count in categories.items():
             st.write(f"**{category}:** {count} words")
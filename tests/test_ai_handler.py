@@ -0,0 +1,105 @@
+import json
+import time
+
+import pytest
+
+from benchmarks.fake_openai import serve
+from utils import ai_handler
+from utils.openai_client import OpenAIClient
+from utils.response_cache import ResponseCache
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    """AIHandler pointed at a local fake API, with a scratch response cache"""
+    server, url = serve(think_time=0, interval=0, reply=lambda body: 'SUMMARY' if 'summary' in
+                        body['messages'][0]['content'].lower() else 'Tutor reply')
+    client = OpenAIClient('test', base_url=url, request_timeout=5, backoff_base=0.01)
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    monkeypatch.setattr(ai_handler, 'get_client', lambda api_key: client)
+    monkeypatch.setattr(ai_handler, 'get_response_cache', lambda: ResponseCache(path=str(tmp_path / 'cache.db')))
+    handler = ai_handler.AIHandler()
+    handler.server = server
+    yield handler
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def long_conversation(handler):
+    conversation = handler.new_conversation(max_turns=4)
+    for i in range(3):
+        conversation.add_turn(f"Question {i}", f"Answer {i}")
+    assert conversation._pending
+    return conversation
+
+
+def test_async_reply_summarizes_on_the_clients_own_loop(handler):
+    # The summary request is awaited; a blocking call here would wait on its own loop
+    conversation = long_conversation(handler)
+    reply = handler.client.run(handler.aget_conversation_response("Next?", use_cache=False,
+                                                                  conversation=conversation))
+    assert reply == 'Tutor reply'
+    assert conversation.summary == 'SUMMARY'
+    assert handler.server.requests == 2
+
+
+def test_streamed_reply_summarizes_first(handler):
+    conversation = long_conversation(handler)
+    reply = ''.join(handler.stream_conversation_response("Next?", use_cache=False, conversation=conversation))
+    assert reply == 'Hello there, student! How was your day?'
+    assert conversation.summary == 'SUMMARY'
+
+
+def grammar_reply(drop=()):
+    """Fake replies: batch requests answer every item but `drop`, single checks echo the text"""
+    def reply(body):
+        request = body['messages'][-1]['content']
+        if 'numbered sentence' not in body['messages'][0]['content']:
+            return f"Fixed: {request.removeprefix('Text to check: ')}"
+        items = [item for item in json.loads(request) if item['text'] not in drop]
+        results = [{'index': item['index'], 'corrected': item['text'].capitalize(), 'feedback': 'ok'}
+                   for item in items]
+        return '```json\n' + json.dumps({'results': results}) + '\n```'
+    return reply
+
+
+def test_parse_batch_accepts_fenced_json_and_bare_lists():
+    parsed = ai_handler.AIHandler._parse_batch('```json\n{"results": [{"index": 2, "corrected": "A."}]}\n```')
+    assert parsed == {2: {'corrected': 'A.', 'feedback': 'Grammar checked by AI'}}
+    parsed = ai_handler.AIHandler._parse_batch('[{"index": "1", "corrected": "B.", "feedback": "f"}, {"x": 1}]')
+    assert parsed == {1: {'corrected': 'B.', 'feedback': 'f'}}
+
+
+def test_grammar_batch_is_one_request_in_input_order(handler):
+    handler.server.reply = grammar_reply()
+    texts = ['she go home', 'he are late', 'i has a cat']
+    results = handler.check_grammar_batch(texts, use_cache=False)
+    assert [r['corrected'] for r in results] == ['She go home', 'He are late', 'I has a cat']
+    assert handler.server.requests == 1
+
+
+def test_items_missing_from_the_batch_reply_are_checked_concurrently(handler):
+    dropped = [f'dropped sentence {i}' for i in range(4)]
+    handler.server.reply = grammar_reply(drop=dropped)
+    handler.server.think_time = 0.2
+    texts = ['she go home', *dropped, 'he are late']
+    started = time.perf_counter()
+    results = handler.check_grammar_batch(texts, use_cache=False)
+    elapsed = time.perf_counter() - started
+
+    assert results[0]['corrected'] == 'She go home'
+    assert results[-1]['corrected'] == 'He are late'
+    assert [r['corrected'] for r in results[1:-1]] == [f'Fixed: {text}' for text in dropped]
+    assert handler.server.requests == 5
+    assert handler.server.max_in_flight == 4
+    # One batch round-trip plus one for the fallbacks, not one per dropped item
+    assert elapsed < 0.2 * 4
+
+
+def test_unparseable_batch_reply_falls_back_for_every_item(handler):
+    handler.server.reply = lambda body: ('not json' if 'numbered sentence' in body['messages'][0]['content']
+                                         else 'Fixed')
+    results = handler.check_grammar_batch(['a b', 'c d'], use_cache=False)
+    assert [r['corrected'] for r in results] == ['Fixed', 'Fixed']
+    assert handler.server.requests == 3
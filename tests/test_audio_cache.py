@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+
+import pytest
+
+from utils.audio_cache import AudioCache, audio_key, warm_up
+from utils.speech_engines import ToneEngine
+
+TONE = ToneEngine()
+
+
+def clip(text):
+    return TONE.synthesize(text)
+
+
+def key(text):
+    return audio_key(text, engine='tone')
+
+
+def set_mtime(cache, text, seconds_ago):
+    path = cache._path(key(text))
+    old = time.time() - seconds_ago
+    os.utime(path, (old, old))
+
+
+def stored_files(cache):
+    return [path for _, _, path in cache._scan()]
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / 'tts')
+
+
+def test_keys_address_the_content():
+    assert audio_key('Hello there') == audio_key('  Hello there ')
+    assert len({audio_key('Hello'), audio_key('Hello', lang='fr'), audio_key('Hello', slow=True),
+                audio_key('Hello', engine='tone'), audio_key('Hello!')}) == 5
+
+
+def test_renders_once_then_hits(cache_dir):
+    cache = AudioCache(cache_dir)
+    calls = []
+
+    def render():
+        calls.append(1)
+        return clip('good morning')
+
+    first = cache.get_or_render('good morning', render, engine='tone')
+    second = cache.get_or_render('good morning', render, engine='tone')
+    assert first == second == clip('good morning')
+    assert len(calls) == 1
+    assert cache.stats['misses'] == 1 and cache.stats['memory_hits'] == 1
+    assert stored_files(cache) == [cache._path(key('good morning'))]
+
+
+def test_disk_tier_survives_a_new_process(cache_dir):
+    AudioCache(cache_dir).set(key('see you later'), clip('see you later'))
+    cache = AudioCache(cache_dir)
+    assert cache.disk_bytes == len(clip('see you later'))
+    assert cache.get(key('see you later')) == clip('see you later')
+    assert cache.stats['disk_hits'] == 1
+    # Now promoted to memory
+    cache.get(key('see you later'))
+    assert cache.stats['memory_hits'] == 1
+
+
+def test_memory_tier_keeps_the_most_recent_clips_within_its_budget(cache_dir):
+    size = len(clip('one'))
+    cache = AudioCache(cache_dir, max_memory_bytes=2 * size)
+    for text in ('one', 'two', 'six'):
+        cache.set(key(text), clip(text))
+    cache.get(key('two'))
+    cache.set(key('ten'), clip('ten'))
+    assert list(cache._memory) == [key('two'), key('ten')]
+    assert cache._memory_bytes <= 2 * size
+    # Dropped from memory, still on disk
+    assert cache.get(key('one')) == clip('one')
+    assert cache.stats['disk_hits'] == 1
+
+
+def test_clips_larger_than_the_memory_tier_stay_on_disk_only(cache_dir):
+    cache = AudioCache(cache_dir, max_memory_bytes=100)
+    cache.set(key('hello'), clip('hello'))
+    assert not cache._memory
+    assert cache.get(key('hello')) == clip('hello')
+
+
+def test_disk_eviction_drops_least_recently_used(cache_dir):
+    words = ['alpha', 'bravo', 'delta', 'gamma', 'kilos', 'lemon', 'mango', 'nylon']
+    size = len(clip('alpha'))
+    cache = AudioCache(cache_dir, max_bytes=5 * size, max_memory_bytes=0)
+    for i, word in enumerate(words[:5]):
+        cache.set(key(word), clip(word))
+        set_mtime(cache, word, 100 - i)
+    # Reading the oldest clip makes it the most recently used
+    assert cache.get(key('alpha')) == clip('alpha')
+
+    # Each time the store passes 5 clips it is cut back to 90%, i.e. 4 clips
+    for word in words[5:]:
+        cache.set(key(word), clip(word))
+    assert cache.stats['evictions'] == 4
+    assert [cache.get(key(word)) is not None for word in words] == [True] + [False] * 4 + [True] * 3
+    assert cache.disk_bytes == sum(os.path.getsize(path) for path in stored_files(cache)) <= 0.9 * 5 * size
+
+
+def test_evicted_clips_leave_the_memory_tier_too(cache_dir):
+    size = len(clip('alpha'))
+    cache = AudioCache(cache_dir, max_bytes=2 * size)
+    cache.set(key('alpha'), clip('alpha'))
+    set_mtime(cache, 'alpha', 100)
+    cache.set(key('bravo'), clip('bravo'))
+    cache.set(key('delta'), clip('delta'))
+    assert key('alpha') not in cache._memory
+    assert cache.get(key('alpha')) is None
+
+
+def test_concurrent_writers_never_expose_partial_clips(cache_dir):
+    texts = [f'phrase {i}' for i in range(20)]
+    clips = {key(text): clip(text) for text in texts}
+    writers = [AudioCache(cache_dir, max_memory_bytes=0) for _ in range(4)]
+    reader = AudioCache(cache_dir, max_memory_bytes=0)
+    errors = []
+
+    def write(cache):
+        for _ in range(5):
+            for k, data in clips.items():
+                cache.set(k, data)
+
+    def read():
+        for _ in range(50):
+            for k, data in clips.items():
+                got = reader.get(k)
+                if got is not None and got != data:
+                    errors.append(k)
+
+    threads = [threading.Thread(target=write, args=(cache,)) for cache in writers]
+    threads.append(threading.Thread(target=read))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert all(reader.get(k) == data for k, data in clips.items())
+    leftovers = [name for _, _, names in os.walk(cache_dir) for name in names if name.endswith('.part')]
+    assert not leftovers
+    assert len(stored_files(reader)) == len(texts)
+
+
+def test_warm_up_renders_each_distinct_text_once(cache_dir):
+    cache = AudioCache(cache_dir)
+    rendered = []
+    texts = ['one', 'two', 'one', 'three']
+    synthesize = lambda text: rendered.append(text) or clip(text)
+    assert warm_up(texts, synthesize, engine='tone', cache=cache)[:2] == (3, 0)
+    assert warm_up(texts, synthesize, engine='tone', cache=cache)[:2] == (0, 3)
+    assert rendered == ['one', 'two', 'three']
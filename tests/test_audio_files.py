@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+from utils import speech_utils
+from utils.audio_cache import AudioCache
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    """Tone-engine handler with its own cache, temp dir and swept audio dir"""
+    temp_dir = tmp_path / 'tmp'
+    temp_dir.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(temp_dir))
+    monkeypatch.setattr(speech_utils, 'AUDIO_TEMP_DIR', str(tmp_path / 'swept'))
+    # Keep the automatic sweep off the real default directory
+    monkeypatch.setattr(speech_utils, '_last_sweep', time.monotonic())
+    handler = speech_utils.SpeechHandler(audio_cache=AudioCache(str(tmp_path / 'cache')), tts_engine='tone')
+    handler.temp_dir = str(temp_dir)
+    return handler
+
+
+def make_files(handler, count):
+    return [handler.text_to_speech_file(f"sweep {i}") for i in range(count)]
+
+
+def age(paths, seconds):
+    old = time.time() - seconds
+    for path in paths:
+        os.utime(path, (old, old))
+
+
+def test_in_memory_pipeline_writes_no_files(handler):
+    for i in range(200):
+        html = handler.get_audio_html(handler.text_to_speech(f"practice phrase {i % 20}"))
+        assert 'base64,' in html
+    for i in range(50):
+        handler.get_audio_html(handler.text_to_speech(f"uncached {i}", use_cache=False))
+    assert os.listdir(handler.temp_dir) == []
+    assert not os.path.exists(speech_utils.AUDIO_TEMP_DIR)
+
+
+def test_audio_files_only_go_to_the_swept_directory(handler):
+    paths = make_files(handler, 3)
+    assert all(os.path.dirname(path) == speech_utils.AUDIO_TEMP_DIR for path in paths)
+    assert os.listdir(handler.temp_dir) == []
+    assert handler.get_audio_html(paths[0]) == handler.get_audio_html(handler.text_to_speech("sweep 0"))
+
+
+def test_sweep_removes_files_past_max_age(handler):
+    paths = make_files(handler, 10)
+    age(paths[:6], speech_utils.AUDIO_TEMP_MAX_AGE + 60)
+    aged_bytes = sum(os.path.getsize(path) for path in paths[:6])
+    assert speech_utils.sweep_audio_files(speech_utils.AUDIO_TEMP_DIR) == (6, aged_bytes)
+    assert [os.path.exists(path) for path in paths] == [False] * 6 + [True] * 4
+
+
+def test_sweep_trims_oldest_files_to_max_bytes(handler):
+    paths = make_files(handler, 10)
+    for i, path in enumerate(paths):
+        age([path], 100 - i)  # paths[0] is the oldest
+    clip_size = os.path.getsize(paths[0])
+    removed, _ = speech_utils.sweep_audio_files(speech_utils.AUDIO_TEMP_DIR, max_bytes=3 * clip_size)
+    assert removed == 7
+    assert sorted(os.listdir(speech_utils.AUDIO_TEMP_DIR)) == sorted(os.path.basename(p) for p in paths[7:])
+
+
+def test_sweep_of_a_missing_directory_is_a_no_op(tmp_path):
+    assert speech_utils.sweep_audio_files(str(tmp_path / 'missing')) == (0, 0)
@@ -0,0 +1,35 @@
+from components import charts
+
+
+def build_calls(calls):
+    def build():
+        calls.append(1)
+        return charts.create_skill_radar()
+    return build
+
+
+def test_figures_are_built_once_per_data_version():
+    calls = []
+    build = build_calls(calls)
+    first = charts.cached_figure('test_radar', 1, 'v1', build)
+    second = charts.cached_figure('test_radar', 1, 'v1', build)
+    assert first.to_dict() == second.to_dict()
+    assert len(calls) == 1
+    charts.cached_figure('test_radar', 1, 'v2', build)
+    assert len(calls) == 2
+    charts.invalidate_figures(1)
+    charts.cached_figure('test_radar', 1, 'v2', build)
+    assert len(calls) == 3
+
+
+def test_changes_to_a_returned_figure_do_not_leak_into_the_cache():
+    build = build_calls([])
+    fig = charts.cached_figure('test_radar', 2, 'v1', build)
+    original = fig.to_dict()
+    fig.update_layout(height=123, title='changed')
+    fig.add_trace(fig.data[0])
+    fig.data[0].name = 'changed'
+
+    again = charts.cached_figure('test_radar', 2, 'v1', build)
+    assert again is not fig
+    assert again.to_dict() == original
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from utils import database, events
+from utils.events import EventLog
+from utils.streaks import POINTS
+
+
+@pytest.fixture
+def db(tmp_path):
+    database.set_database_path(str(tmp_path / 'test.db'))
+    database.init_db()
+    yield database
+    database.close_connections()
+
+
+@pytest.fixture
+def log(monkeypatch):
+    log = EventLog(flush_interval=0.01)
+    monkeypatch.setattr(events, '_event_log', log)
+    yield log
+    log.close()
+
+
+def make_user(db, name, tz='UTC'):
+    user_id = db.get_or_create_user(name)
+    db.update_user(user_id, timezone=tz)
+    return user_id
+
+
+def test_conversation_is_stored_by_the_writer_thread(db, log):
+    user_id = make_user(db, 'student')
+    events.record_conversation(user_id, 'Travel', 'Where is the station?', 'Turn left.', feedback={'score': 90})
+    log.flush()
+
+    [turn] = db.get_conversations(user_id)
+    assert (turn['topic'], turn['user_input'], turn['ai_response']) == ('Travel', 'Where is the station?', 'Turn left.')
+    assert turn['feedback'] == '{"score": 90}'
+    assert [event['kind'] for event in db.get_events(user_id)] == ['conversation']
+    assert db.get_user(user_id)['total_points'] == POINTS['conversation']
+
+
+def test_queued_conversation_lands_on_the_users_local_day(db, log):
+    user_id = make_user(db, 'tokyo', 'Asia/Tokyo')
+    # 23:00 UTC is the next morning in Tokyo
+    at = datetime(2026, 10, 18, 23, 0, tzinfo=timezone.utc)
+    log.record(user_id, 'conversation', {'topic': 'Travel', 'user_input': 'hi', 'ai_response': 'hello'},
+               points=0, at=at)
+    log.flush()
+
+    with database.get_connection() as conn:
+        assert conn.execute('SELECT day FROM conversations').fetchone()[0] == '2026-10-19'
+    assert [(row['period'], row['conversations']) for row in db.get_rollups(user_id, 'day')] == [('2026-10-19', 1)]
+    live = db.get_user(user_id)
+    assert (live['streak'], live['last_active_date'], live['total_points']) == (1, '2026-10-19', POINTS['conversation'])
+    db.recompute_streaks(user_id)
+    recomputed = db.get_user(user_id)
+    assert (recomputed['streak'], recomputed['last_active_date'], recomputed['total_points']) == \
+        (1, '2026-10-19', POINTS['conversation'])
+
+
+def test_conversation_log_entries_without_a_turn_are_not_stored(db):
+    user_id = make_user(db, 'student')
+    db.append_events([(user_id, 'conversation', None, 0, datetime.now(timezone.utc)),
+                      (user_id, 'conversation', '{"topic": "Travel"}', 0, datetime.now(timezone.utc))])
+    assert db.get_conversations(user_id) == []
+    assert len(db.get_events(user_id)) == 2
+
+
+def test_vocabulary_event_does_not_score_the_word_twice(db, log):
+    user_id = make_user(db, 'student')
+    db.add_vocabulary(user_id, 'ubiquitous')
+    events.record_event(user_id, 'vocabulary', {'word': 'ubiquitous'}, points=0)
+    log.flush()
+
+    assert [event['kind'] for event in db.get_events(user_id)] == ['vocabulary']
+    assert db.get_user(user_id)['total_points'] == POINTS['vocabulary']
+    db.recompute_streaks(user_id)
+    assert db.get_user(user_id)['total_points'] == POINTS['vocabulary']
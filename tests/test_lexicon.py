@@ -0,0 +1,17 @@
+from utils.lexicon import DEFAULT_LEXICON_PATH, Lexicon
+
+
+def test_packed_list_round_trips(tmp_path):
+    path = str(tmp_path / 'words.npy')
+    Lexicon.pack(['the', 'of', "it's", 'the', 'zebra'], path)
+    lexicon = Lexicon.from_file(path)
+    assert lexicon.size == 4
+    assert [lexicon.rank(word) for word in ('the', 'of', "it's", 'zebra', 'unknown')] == [1, 2, 3, 5, 0]
+
+
+def test_bundled_list_loads_in_rank_order():
+    lexicon = Lexicon.from_file(DEFAULT_LEXICON_PATH)
+    assert lexicon.size == 50000
+    assert lexicon.rank('the') == 1
+    assert lexicon.band('house') == 'A1'
+    assert lexicon.band('qwertyuiop') == 'Off-list'
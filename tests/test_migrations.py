@@ -0,0 +1,69 @@
+from utils import database
+
+
+def test_duplicate_vocabulary_is_merged_into_the_oldest_row(tmp_path, monkeypatch, capsys):
+    migrations = database.MIGRATIONS
+    monkeypatch.setattr(database, 'MIGRATIONS', [m for m in migrations if m[0] < 3])
+    database.set_database_path(str(tmp_path / 'old.db'))
+    database.init_db()
+    try:
+        with database.transaction() as conn:
+            conn.execute("INSERT INTO users (id, username) VALUES (1, 'a'), (2, 'b')")
+            conn.executemany('''
+                INSERT INTO vocabulary (user_id, word, meaning, phonetic, example, mastery)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (1, 'ubiquitous', '', '', 'It is ubiquitous.', 20),
+                (1, 'ubiquitous', 'found everywhere', '/juːˈbɪkwɪtəs/', 'Phones are ubiquitous.', 70),
+                (1, 'ubiquitous', 'everywhere', None, None, 40),
+                (1, 'candid', 'honest', '', '', 10),
+                (2, 'ubiquitous', 'everywhere', '', '', 5),
+            ])
+
+        monkeypatch.setattr(database, 'MIGRATIONS', migrations)
+        with database.get_connection() as conn:
+            database.migrate(conn)
+            rows = [dict(row) for row in conn.execute(
+                'SELECT id, user_id, word, meaning, phonetic, example, mastery FROM vocabulary ORDER BY id')]
+            indexes = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    finally:
+        database.close_connections()
+
+    assert rows == [
+        {'id': 1, 'user_id': 1, 'word': 'ubiquitous', 'meaning': 'found everywhere',
+         'phonetic': '/juːˈbɪkwɪtəs/', 'example': 'It is ubiquitous.', 'mastery': 70},
+        {'id': 4, 'user_id': 1, 'word': 'candid', 'meaning': 'honest', 'phonetic': '', 'example': '', 'mastery': 10},
+        {'id': 5, 'user_id': 2, 'word': 'ubiquitous', 'meaning': 'everywhere', 'phonetic': '', 'example': '',
+         'mastery': 5},
+    ]
+    assert 'idx_vocabulary_user_word' in indexes
+    assert 'Removed 2 duplicate vocabulary rows, merged into 1 kept words' in capsys.readouterr().out
+
+
+def test_existing_conversations_get_their_local_day(tmp_path, monkeypatch):
+    migrations = database.MIGRATIONS
+    monkeypatch.setattr(database, 'MIGRATIONS', [m for m in migrations if m[0] < 10])
+    database.set_database_path(str(tmp_path / 'old.db'))
+    database.init_db()
+    try:
+        with database.transaction() as conn:
+            conn.execute("INSERT INTO users (id, username, timezone) VALUES (1, 'tokyo', 'Asia/Tokyo')")
+            conn.execute("INSERT INTO users (id, username, timezone) VALUES (2, 'utc', 'UTC')")
+            # The triggers come from current code and already read `day`; migration 10 recreates them
+            conn.execute('DROP TRIGGER rollup_conversations_insert')
+            conn.executemany('INSERT INTO conversations (user_id, topic, timestamp) VALUES (?, ?, ?)', [
+                (1, 'Travel', '2026-10-18 23:00:00+00:00'),
+                (2, 'Travel', '2026-10-18 23:00:00+00:00'),
+            ])
+
+        monkeypatch.setattr(database, 'MIGRATIONS', migrations)
+        with database.get_connection() as conn:
+            database.migrate(conn)
+            days = conn.execute('SELECT user_id, day FROM conversations ORDER BY id').fetchall()
+        rollups = {user_id: [(row['period'], row['conversations']) for row in database.get_rollups(user_id, 'day')]
+                   for user_id in (1, 2)}
+    finally:
+        database.close_connections()
+
+    assert [tuple(row) for row in days] == [(1, '2026-10-19'), (2, '2026-10-18')]
+    assert rollups == {1: [('2026-10-19', 1)], 2: [('2026-10-18', 1)]}
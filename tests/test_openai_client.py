@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fake_openai import serve
+from utils.openai_client import AsyncOpenAIClient, OpenAIClient, OpenAIError
+
+MESSAGES = [{'role': 'user', 'content': 'Hello'}]
+
+
+@pytest.fixture
+def fake_api():
+    servers = []
+
+    def start(**kwargs):
+        kwargs.setdefault('think_time', 0)
+        kwargs.setdefault('interval', 0)
+        server, url = serve(**kwargs)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(url, **kwargs):
+        kwargs.setdefault('backoff_base', 0.01)
+        client = OpenAIClient('test', base_url=url, request_timeout=10, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def content(response):
+    return response['choices'][0]['message']['content']
+
+
+def test_retries_rate_limits_and_server_errors(fake_api, make_client):
+    server, url = fake_api(failures=[429, 503, 500])
+    client = make_client(url, max_retries=3)
+    assert content(client.chat(MESSAGES)) == 'Hello there, student! How was your day?'
+    assert server.requests == 4
+
+
+def test_gives_up_after_max_retries(fake_api, make_client):
+    server, url = fake_api(failures=[502] * 10)
+    client = make_client(url, max_retries=2)
+    with pytest.raises(OpenAIError) as error:
+        client.chat(MESSAGES)
+    assert error.value.status_code == 502
+    assert server.requests == 3
+
+
+def test_client_errors_are_not_retried(fake_api, make_client):
+    server, url = fake_api(failures=[400])
+    client = make_client(url, max_retries=3)
+    with pytest.raises(OpenAIError) as error:
+        client.chat(MESSAGES)
+    assert error.value.status_code == 400
+    assert server.requests == 1
+
+
+def test_waits_for_retry_after(fake_api, make_client):
+    server, url = fake_api(failures=[429, 429], retry_after=0.2)
+    client = make_client(url, max_retries=3)
+    started = time.perf_counter()
+    client.chat(MESSAGES)
+    assert time.perf_counter() - started >= 0.4
+    assert server.requests == 3
+
+
+def test_retry_after_is_capped_by_backoff_max(fake_api, make_client):
+    server, url = fake_api(failures=[503], retry_after=60)
+    client = make_client(url, max_retries=1, backoff_max=0.1)
+    started = time.perf_counter()
+    client.chat(MESSAGES)
+    assert time.perf_counter() - started < 2
+
+
+def test_backoff_grows_exponentially_with_jitter():
+    client = AsyncOpenAIClient('test', backoff_base=0.5, backoff_max=8.0)
+    for attempt in range(8):
+        delays = [client._backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= min(8.0, 0.5 * 2 ** attempt) for delay in delays)
+    assert client._backoff(0, retry_after='3') == 3.0
+    assert client._backoff(0, retry_after='120') == 8.0
+
+
+def test_semaphore_limits_requests_in_flight(fake_api, make_client):
+    server, url = fake_api(think_time=0.1)
+    client = make_client(url, max_concurrency=3)
+
+    async def many():
+        return await asyncio.gather(*(client.async_client.chat(MESSAGES) for _ in range(12)))
+
+    assert len(client.run(many())) == 12
+    assert server.requests == 12
+    assert server.max_in_flight == 3
+
+
+def test_stream_retries_before_the_first_delta(fake_api, make_client):
+    server, url = fake_api(failures=[503])
+    client = make_client(url, max_retries=2)
+    assert ''.join(client.stream_chat(MESSAGES)) == 'Hello there, student! How was your day?'
+    assert server.requests == 2
@@ -0,0 +1,40 @@
+from utils.speech_engines import (BENCHMARK_PHRASES, STTEngine, benchmark_stt, build_corpus, load_corpus,
+                                  wav_duration, word_error_rate)
+
+
+class LookupEngine(STTEngine):
+    """Answers with a clip's transcript minus its last word"""
+
+    name = 'lookup'
+
+    def __init__(self, corpus):
+        super().__init__()
+        self.answers = {audio: transcript for _, audio, transcript in corpus}
+
+    def transcribe(self, audio):
+        return ' '.join(self.answers[audio].split()[:-1])
+
+
+def test_generated_corpus_is_reproducible(tmp_path):
+    assert build_corpus(str(tmp_path / 'a'), 'tone') == 'tone'
+    build_corpus(str(tmp_path / 'b'), 'tone')
+    first, second = load_corpus(str(tmp_path / 'a')), load_corpus(str(tmp_path / 'b'))
+    assert first == second
+    assert [transcript for _, _, transcript in first] == BENCHMARK_PHRASES
+    assert all(wav_duration(audio) > 0.5 for _, audio, _ in first)
+
+
+def test_stt_benchmark_reports_real_time_factor_and_wer(tmp_path):
+    # Tone clips only differ by word count, so pick phrases of different lengths
+    build_corpus(str(tmp_path), 'tone', phrases=['one two', 'one two three four'])
+    corpus = load_corpus(str(tmp_path))
+    result = benchmark_stt(LookupEngine(corpus), corpus, repeat=2)
+    assert result['clips'] == 4
+    assert result['real_time_factor'] < 1
+    assert result['wer'] == round((1 / 2 + 1 / 4) / 2, 3)
+
+
+def test_word_error_rate():
+    assert word_error_rate('the cat sat', 'the cat sat') == 0
+    assert word_error_rate('the cat sat', 'the bat sat down') == 2 / 3
+    assert word_error_rate('', 'noise') == 1
@@ -0,0 +1,200 @@
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from utils import database
+from utils.streaks import advance_streak, compute_streaks, current_streak, local_date
+
+
+class Clock:
+    """Stands in for utils.database.utc_now"""
+
+    def __init__(self):
+        self.now = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+    def __call__(self):
+        return self.now
+
+    def set(self, *args):
+        self.now = datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(database, 'utc_now', clock)
+    return clock
+
+
+@pytest.fixture
+def db(tmp_path):
+    database.set_database_path(str(tmp_path / 'test.db'))
+    database.init_db()
+    yield database
+    database.close_connections()
+
+
+def make_user(db, name, tz):
+    user_id = db.get_or_create_user(name)
+    db.update_user(user_id, timezone=tz)
+    return user_id
+
+
+def live_state(db, user_id):
+    user = db.get_user(user_id)
+    return user['streak'], user['last_active_date'], user['total_points']
+
+
+def recomputed_state(db, user_id):
+    db.recompute_streaks(user_id)
+    return live_state(db, user_id)
+
+
+# Rules
+
+def test_advance_streak_same_next_and_gap_days():
+    day = date(2026, 3, 1)
+    assert advance_streak(0, None, day) == (1, day)
+    assert advance_streak(1, day, day) == (1, day)
+    assert advance_streak(1, day, day + timedelta(days=1)) == (2, day + timedelta(days=1))
+    assert advance_streak(5, day, day + timedelta(days=2)) == (1, day + timedelta(days=2))
+
+
+def test_late_event_leaves_streak_alone():
+    day = date(2026, 3, 10)
+    assert advance_streak(4, day, day - timedelta(days=3)) == (4, day)
+
+
+def test_streak_lapses_after_a_whole_missed_day():
+    day = date(2026, 3, 10)
+    assert current_streak(3, day, day + timedelta(days=1)) == 3
+    assert current_streak(3, day, day + timedelta(days=2)) == 0
+
+
+def test_local_date_across_midnight():
+    at = datetime(2026, 10, 18, 23, 0, tzinfo=timezone.utc)
+    assert local_date(at, 'UTC') == date(2026, 10, 18)
+    assert local_date(at, 'Asia/Tokyo') == date(2026, 10, 19)
+    assert local_date(at, 'America/Los_Angeles') == date(2026, 10, 18)
+    # Naive timestamps are UTC
+    assert local_date(at.replace(tzinfo=None), 'Asia/Tokyo') == date(2026, 10, 19)
+    # Unknown zones fall back to UTC
+    assert local_date(at, 'Not/AZone') == date(2026, 10, 18)
+
+
+def test_local_date_across_dst_change():
+    # New York leaves DST on 2026-11-01: midnight local is 04:00 UTC before, 05:00 UTC after
+    assert local_date(datetime(2026, 11, 1, 3, 59, tzinfo=timezone.utc), 'America/New_York') == date(2026, 10, 31)
+    assert local_date(datetime(2026, 11, 1, 4, 0, tzinfo=timezone.utc), 'America/New_York') == date(2026, 11, 1)
+    assert local_date(datetime(2026, 11, 2, 4, 30, tzinfo=timezone.utc), 'America/New_York') == date(2026, 11, 1)
+    assert local_date(datetime(2026, 11, 2, 5, 0, tzinfo=timezone.utc), 'America/New_York') == date(2026, 11, 2)
+
+
+def test_compute_streaks_runs_per_user():
+    days = np.array(['2026-01-01', '2026-01-02', '2026-01-03', '2026-01-05', '2026-01-06',
+                     '2026-01-01', '2026-01-03'], dtype='datetime64[D]')
+    users = [1, 1, 1, 1, 1, 2, 2]
+    result = compute_streaks(users, days, [1] * 7)
+    assert result[1] == (2, date(2026, 1, 6), 5)
+    assert result[2] == (1, date(2026, 1, 3), 2)
+
+
+# Live updates vs recompute
+
+def test_progress_late_evening_utc_counts_on_the_users_local_day(db, clock):
+    # 23:00 UTC is already the next morning in Tokyo
+    user_id = make_user(db, 'tokyo', 'Asia/Tokyo')
+    clock.set(2026, 10, 17, 23, 0)
+    db.record_progress(user_id, practice_minutes=10)
+    clock.set(2026, 10, 18, 23, 0)
+    db.record_progress(user_id, practice_minutes=10)
+
+    assert [row['date'] for row in db.get_progress(user_id)] == ['2026-10-18', '2026-10-19']
+    live = live_state(db, user_id)
+    assert live == (2, '2026-10-19', 20)
+    assert recomputed_state(db, user_id) == live
+
+
+def test_conversations_across_local_midnight(db, clock):
+    user_id = make_user(db, 'ny', 'America/New_York')
+    # 23:50 and 00:10 New York time (EDT, UTC-4): two local days
+    db.add_conversation(user_id, 'Travel', 'hi', 'hello', timestamp=datetime(2026, 10, 18, 3, 50, tzinfo=timezone.utc))
+    db.add_conversation(user_id, 'Travel', 'hi', 'hello', timestamp=datetime(2026, 10, 18, 4, 10, tzinfo=timezone.utc))
+    live = live_state(db, user_id)
+    assert live[:2] == (2, '2026-10-18')
+    assert recomputed_state(db, user_id) == live
+
+
+def test_same_utc_day_can_be_two_local_days(db, clock):
+    utc_user = make_user(db, 'utc', 'UTC')
+    tokyo_user = make_user(db, 'tokyo', 'Asia/Tokyo')
+    for user_id in (utc_user, tokyo_user):
+        for hour in (10, 16):
+            db.add_conversation(user_id, 'Travel', 'hi', 'hello',
+                                timestamp=datetime(2026, 10, 18, hour, 0, tzinfo=timezone.utc))
+    assert live_state(db, utc_user)[:2] == (1, '2026-10-18')
+    assert live_state(db, tokyo_user)[:2] == (2, '2026-10-19')
+    for user_id in (utc_user, tokyo_user):
+        assert recomputed_state(db, user_id) == live_state(db, user_id)
+
+
+def test_default_timestamps_come_from_the_utc_clock(db, clock):
+    user_id = make_user(db, 'tokyo', 'Asia/Tokyo')
+    clock.set(2026, 10, 18, 23, 30)
+    db.add_conversation(user_id, 'Travel', 'hi', 'hello')
+    db.add_vocabulary(user_id, 'ubiquitous')
+    assert live_state(db, user_id)[1] == '2026-10-19'
+    assert recomputed_state(db, user_id)[1] == '2026-10-19'
+
+
+def test_current_streak_uses_the_users_today(db, clock):
+    user_id = make_user(db, 'tokyo', 'Asia/Tokyo')
+    clock.set(2026, 10, 17, 12, 0)  # 21:00 in Tokyo
+    db.record_progress(user_id, practice_minutes=5)
+    clock.set(2026, 10, 18, 14, 59)  # 23:59 the next day in Tokyo: streak still alive
+    db.invalidate_user_stats(user_id)
+    assert db.get_user_stats(user_id)['streak'] == 1
+    clock.set(2026, 10, 18, 15, 0)  # midnight in Tokyo: a whole day missed
+    db.invalidate_user_stats(user_id)
+    assert db.get_user_stats(user_id)['streak'] == 0
+
+
+def test_events_match_recompute(db, clock):
+    user_id = make_user(db, 'la', 'America/Los_Angeles')
+    start = datetime(2026, 10, 1, 6, 0, tzinfo=timezone.utc)
+    events = [(user_id, 'quiz', None, 5, start + timedelta(hours=h)) for h in (0, 20, 26, 50, 100, 118)]
+    db.append_events(events)
+    live = live_state(db, user_id)
+    assert recomputed_state(db, user_id) == live
+
+
+# Rollups and "today" on the user's local day
+
+def daily_rollups(db, user_id):
+    return [(row['period'], row['practice_minutes'], row['conversations'])
+            for row in db.get_rollups(user_id, 'day')]
+
+
+def test_rollups_agree_with_progress_across_local_midnight(db, clock):
+    user_id = make_user(db, 'tokyo', 'Asia/Tokyo')
+    # 14:30 UTC is 23:30 in Tokyo; 15:30 UTC is 00:30 the next day there
+    for hour, minutes in ((14, 10), (15, 20)):
+        clock.set(2026, 10, 18, hour, 30)
+        db.record_progress(user_id, practice_minutes=minutes)
+        db.add_conversation(user_id, 'Travel', 'hi', 'hello')
+
+    progress = [(row['date'], row['practice_minutes']) for row in db.get_progress(user_id)]
+    assert progress == [('2026-10-18', 10), ('2026-10-19', 20)]
+    live = daily_rollups(db, user_id)
+    assert live == [('2026-10-18', 10, 1), ('2026-10-19', 20, 1)]
+    db.rebuild_rollups(user_id)
+    assert daily_rollups(db, user_id) == live
+
+
+def test_user_today_follows_the_users_timezone(db, clock):
+    utc_user = make_user(db, 'utc', 'UTC')
+    tokyo_user = make_user(db, 'tokyo', 'Asia/Tokyo')
+    clock.set(2026, 10, 18, 23, 0)
+    assert db.user_today(utc_user) == date(2026, 10, 18)
+    assert db.user_today(tokyo_user) == date(2026, 10, 19)
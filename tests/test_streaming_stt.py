@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from utils.speech_engines import STTEngine
+from utils.streaming_stt import EnergyVAD, StreamingRecognizer, iter_pcm_chunks
+
+SR = 16000
+
+
+class StubEngine(STTEngine):
+    name = 'stub'
+
+    def transcribe(self, audio):
+        return 'hello'
+
+
+def pcm(samples):
+    return np.asarray(samples).astype('<i2').tobytes()
+
+
+def voice(seconds, amplitude=8000):
+    """Voiced sound at full level from the first sample, with ~4 Hz syllable modulation"""
+    t = np.arange(int(seconds * SR)) / SR
+    return amplitude * (0.55 + 0.45 * np.cos(2 * np.pi * 4 * t)) * np.sin(2 * np.pi * 150 * t)
+
+
+def noise(seconds, level=60, seed=0):
+    return np.random.default_rng(seed).normal(0, level, int(seconds * SR))
+
+
+def finals(stream):
+    recognizer = StreamingRecognizer(StubEngine(), SR)
+    events = []
+    for chunk in iter_pcm_chunks(pcm(stream), SR, 100):
+        events.extend(recognizer.feed(chunk))
+    events.extend(recognizer.close())
+    return [event for event in events if event['type'] == 'final']
+
+
+def test_speech_from_the_first_frame_is_detected():
+    events = finals(np.concatenate([voice(2.0), noise(1.0)]))
+    assert len(events) == 1
+    assert events[0]['start'] == 0.0
+    assert events[0]['end'] >= 2.0
+
+
+def test_speech_still_open_at_close_is_flushed():
+    events = finals(voice(2.0))
+    assert len(events) == 1
+    assert events[0]['start'] == 0.0
+
+
+def test_speech_after_silence_starts_near_onset():
+    events = finals(np.concatenate([noise(1.0), voice(2.0), noise(1.0)]))
+    assert len(events) == 1
+    # Onset at 1.0 s, minus up to 300 ms of pre-roll
+    assert 0.6 <= events[0]['start'] <= 1.0
+
+
+@pytest.mark.parametrize('level', [60, 2000])
+def test_noise_alone_is_not_speech(level):
+    assert finals(noise(3.0, level)) == []
+
+
+def test_floor_calibrates_from_the_quietest_frames():
+    vad = EnergyVAD(frame_ms=30, calibration_ms=300)
+    frame = SR * 30 // 1000
+    loud = voice(0.3)
+    for i in range(5):
+        vad.process(loud[i * frame:(i + 1) * frame])
+    for i in range(5):
+        vad.process(noise(0.03, 50, seed=i))
+    assert vad.noise_floor < 100
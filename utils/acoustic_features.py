@@ -0,0 +1,263 @@
+"""Acoustic features and pronunciation scores from raw 16-bit PCM.
+
+Everything works on views of the recorded buffer: the PCM bytes are read
+with np.frombuffer and cut into overlapping frames with as_strided, so no
+per-frame copies are made. Every feature is computed across all frames at
+once.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+FRAME_MS = 25
+HOP_MS = 10
+PITCH_RANGE = (75.0, 400.0)  # Hz, covers adult and child voices
+MIN_PAUSE_S = 0.25
+MIN_WORD_GAP_S = 0.08
+
+# Syllables per second considered natural for read-aloud practice
+TARGET_RATE = (3.0, 5.0)
+
+
+def as_samples(audio):
+    """Zero-copy int16 view of PCM bytes, an int16 array or sr.AudioData"""
+    if hasattr(audio, 'get_raw_data'):
+        audio = audio.get_raw_data(convert_width=2)
+    if isinstance(audio, np.ndarray):
+        return audio
+    return np.frombuffer(audio, dtype='<i2')
+
+
+def frame_signal(samples, frame_length, hop_length):
+    """(n_frames, frame_length) strided view over the samples, no copy"""
+    samples = np.ascontiguousarray(samples)
+    if len(samples) < frame_length:
+        return samples[:0].reshape(0, frame_length)
+    n_frames = 1 + (len(samples) - frame_length) // hop_length
+    stride = samples.strides[0]
+    return as_strided(samples, shape=(n_frames, frame_length),
+                      strides=(hop_length * stride, stride), writeable=False)
+
+
+def rms_energy(frames):
+    """Root-mean-square amplitude per frame (in int16 units)"""
+    if not len(frames):
+        return np.zeros(0)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames, dtype=np.float64) / frames.shape[1])
+
+
+def zero_crossing_rate(frames):
+    """Fraction of sign changes per frame"""
+    if not len(frames):
+        return np.zeros(0)
+    signs = np.signbit(frames)
+    return np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+
+
+def autocorrelation_pitch(frames, sample_rate, voiced, fmin=PITCH_RANGE[0], fmax=PITCH_RANGE[1],
+                          threshold=0.3):
+    """Fundamental frequency per frame from the normalized autocorrelation peak (0 = unvoiced)"""
+    pitch = np.zeros(len(frames))
+    index = np.flatnonzero(voiced)
+    if not index.size:
+        return pitch
+    x = frames[index].astype(np.float64)
+    x -= x.mean(axis=1, keepdims=True)
+    n = frames.shape[1]
+    # Autocorrelation of every voiced frame at once via the FFT
+    spectrum = np.fft.rfft(x, n=2 * n, axis=1)
+    corr = np.fft.irfft(spectrum * np.conj(spectrum), axis=1)[:, :n]
+    min_lag = max(1, int(sample_rate / fmax))
+    max_lag = min(n - 1, int(sample_rate / fmin))
+    if min_lag >= max_lag:
+        return pitch
+    window = corr[:, min_lag:max_lag]
+    lags = np.argmax(window, axis=1) + min_lag
+    strength = window[np.arange(len(index)), lags - min_lag] / np.maximum(corr[:, 0], 1e-9)
+    pitch[index] = np.where(strength > threshold, sample_rate / lags, 0.0)
+    return pitch
+
+
+def _runs(mask):
+    """(start, end) index pairs of the True runs in a boolean array"""
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges.reshape(-1, 2)
+
+
+def syllable_peaks(rms, hop_s, voiced, min_distance_s=0.1):
+    """Frame indices of energy peaks, a proxy for syllable nuclei"""
+    if len(rms) < 3:
+        return np.zeros(0, dtype=int)
+    # Smooth over ~50 ms so one vowel gives one peak
+    width = max(1, int(round(0.05 / hop_s)))
+    smooth = np.convolve(rms, np.ones(width) / width, mode='same')
+    is_peak = (smooth[1:-1] > smooth[:-2]) & (smooth[1:-1] >= smooth[2:]) & voiced[1:-1]
+    peaks = np.flatnonzero(is_peak) + 1
+    if not peaks.size:
+        return peaks
+    # Peaks must stand out from the quietest point since the previous peak
+    min_gap = max(1, int(min_distance_s / hop_s))
+    kept = [peaks[0]]
+    for peak in peaks[1:]:
+        if peak - kept[-1] < min_gap:
+            if smooth[peak] > smooth[kept[-1]]:
+                kept[-1] = peak
+            continue
+        valley = smooth[kept[-1]:peak].min()
+        if smooth[peak] - valley > 0.1 * smooth[peak]:
+            kept.append(peak)
+    return np.array(kept)
+
+
+def estimate_syllables(word):
+    """Rough syllable count from vowel groups"""
+    groups = [g for g in ''.join(c if c in 'aeiouy' else ' ' for c in word.lower()).split() if g]
+    count = len(groups)
+    if word.lower().endswith('e') and count > 1:
+        count -= 1
+    return max(1, count)
+
+
+def word_timings(words, segments, rms, hop_s):
+    """Align expected words to voiced segments.
+
+    With one segment per word the mapping is direct; otherwise the voiced
+    time is shared out in proportion to each word's syllable count and each
+    boundary is snapped to the quietest frame nearby.
+    """
+    if not words or not len(segments):
+        return []
+    if len(segments) == len(words):
+        return [{"word": w, "start": round(s * hop_s, 3), "end": round(e * hop_s, 3)}
+                for w, (s, e) in zip(words, segments)]
+
+    start, end = segments[0][0], segments[-1][1]
+    weights = np.array([estimate_syllables(w) for w in words], dtype=float)
+    bounds = start + (end - start) * np.concatenate([[0], np.cumsum(weights) / weights.sum()])
+    snap = max(1, int(0.1 / hop_s))
+    bounds = bounds.astype(int)
+    for i in range(1, len(bounds) - 1):
+        lo, hi = max(bounds[i - 1] + 1, bounds[i] - snap), min(end - 1, bounds[i] + snap)
+        if lo < hi:
+            bounds[i] = lo + int(np.argmin(rms[lo:hi]))
+    return [{"word": w, "start": round(bounds[i] * hop_s, 3), "end": round(bounds[i + 1] * hop_s, 3)}
+            for i, w in enumerate(words)]
+
+
+def _scale(value, low, high):
+    """Map value linearly from [low, high] to [0, 100], clipped"""
+    return float(np.clip((value - low) / (high - low), 0, 1) * 100)
+
+
+def analyze_pcm(audio, sample_rate=16000, text=None):
+    """Features, 0-100 scores and per-word timings for one recording.
+
+    `audio` is 16-bit mono PCM (bytes, int16 array or sr.AudioData); `text`
+    is the phrase the student was reading, used for word timings and
+    syllable coverage.
+    """
+    sample_rate = getattr(audio, 'sample_rate', sample_rate)
+    samples = as_samples(audio)
+    frame_length = sample_rate * FRAME_MS // 1000
+    hop_length = sample_rate * HOP_MS // 1000
+    hop_s = hop_length / sample_rate
+    frames = frame_signal(samples, frame_length, hop_length)
+
+    rms = rms_energy(frames)
+    zcr = zero_crossing_rate(frames)
+    if not len(rms):
+        return None
+
+    # Noise floor from the quietest frames. Speech sits well above it, or
+    # within 20 dB of the loudest frames when there is no silence to measure
+    noise, loud = np.maximum(np.percentile(rms, [10, 90]), 1.0)
+    threshold = max(min(noise * 3.0, loud * 0.1), 150.0)
+    voiced = (rms > threshold) & (zcr < 0.35) & (loud > noise * 2.0)
+    pitch = autocorrelation_pitch(frames, sample_rate, voiced)
+
+    segments = _runs(voiced)
+    # Close tiny gaps inside words
+    gap = int(MIN_WORD_GAP_S / hop_s)
+    merged = []
+    for s, e in segments:
+        if merged and s - merged[-1][1] < gap:
+            merged[-1][1] = e
+        else:
+            merged.append([s, e])
+    segments = np.array(merged, dtype=int).reshape(-1, 2)
+
+    duration = len(samples) / sample_rate
+    if not len(segments):
+        # Nothing clearly above the noise floor: no speech to score
+        return {"duration": round(duration, 2), "speech_duration": 0.0, "voiced": False,
+                "speaking_rate": 0.0, "syllables": 0, "expected_syllables": None,
+                "pause_count": 0, "pause_ratio": 0.0, "mean_pitch": None, "pitch_variation": 0.0,
+                "snr_db": 0.0, "mean_zcr": None,
+                "pronunciation_score": 0, "fluency_score": 0, "clarity_score": 0,
+                "pace_score": 0, "pitch_score": 0, "word_timings": [],
+                "hop_seconds": hop_s, "pitch_track": pitch, "energy_track": rms}
+
+    speech_start, speech_end = segments[0][0], segments[-1][1]
+    speech_duration = (speech_end - speech_start) * hop_s
+    in_speech = np.zeros(len(rms), dtype=bool)
+    in_speech[speech_start:speech_end] = True
+    silent_runs = _runs(in_speech & ~voiced)
+    pause_lengths = (silent_runs[:, 1] - silent_runs[:, 0]) * hop_s if len(silent_runs) else np.zeros(0)
+    pauses = pause_lengths[pause_lengths >= MIN_PAUSE_S]
+    pause_ratio = float(pauses.sum() / speech_duration) if speech_duration else 0.0
+
+    peaks = syllable_peaks(rms, hop_s, voiced)
+    articulation_time = max(speech_duration - pauses.sum(), hop_s)
+    speaking_rate = len(peaks) / articulation_time
+
+    voiced_pitch = pitch[pitch > 0]
+    if voiced_pitch.size > 1:
+        semitones = 12 * np.log2(voiced_pitch / np.median(voiced_pitch))
+        pitch_variation = float(np.std(semitones))
+    else:
+        pitch_variation = 0.0
+
+    snr_db = 20 * np.log10(max(float(np.median(rms[voiced])), 1.0) / noise)
+
+    words = text.split() if text else []
+    expected_syllables = sum(estimate_syllables(w) for w in words)
+    coverage = min(len(peaks), expected_syllables) / expected_syllables if expected_syllables else None
+
+    # Scores: clear signal, natural pace with few long pauses, lively intonation
+    clarity = _scale(snr_db, 10, 35)
+    low, high = TARGET_RATE
+    rate_penalty = max(low - speaking_rate, speaking_rate - high, 0) / low
+    pace = max(0.0, 100 - 100 * rate_penalty)
+    fluency = 0.6 * pace + 0.4 * _scale(0.4 - pause_ratio, 0, 0.4)
+    # 2-6 semitones of movement is natural; flat speech sounds monotone
+    intonation = 100 - _scale(abs(pitch_variation - 4.0), 2.0, 6.0)
+    voicing = _scale(float(np.mean(voiced[speech_start:speech_end])), 0.3, 0.8)
+    if coverage is None:
+        pronunciation = 0.5 * clarity + 0.25 * intonation + 0.25 * voicing
+    else:
+        pronunciation = 0.4 * _scale(coverage, 0.5, 1.0) + 0.3 * clarity + 0.15 * intonation + 0.15 * voicing
+
+    return {
+        "duration": round(duration, 2),
+        "speech_duration": round(speech_duration, 2),
+        "voiced": True,
+        "speaking_rate": round(speaking_rate, 2),
+        "syllables": int(len(peaks)),
+        "expected_syllables": expected_syllables or None,
+        "pause_count": int(len(pauses)),
+        "pause_ratio": round(pause_ratio, 3),
+        "mean_pitch": round(float(np.median(voiced_pitch)), 1) if voiced_pitch.size else None,
+        "pitch_variation": round(pitch_variation, 2),
+        "snr_db": round(float(snr_db), 1),
+        "mean_zcr": round(float(zcr[voiced].mean()), 3),
+        "pronunciation_score": round(pronunciation),
+        "fluency_score": round(fluency),
+        "clarity_score": round(clarity),
+        "pace_score": round(pace),
+        "pitch_score": round(intonation),
+        "word_timings": word_timings(words, segments, rms, hop_s),
+        # Per-frame tracks for plotting
+        "hop_seconds": hop_s,
+        "pitch_track": pitch,
+        "energy_track": rms,
+    }
@@ -1,42 +1,216 @@
-import openai
+import asyncio
+import json
 import os
+import random
+import re
+import time
 from dotenv import load_dotenv
+from utils.openai_client import get_client
+from utils.response_cache import get_response_cache, make_key
+from utils.context_window import ConversationContext, extractive_summary
 
 load_dotenv()
 
+# Rough token budget per grammar batch request (prompt side)
+GRAMMAR_BATCH_TOKENS = 1500
+
 class AIHandler:
     def __init__(self):
         self.api_key = os.getenv('OPENAI_API_KEY')
-        if self.api_key:
-            openai.api_key = self.api_key
-    
-    def get_conversation_response(self, user_message, context=None):
+        self.model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+        self.client = get_client(self.api_key) if self.api_key else None
+        self.cache = get_response_cache()
+        self.last_timing = {}
+
+    def _conversation_messages(self, user_message, context=None, conversation=None):
+        messages = [
+            {"role": "system", "content": "You are a friendly English tutor helping students practice."},
+            {"role": "user", "content": user_message}
+        ]
+
+        if context:
+            messages.insert(1, {"role": "system", "content": f"Context: {context}"})
+
+        if conversation is not None:
+            return conversation.build_messages(messages[:-1], user_message)
+
+        return messages
+
+    async def _aconversation_messages(self, user_message, context=None, conversation=None):
+        # Summarizing is awaited, never a blocking call on the running loop
+        messages = self._conversation_messages(user_message, context)
+        if conversation is None:
+            return messages
+        return await conversation.abuild_messages(messages[:-1], user_message)
+
+    def new_conversation(self, **kwargs):
+        """Start a bounded conversation context that summarizes with this handler"""
+        return ConversationContext(summarizer=self.summarize_turns, asummarizer=self.asummarize_turns, **kwargs)
+
+    def _summary_request(self, previous_summary, turns):
+        transcript = "\n".join(
+            f"{'Student' if t['role'] == 'user' else 'Tutor'}: {t['content']}" for t in turns
+        )
+        prompt = f"Summary so far: {previous_summary or '(none)'}\n\nNew messages:\n{transcript}"
+        messages = [
+            {"role": "system", "content": "Update the summary of this English practice conversation. Keep names, facts and the student's recurring mistakes. Reply with the summary only."},
+            {"role": "user", "content": prompt}
+        ]
+        return messages, make_key('summary', prompt, None, self.model, 0)
+
+    def summarize_turns(self, previous_summary, turns, max_tokens):
+        """Fold conversation turns into a short running summary"""
+        if not self.api_key:
+            return extractive_summary(previous_summary, turns, max_tokens)
+
+        messages, key = self._summary_request(previous_summary, turns)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.client.chat(messages, model=self.model, max_tokens=max_tokens, temperature=0)
+        summary = self._content(response)
+        self.cache.set(key, summary)
+        return summary
+
+    async def asummarize_turns(self, previous_summary, turns, max_tokens):
+        """Async variant of summarize_turns"""
+        if not self.api_key:
+            return extractive_summary(previous_summary, turns, max_tokens)
+
+        messages, key = self._summary_request(previous_summary, turns)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self.client.achat(messages, model=self.model, max_tokens=max_tokens, temperature=0)
+        summary = self._content(response)
+        self.cache.set(key, summary)
+        return summary
+
+    def _grammar_messages(self, text):
+        return [
+            {"role": "system", "content": "You are an English grammar teacher. Correct any grammar mistakes in the text and provide brief feedback."},
+            {"role": "user", "content": f"Text to check: {text}"}
+        ]
+
+    @staticmethod
+    def _content(response):
+        return response['choices'][0]['message']['content'].strip()
+
+    @staticmethod
+    def _parse_grammar(result):
+        # Simple parsing (in real app, you'd want better parsing)
+        return {
+            "corrected": result.split('\n')[0] if '\n' in result else result,
+            "feedback": "Grammar checked by AI"
+        }
+
+    def _conversation_key(self, user_message, context, conversation=None):
+        if conversation is not None:
+            context = f"{context or ''} {conversation.fingerprint()}"
+        return make_key('conversation', user_message, context, self.model, 0.7)
+
+    def _grammar_key(self, text):
+        # Grammar checks depend on exact wording, so only whitespace is folded
+        return make_key('grammar', ' '.join(text.split()), None, self.model, None)
+
+    def get_conversation_response(self, user_message, context=None, use_cache=True, conversation=None):
         """Get AI response for conversation"""
         if not self.api_key:
             return self._get_fallback_response(user_message)
-        
+
+        key = self._conversation_key(user_message, context, conversation)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = self.client.chat(
+                self._conversation_messages(user_message, context, conversation),
+                model=self.model,
+                max_tokens=150,
+                temperature=0.7
+            )
+            content = self._content(response)
+            if use_cache:
+                self.cache.set(key, content)
+            return content
+
+        except Exception as e:
+            print(f"OpenAI API error: {e}")
+            return self._get_fallback_response(user_message)
+
+    async def aget_conversation_response(self, user_message, context=None, use_cache=True, conversation=None):
+        """Async variant of get_conversation_response"""
+        if not self.api_key:
+            return self._get_fallback_response(user_message)
+
+        key = self._conversation_key(user_message, context, conversation)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
         try:
-            messages = [
-                {"role": "system", "content": "You are a friendly English tutor helping students practice."},
-                {"role": "user", "content": user_message}
-            ]
-            
-            if context:
-                messages.insert(1, {"role": "system", "content": f"Context: {context}"})
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
+            response = await self.client.achat(
+                await self._aconversation_messages(user_message, context, conversation),
+                model=self.model,
                 max_tokens=150,
                 temperature=0.7
             )
-            
-            return response.choices[0].message.content.strip()
-        
+            content = self._content(response)
+            if use_cache:
+                self.cache.set(key, content)
+            return content
+
         except Exception as e:
             print(f"OpenAI API error: {e}")
             return self._get_fallback_response(user_message)
-    
+
+    def stream_conversation_response(self, user_message, context=None, use_cache=True, conversation=None):
+        """Yield the AI response for conversation in pieces as it is generated"""
+        start = time.perf_counter()
+        first_token = None
+        key = self._conversation_key(user_message, context, conversation)
+        cached = self.cache.get(key) if self.api_key and use_cache else None
+
+        if not self.api_key:
+            first_token = 0.0
+            yield self._get_fallback_response(user_message)
+        elif cached is not None:
+            first_token = time.perf_counter() - start
+            yield cached
+        else:
+            try:
+                parts = []
+                # Built on the client's loop, where a summary request is awaited
+                messages = self.client.run(self._aconversation_messages(user_message, context, conversation))
+                for delta in self.client.stream_chat(
+                    messages,
+                    model=self.model,
+                    max_tokens=150,
+                    temperature=0.7
+                ):
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    parts.append(delta)
+                    yield delta
+                if use_cache and parts:
+                    self.cache.set(key, ''.join(parts).strip())
+
+            except Exception as e:
+                print(f"OpenAI API error: {e}")
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                    yield self._get_fallback_response(user_message)
+
+        self.last_timing = {
+            "time_to_first_token": first_token,
+            "total": time.perf_counter() - start
+        }
+
     def _get_fallback_response(self, user_message):
         """Fallback response when API is not available"""
         fallback_responses = [
@@ -46,32 +220,151 @@ class AIHandler:
             "That's a great question! What do you think about it?",
             "Interesting perspective! Could you elaborate?"
         ]
-        
-        import random
+
         return random.choice(fallback_responses)
-    
-    def check_grammar(self, text):
+
+    def check_grammar(self, text, use_cache=True):
         """Check grammar of the given text"""
         if not self.api_key:
             return {"corrected": text, "feedback": "No grammar check available. Please check with a teacher."}
-        
+
+        key = self._grammar_key(text)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an English grammar teacher. Correct any grammar mistakes in the text and provide brief feedback."},
-                    {"role": "user", "content": f"Text to check: {text}"}
-                ],
+            response = self.client.chat(
+                self._grammar_messages(text),
+                model=self.model,
                 max_tokens=100
             )
-            
-            result = response.choices[0].message.content.strip()
-            
-            # Simple parsing (in real app, you'd want better parsing)
-            return {
-                "corrected": result.split('\n')[0] if '\n' in result else result,
-                "feedback": "Grammar checked by AI"
+            result = self._parse_grammar(self._content(response))
+            if use_cache:
+                self.cache.set(key, result)
+            return result
+
+        except Exception as e:
+            return {"corrected": text, "feedback": f"Grammar check failed: {str(e)}"}
+
+    async def acheck_grammar(self, text, use_cache=True):
+        """Async variant of check_grammar"""
+        if not self.api_key:
+            return {"corrected": text, "feedback": "No grammar check available. Please check with a teacher."}
+
+        key = self._grammar_key(text)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = await self.client.achat(
+                self._grammar_messages(text),
+                model=self.model,
+                max_tokens=100
+            )
+            result = self._parse_grammar(self._content(response))
+            if use_cache:
+                self.cache.set(key, result)
+            return result
+
+        except Exception as e:
+            return {"corrected": text, "feedback": f"Grammar check failed: {str(e)}"}
+
+    def _grammar_batch_messages(self, items):
+        return [
+            {"role": "system", "content": (
+                "You are an English grammar teacher. For each numbered sentence, correct any "
+                "grammar mistakes and give brief feedback. Reply with JSON only, in the form "
+                '{"results": [{"index": <number>, "corrected": "<text>", "feedback": "<text>"}]}'
+            )},
+            {"role": "user", "content": json.dumps([{"index": i, "text": t} for i, t in items])}
+        ]
+
+    @staticmethod
+    def _estimate_tokens(text):
+        # ~4 characters per token for English, plus per-item JSON overhead
+        return len(text) // 4 + 8
+
+    def _split_batches(self, items, max_tokens):
+        batches, batch, used = [], [], 0
+        for index, text in items:
+            cost = self._estimate_tokens(text)
+            if batch and used + cost > max_tokens:
+                batches.append(batch)
+                batch, used = [], 0
+            batch.append((index, text))
+            used += cost
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def _parse_batch(content):
+        # Models sometimes wrap JSON in a code fence
+        content = re.sub(r'^```(?:json)?|```$', '', content.strip()).strip()
+        results = json.loads(content)
+        if isinstance(results, dict):
+            results = results.get("results", [])
+        return {
+            int(item["index"]): {
+                "corrected": item.get("corrected", ""),
+                "feedback": item.get("feedback") or "Grammar checked by AI"
             }
-        
+            for item in results if "index" in item
+        }
+
+    async def _acheck_batch(self, batch):
+        try:
+            response = await self.client.achat(
+                self._grammar_batch_messages(batch),
+                model=self.model,
+                max_tokens=sum(self._estimate_tokens(t) * 2 for _, t in batch) + 50,
+                temperature=0
+            )
+            parsed = self._parse_batch(self._content(response))
         except Exception as e:
-            return {"corrected": text, "feedback": f"Grammar check failed: {str(e)}"}
\ No newline at end of file
+            print(f"OpenAI API error: {e}")
+            parsed = {}
+
+        # Anything the batch reply dropped is checked on its own, concurrently
+        missing = [(index, text) for index, text in batch if not parsed.get(index)]
+        fallbacks = await asyncio.gather(*(self.acheck_grammar(text, use_cache=False) for _, text in missing))
+        results = {index: parsed[index] for index, _ in batch if parsed.get(index)}
+        results.update((index, result) for (index, _), result in zip(missing, fallbacks))
+        return results
+
+    async def acheck_grammar_batch(self, texts, max_batch_tokens=GRAMMAR_BATCH_TOKENS, use_cache=True):
+        """Check grammar of many texts with as few requests as possible.
+
+        Returns one result per input, in input order.
+        """
+        if not self.api_key:
+            return [self.check_grammar(text) for text in texts]
+
+        results = [None] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            cached = self.cache.get(self._grammar_key(text)) if use_cache else None
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, text))
+
+        batches = self._split_batches(pending, max_batch_tokens)
+        for batch_results in await asyncio.gather(*(self._acheck_batch(b) for b in batches)):
+            for index, result in batch_results.items():
+                results[index] = result
+                if use_cache and not result["feedback"].startswith("Grammar check failed"):
+                    self.cache.set(self._grammar_key(texts[index]), result)
+
+        return results
+
+    def check_grammar_batch(self, texts, max_batch_tokens=GRAMMAR_BATCH_TOKENS, use_cache=True):
+        """Check grammar of many texts with as few requests as possible"""
+        if not self.api_key:
+            return [self.check_grammar(text) for text in texts]
+
+        return self.client.run(self.acheck_grammar_batch(texts, max_batch_tokens, use_cache))
@@ -1,117 +1,114 @@
-import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
-import re
+from utils.grammar_rules import DEFAULT_ENGINE
+from utils.text_analysis import AnalyzedText, analyze_text
 
 class Assessment:
-    def __init__(self):
-        # Download NLTK data if not present
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-    
+    def __init__(self, rule_engine=None):
+        # Tokenizers (NLTK or the regex fallback) load lazily on first use
+        self.rule_engine = rule_engine or DEFAULT_ENGINE
+
+    @staticmethod
+    def _analyze(text):
+        """Accept raw text or an AnalyzedText, tokenizing at most once per content"""
+        return text if isinstance(text, AnalyzedText) else analyze_text(text)
+
+    def assess_all(self, text, audio_features=None):
+        """Run every scorer over a single shared tokenization"""
+        analysis = self._analyze(text)
+        return {
+            "pronunciation": self.assess_pronunciation(analysis, audio_features),
+            "vocabulary": self.assess_vocabulary(analysis),
+            "grammar": self.assess_grammar(analysis)
+        }
+
+    def assess_all_batch(self, texts):
+        """assess_all for many texts: one tokenization each, vocabulary scored in one vectorized pass"""
+        analyses = [self._analyze(text) for text in texts]
+        vocabularies = self.assess_vocabulary_batch(analyses)
+        return [
+            {
+                "pronunciation": self.assess_pronunciation(analysis),
+                "vocabulary": vocabulary,
+                "grammar": self.assess_grammar(analysis)
+            }
+            for analysis, vocabulary in zip(analyses, vocabularies)
+        ]
+
     def assess_pronunciation(self, text, audio_features=None):
-        """Assess pronunciation (simplified version)"""
-        # This is a simplified version. In production, you'd use actual audio analysis
-        
+        """Assess pronunciation from the recording's acoustics (text statistics only without audio)"""
+        analysis = self._analyze(text)
+
         # Calculate word count
-        words = word_tokenize(text)
+        words = analysis.tokens
         word_count = len(words)
-        
+
         # Calculate sentence count
-        sentences = sent_tokenize(text)
-        sentence_count = len(sentences)
-        
+        sentence_count = analysis.sentence_count
+
         # Calculate average word length
         avg_word_length = sum(len(word) for word in words) / word_count if word_count > 0 else 0
-        
+
         # Calculate complexity score (simple heuristic)
         complexity_score = min(100, (word_count * 2) + (sentence_count * 5))
-        
-        return {
+
+        if audio_features is not None and not isinstance(audio_features, dict):
+            # A raw recording: PCM bytes, int16 samples or sr.AudioData
+            from utils.acoustic_features import analyze_pcm
+            audio_features = analyze_pcm(audio_features, text=analysis.text)
+
+        result = {
             "word_count": word_count,
             "sentence_count": sentence_count,
             "avg_word_length": avg_word_length,
             "complexity_score": complexity_score,
-            "pronunciation_score": 85,  # Placeholder
-            "fluency_score": 78,  # Placeholder
-            "clarity_score": 92  # Placeholder
+            "pronunciation_score": None,
+            "fluency_score": None,
+            "clarity_score": None
         }
-    
+        if audio_features:
+            result.update({
+                "pronunciation_score": audio_features["pronunciation_score"],
+                "fluency_score": audio_features["fluency_score"],
+                "clarity_score": audio_features["clarity_score"],
+                # Plain values only (the per-frame tracks are for plotting)
+                "acoustics": {k: v for k, v in audio_features.items()
+                              if k not in ("pitch_track", "energy_track")}
+            })
+        return result
+
     def assess_vocabulary(self, text):
-        """Assess vocabulary usage"""
-        words = word_tokenize(text.lower())
-        
-        # Common words list (simplified)
-        common_words = set([
-            'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
-            'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at'
-        ])
-        
-        # Count unique words
-        unique_words = set(words)
-        
-        # Count uncommon words
-        uncommon_words = [w for w in unique_words if w not in common_words and w.isalpha()]
-        
-        # Calculate vocabulary score
-        total_words = len(words)
-        uncommon_count = len(uncommon_words)
-        
-        if total_words > 0:
-            vocabulary_score = min(100, (uncommon_count / total_words) * 200)
-        else:
-            vocabulary_score = 0
-        
-        return {
-            "total_words": total_words,
-            "unique_words": len(unique_words),
-            "uncommon_words": uncommon_count,
-            "vocabulary_score": vocabulary_score
-        }
-    
+        """Assess vocabulary usage against the word frequency list"""
+        return self.assess_vocabulary_batch([text])[0]
+
+    def assess_vocabulary_batch(self, texts):
+        """Assess vocabulary for many texts in one vectorized pass"""
+        # Imported here so NumPy stays off the import path of utils.assessment
+        from utils.lexicon import get_lexicon
+
+        analyses = [self._analyze(text) for text in texts]
+        return get_lexicon().profile_batch([analysis.tokens for analysis in analyses])
+
     def assess_grammar(self, text):
         """Basic grammar assessment"""
         # This is simplified. In production, use proper grammar checking
-        
-        # Check for common errors
-        errors = []
-        
-        # Check for subject-verb agreement (simplified)
-        if re.search(r'\b(I|you|we|they)\s+(is|was)', text):
-            errors.append("Subject-verb agreement error")
-        
-        # Check for article usage (simplified)
-        if re.search(r'\b(a|an)\s+[aeiouAEIOU]', text):
-            # Check for "a" before vowel sound (should be "an")
-            errors.append("Article usage error")
-        
-        # Check for common mistakes
-        common_mistakes = [
-            (r'\b(i)\b', 'Use "I" instead of "i"'),
-            (r'\b(dont|cant|wont)\b', 'Use contractions properly: don\'t, can\'t, won\'t'),
-            (r'\b(their|there|they\'re)\b', 'Check usage of their/there/they\'re'),
-            (r'\b(your|you\'re)\b', 'Check usage of your/you\'re')
-        ]
-        
-        for pattern, message in common_mistakes:
-            if re.search(pattern, text, re.IGNORECASE):
-                if message not in errors:
-                    errors.append(message)
-        
+        analysis = self._analyze(text)
+
+        # One pass over the text for every rule in utils/grammar_rules.json
+        matches = self.rule_engine.scan(analysis.text)
+        errors = self.rule_engine.messages(matches)
+
         # Calculate grammar score
         error_count = len(errors)
-        sentences = sent_tokenize(text)
-        sentence_count = len(sentences)
-        
+        sentence_count = analysis.sentence_count
+
         if sentence_count > 0:
             grammar_score = max(0, 100 - (error_count * 20))
         else:
             grammar_score = 100
-        
+
         return {
             "error_count": error_count,
             "errors": errors,
+            "matches": matches,
             "sentence_count": sentence_count,
             "grammar_score": grammar_score
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def audio_key(text, lang='en', slow=False, engine='gtts'):
+    """Content address of a synthesized clip"""
+    parts = [engine, lang, bool(slow), text.strip()]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """Content-addressed store for synthesized speech.
+
+    Clips are kept on disk as `<dir>/<key[:2]>/<key>.<ext>` and evicted least
+    recently used once the directory grows past `max_bytes` (reads refresh a
+    file's mtime). A small in-memory tier bounded by `max_memory_bytes` keeps
+    the hottest clips, so repeat playback doesn't touch the disk either.
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, max_memory_bytes=16 * 1024 * 1024,
+                 extension='clip'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.extension = extension
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self._disk_bytes = sum(size for _, size, _ in self._scan())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.{self.extension}')
+
+    def _scan(self):
+        """(mtime, size, path) for every stored clip"""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith('.' + self.extension):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _remember(self, key, data):
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= len(self._memory.pop(key))
+            if len(data) > self.max_memory_bytes:
+                return
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get(self, key):
+        """Return the stored audio bytes for a key, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                self.stats['memory_hits'] += 1
+                return data
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        self._remember(key, data)
+        with self._lock:
+            self.stats['hits'] += 1
+            self.stats['disk_hits'] += 1
+        return data
+
+    def set(self, key, data):
+        """Store audio bytes under a key"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+
+        # Write then rename, so readers never see a partial clip
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._remember(key, data)
+        with self._lock:
+            self._disk_bytes += len(data) - previous
+            over = self._disk_bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _evict(self):
+        """Delete least recently used clips until the store is back under 90% of max_bytes"""
+        files = sorted(self._scan())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            key = os.path.basename(path).rsplit('.', 1)[0]
+            with self._lock:
+                data = self._memory.pop(key, None)
+                if data is not None:
+                    self._memory_bytes -= len(data)
+                self.stats['evictions'] += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    def get_or_render(self, text, render, lang='en', slow=False, engine='gtts'):
+        """Cached audio for a text, calling `render()` for the bytes only on a miss"""
+        key = audio_key(text, lang, slow, engine)
+        data = self.get(key)
+        if data is None:
+            data = render()
+            if data:
+                self.set(key, data)
+        return data
+
+    @property
+    def disk_bytes(self):
+        return self._disk_bytes
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        for _, _, path in self._scan():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """Get the process-wide audio cache, configured from the environment"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache(
+                os.getenv('AUDIO_CACHE_DIR', os.path.join('.cache', 'tts')),
+                max_bytes=int(os.getenv('AUDIO_CACHE_MAX_BYTES', 200 * 1024 * 1024)),
+                max_memory_bytes=int(os.getenv('AUDIO_CACHE_MEMORY_BYTES', 16 * 1024 * 1024)),
+            )
+        return _cache
+
+
+def warm_up(texts, synthesize, lang='en', slow=False, engine='gtts', cache=None):
+    """Pre-render texts into the cache; returns (rendered, already_cached, seconds)"""
+    cache = cache or get_audio_cache()
+    started = time.perf_counter()
+    rendered = cached = 0
+    for text in dict.fromkeys(texts):
+        if cache.get(audio_key(text, lang, slow, engine)) is not None:
+            cached += 1
+            continue
+        data = synthesize(text)
+        if data:
+            cache.set(audio_key(text, lang, slow, engine), data)
+            rendered += 1
+    return rendered, cached, time.perf_counter() - started
+
+
+def warm_up_texts():
+    """Every practice phrase and deck word the pages can play"""
+    from pages.pronunciation import PHRASES
+    from pages.vocabulary import GAME_WORDS, SAMPLE_WORDS, WORD_OF_DAY
+
+    texts = [phrase for phrases in PHRASES.values() for phrase in phrases]
+    texts.extend(word['word'] for word in [WORD_OF_DAY] + SAMPLE_WORDS + GAME_WORDS)
+    texts.append(WORD_OF_DAY['example'])
+    return texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render practice phrases and vocabulary into the TTS cache")
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--slow', action='store_true')
+    args = parser.parse_args(argv)
+
+    from utils.speech_utils import SpeechHandler
+
+    handler = SpeechHandler()
+    rendered, cached, seconds = warm_up(
+        warm_up_texts(), lambda text: handler.synthesize(text, args.lang, args.slow),
+        lang=args.lang, slow=args.slow, engine=handler.engine, cache=handler.audio_cache
+    )
+    print(f"Rendered {rendered} clips ({cached} already cached) in {seconds:.2f}s; "
+          f"cache holds {handler.audio_cache.disk_bytes / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Re-score stored or exported student texts outside Streamlit.
+
+Examples:
+    python -m utils.bulk_assess --from-db
+    python -m utils.bulk_assess --input submissions.jsonl --workers 8
+    python -m utils.bulk_assess --input essays.csv --text-field essay --output scores.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from utils import database
+from utils.assessment import Assessment
+
+_assessment = None
+
+
+def _init_worker():
+    """Build one Assessment per worker process"""
+    global _assessment
+    _assessment = Assessment()
+
+
+def score_texts(texts):
+    """Scores for many texts, in the shape stored in the assessments table"""
+    if _assessment is None:
+        _init_worker()
+    rows = []
+    for result in _assessment.assess_all_batch(texts):
+        grammar, vocabulary, pronunciation = result["grammar"], result["vocabulary"], result["pronunciation"]
+        rows.append({
+            "grammar_score": grammar["grammar_score"],
+            "vocabulary_score": vocabulary["vocabulary_score"],
+            "complexity_score": pronunciation["complexity_score"],
+            "error_count": grammar["error_count"],
+            "word_count": pronunciation["word_count"],
+            "result": result
+        })
+    return rows
+
+
+def _score_chunk(items):
+    """Score a list of (source_id, user_id, text) in a worker"""
+    rows = score_texts([text for _, _, text in items])
+    for (source_id, user_id, _), row in zip(items, rows):
+        row["source_id"] = source_id
+        row["user_id"] = user_id
+    return rows
+
+
+# Submission sources, each yielding (source_id, user_id, text)
+
+def read_jsonl(path, text_field='text', id_field='id', user_field='user_id'):
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            yield item.get(id_field, line_number), item.get(user_field), item.get(text_field) or ''
+
+
+def read_csv(path, text_field='text', id_field='id', user_field='user_id'):
+    with open(path, encoding='utf-8', newline='') as f:
+        for row_number, item in enumerate(csv.DictReader(f), 1):
+            user_id = item.get(user_field)
+            yield (item.get(id_field) or row_number,
+                   int(user_id) if user_id else None,
+                   item.get(text_field) or '')
+
+
+def read_input(path, **fields):
+    """Pick a reader from the file extension (.jsonl/.json or .csv)"""
+    if path.lower().endswith('.csv'):
+        return read_csv(path, **fields)
+    return read_jsonl(path, **fields)
+
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def assess_stream(items, workers=None, chunksize=64):
+    """Score (source_id, user_id, text) items across a process pool.
+
+    Items are sent to the workers in chunks, with a bounded number of chunks
+    in flight, so a corpus of any size is streamed rather than loaded into
+    memory. Results come back in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(items, chunksize)
+    if workers == 1:
+        for chunk in chunks:
+            yield from _score_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_score_chunk, chunk))
+            # Keep every worker busy without queueing the whole corpus
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+class JsonlWriter:
+    """Writes result rows to a JSONL file instead of the database"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8') if path != '-' else sys.stdout
+
+    def __call__(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(row, default=str) + '\n')
+        return len(rows)
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+def run(items, source, write, workers=None, chunksize=64, batch_size=500, progress_every=5.0):
+    """Score items and hand results to `write` in batches; returns (count, seconds)"""
+    started = time.perf_counter()
+    last_report = started
+    count = 0
+    batch = []
+    for row in assess_stream(items, workers=workers, chunksize=chunksize):
+        row["source"] = source
+        batch.append(row)
+        if len(batch) >= batch_size:
+            count += write(batch)
+            batch = []
+            now = time.perf_counter()
+            if progress_every and now - last_report >= progress_every:
+                last_report = now
+                print(f"{count} texts, {count / (now - started):.1f} texts/sec", file=sys.stderr)
+    if batch:
+        count += write(batch)
+    return count, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score student texts in bulk with utils.assessment")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help="JSONL or CSV file of submissions")
+    source.add_argument('--from-db', action='store_true', help="score user turns from the conversations table")
+    parser.add_argument('--user-id', type=int, help="with --from-db, only this user's turns")
+    parser.add_argument('--text-field', default='text')
+    parser.add_argument('--id-field', default='id')
+    parser.add_argument('--user-field', default='user_id')
+    parser.add_argument('--output', help="write results to this JSONL file ('-' for stdout) instead of the database")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=int, default=64, help="texts per work item sent to a worker")
+    parser.add_argument('--batch-size', type=int, default=500, help="results per database transaction")
+    parser.add_argument('--database', help="SQLite file (default: DATABASE_PATH)")
+    args = parser.parse_args(argv)
+
+    if args.database:
+        database.set_database_path(args.database)
+    if args.from_db or not args.output:
+        database.init_db()
+
+    if args.from_db:
+        items = database.iter_conversation_inputs(args.user_id)
+        source_name = 'conversations'
+    else:
+        items = read_input(args.input, text_field=args.text_field,
+                           id_field=args.id_field, user_field=args.user_field)
+        source_name = os.path.basename(args.input)
+
+    writer = JsonlWriter(args.output) if args.output else database.save_assessments
+    try:
+        count, elapsed = run(items, source_name, writer, workers=args.workers,
+                             chunksize=args.chunksize, batch_size=args.batch_size)
+    finally:
+        if args.output:
+            writer.close()
+
+    rate = count / elapsed if elapsed else 0
+    print(f"Scored {count} texts in {elapsed:.2f}s ({rate:.1f} texts/sec)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
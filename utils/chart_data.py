@@ -0,0 +1,64 @@
+"""Columnar chart data from the progress rollup tables.
+
+Daily, weekly and monthly totals are kept up to date by triggers (see
+ROLLUP_TABLES in utils.database). A year of history for one user is
+therefore one primary-key range scan over at most a few hundred rows.
+Results are dicts of NumPy arrays that Plotly takes directly, with no
+pandas frame in between.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from utils.database import ROLLUP_TABLES, get_rollups, user_today
+
+ACTIVITY_COLUMNS = ('practice_minutes', 'new_words', 'accuracy', 'conversations')
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def bucket_axis(start, end, bucket='day'):
+    """First day of every bucket touching [start, end], as datetime64[D]"""
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    if bucket == 'day':
+        return np.arange(start, end + 1)
+    if bucket == 'week':
+        # 1970-01-01 was a Thursday, so Mondays are 4 days off a multiple of 7
+        first = start - (start.astype(int) - 4) % 7
+        return np.arange(first, end + 1, 7)
+    if bucket == 'month':
+        return np.arange(start.astype('datetime64[M]'), end.astype('datetime64[M]') + 1).astype('datetime64[D]')
+    raise ValueError(f"Unknown bucket: {bucket}")
+
+
+def activity(user_id, start=None, end=None, bucket='day', fill=True):
+    """Practice minutes, new words, mean accuracy and conversation turns per bucket.
+
+    The range defaults to the last 30 days, ending today in the user's
+    timezone. Returns
+    {'date': datetime64[D], 'practice_minutes': int, 'new_words': int,
+    'accuracy': float (NaN = no score), 'conversations': int}. With `fill`,
+    buckets without any activity are included as zeros.
+    """
+    if bucket not in ROLLUP_TABLES:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    end = _as_date(end) if end else user_today(user_id)
+    start = _as_date(start) if start else end - timedelta(days=29)
+
+    rows = get_rollups(user_id, bucket, start, end)
+    dates = np.array([row['period'] for row in rows], dtype='datetime64[D]')
+    values = np.array([[row[column] for column in ACTIVITY_COLUMNS] for row in rows],
+                      dtype=np.float64).reshape(-1, len(ACTIVITY_COLUMNS))
+    if fill:
+        axis = bucket_axis(start, end, bucket)
+        filled = np.zeros((len(axis), len(ACTIVITY_COLUMNS)))
+        filled[:, ACTIVITY_COLUMNS.index('accuracy')] = np.nan
+        filled[np.searchsorted(axis, dates)] = values
+        dates, values = axis, filled
+
+    data = {'date': dates}
+    for i, column in enumerate(ACTIVITY_COLUMNS):
+        data[column] = values[:, i] if column == 'accuracy' else np.nan_to_num(values[:, i]).astype(np.int64)
+    return data
@@ -0,0 +1,137 @@
+import hashlib
+import re
+
+_encoding = None
+
+
+def _get_encoding():
+    """Load the tiktoken encoding once, or fall back to a regex tokenizer"""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception:
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text):
+    """Count prompt tokens locally (tiktoken when installed, else an estimate)"""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    # Words and punctuation marks are roughly one token each
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def extractive_summary(previous_summary, turns, max_tokens):
+    """Offline summary: the tail of the transcript that fits the token budget"""
+    lines = [previous_summary] if previous_summary else []
+    for turn in turns:
+        speaker = 'Student' if turn['role'] == 'user' else 'Tutor'
+        lines.append(f"{speaker}: {turn['content']}")
+    words = ' '.join(lines).split()
+
+    kept, used = [], 0
+    for word in reversed(words):
+        used += count_tokens(word)
+        if used > max_tokens:
+            break
+        kept.append(word)
+    return ' '.join(reversed(kept))
+
+
+class ConversationContext:
+    """Bounded prompt context for a running conversation.
+
+    The most recent turns are kept verbatim within `max_turns` and
+    `max_tokens`. Older turns are folded into a running summary, so the
+    prompt size stays roughly constant however long the chat gets.
+    """
+
+    def __init__(self, summarizer=None, max_turns=8, max_tokens=1000, summary_tokens=150, asummarizer=None):
+        self.summarizer = summarizer
+        self.asummarizer = asummarizer
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.turns = []
+        self.summary = ''
+        self._pending = []
+
+    def add(self, role, content):
+        """Record a message ('user' or 'assistant'/'ai')"""
+        role = 'user' if role == 'user' else 'assistant'
+        self.turns.append({'role': role, 'content': content, 'tokens': count_tokens(content)})
+        self._trim()
+
+    def add_turn(self, user_message, ai_response):
+        self.add('user', user_message)
+        self.add('assistant', ai_response)
+
+    def _trim(self):
+        total = sum(turn['tokens'] for turn in self.turns)
+        if len(self.turns) <= self.max_turns and total <= self.max_tokens:
+            return
+        # Evict down to half the limits so summarizing runs every few turns, not every turn
+        while self.turns and (len(self.turns) > self.max_turns // 2 or total > self.max_tokens // 2):
+            turn = self.turns.pop(0)
+            total -= turn['tokens']
+            self._pending.append(turn)
+
+    def _compact(self):
+        """Fold evicted turns into the running summary"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        summary = None
+        if self.summarizer:
+            try:
+                summary = self.summarizer(self.summary, pending, self.summary_tokens)
+            except Exception as e:
+                print(f"Summary error: {e}")
+        self._fold(pending, summary)
+
+    async def _acompact(self):
+        """_compact for event loops: awaits `asummarizer` (extractive summary without one)"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        summary = None
+        if self.asummarizer:
+            try:
+                summary = await self.asummarizer(self.summary, pending, self.summary_tokens)
+            except Exception as e:
+                print(f"Summary error: {e}")
+        self._fold(pending, summary)
+
+    def _fold(self, pending, summary):
+        self.summary = summary or extractive_summary(self.summary, pending, self.summary_tokens)
+
+    def _messages(self, system_messages, user_message):
+        messages = list(system_messages)
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the conversation so far: {self.summary}"})
+        messages.extend({"role": turn['role'], "content": turn['content']} for turn in self.turns)
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def build_messages(self, system_messages, user_message):
+        """Messages for the next request: system prompt, summary, recent turns, new message"""
+        self._compact()
+        return self._messages(system_messages, user_message)
+
+    async def abuild_messages(self, system_messages, user_message):
+        """Async variant of build_messages"""
+        await self._acompact()
+        return self._messages(system_messages, user_message)
+
+    def fingerprint(self):
+        """Stable hash of the context, for response cache keys"""
+        text = self.summary + ''.join(t['role'] + t['content'] for t in self._pending + self.turns)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    @property
+    def token_count(self):
+        return count_tokens(self.summary) + sum(turn['tokens'] for turn in self.turns)
@@ -1,14 +1,314 @@
+import argparse
 import sqlite3
 import json
-from datetime import datetime
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from utils.streaks import (POINTS, POINTS_PER_PRACTICE_MINUTE, advance_streak, compute_streaks,
+                           current_streak, local_date)
 
-def init_db():
-    """Initialize SQLite database"""
-    conn = sqlite3.connect('english_practice.db')
-    c = conn.cursor()
-    
-    # Create users table
-    c.execute('''
+DB_PATH = os.getenv('DATABASE_PATH', 'english_practice.db')
+
+# Pragmas applied to every pooled connection
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,        # ~16 MB page cache per connection
+    'mmap_size': 268435456,      # 256 MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+    'busy_timeout': 5000,
+}
+
+
+class ConnectionPool:
+    """Process-wide pool of long-lived SQLite connections.
+
+    A connection is checked out to a single thread at a time, so callers get
+    thread-affine access without opening a new connection per query.
+    """
+
+    def __init__(self, path, max_idle=8):
+        self.path = path
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()
+        self._all = set()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in PRAGMAS.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        with self._lock:
+            self._all.add(conn)
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._idle.qsize() < self.max_idle:
+            self._idle.put(conn)
+        else:
+            with self._lock:
+                self._all.discard(conn)
+            conn.close()
+
+    def close_all(self):
+        with self._lock:
+            conns, self._all = self._all, set()
+        for conn in conns:
+            conn.close()
+        self._idle = queue.LifoQueue()
+
+
+_pool = ConnectionPool(DB_PATH)
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+
+def set_database_path(path):
+    """Point the data-access layer at another database file"""
+    global DB_PATH, _pool
+    _pool.close_all()
+    DB_PATH = path
+    _pool = ConnectionPool(path)
+
+
+def close_connections():
+    """Close every pooled connection"""
+    _pool.close_all()
+
+
+@contextmanager
+def get_connection():
+    """Borrow a pooled connection for the duration of a block"""
+    conn = _pool.acquire()
+    try:
+        yield conn
+    finally:
+        _pool.release(conn)
+
+
+@contextmanager
+def transaction():
+    """Borrow a pooled connection and commit (or roll back) on exit"""
+    with get_connection() as conn:
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def _data_version_trigger(table, event, user_column='user_id'):
+    """Trigger bumping user_stats.data_version whenever a user's rows in `table` change"""
+    row = 'OLD' if event == 'DELETE' else 'NEW'
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS data_version_{table}_{event.lower()} AFTER {event} ON {table}
+        BEGIN
+            INSERT INTO user_stats (user_id, data_version) VALUES ({row}.{user_column}, 1)
+            ON CONFLICT (user_id) DO UPDATE SET data_version = data_version + 1;
+        END
+        '''
+
+
+# Rollups: progress_daily <- progress + conversations, then
+# progress_weekly / progress_monthly <- progress_daily, all kept by triggers
+ROLLUP_TABLES = {'day': 'progress_daily', 'week': 'progress_weekly', 'month': 'progress_monthly'}
+
+# SQLite expressions for the first day of the week (Monday) or month holding a date
+PERIOD_START = {
+    'week': "date({}, '-6 days', 'weekday 1')",
+    'month': "date({}, 'start of month')",
+}
+
+
+def _rollup_table(table, active_days=True):
+    return f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            user_id INTEGER NOT NULL,
+            period DATE NOT NULL,
+            practice_minutes INTEGER DEFAULT 0,
+            new_words INTEGER DEFAULT 0,
+            accuracy_total REAL DEFAULT 0,
+            accuracy_days INTEGER DEFAULT 0,
+            conversations INTEGER DEFAULT 0,{"""
+            active_days INTEGER DEFAULT 0,""" if active_days else ""}
+            PRIMARY KEY (user_id, period)
+        ) WITHOUT ROWID
+        '''
+
+
+def _rollup_add(table, user_id, period, values):
+    """Upsert adding `values` (column -> SQL expression) onto one rollup row"""
+    columns = ', '.join(values)
+    updates = ', '.join(f'{column} = {column} + excluded.{column}' for column in values)
+    return (f'INSERT INTO {table} (user_id, period, {columns}) '
+            f'VALUES ({user_id}, {period}, {", ".join(values.values())}) '
+            f'ON CONFLICT (user_id, period) DO UPDATE SET {updates};')
+
+
+def _progress_delta(row, sign=''):
+    return {
+        'practice_minutes': f'{sign}COALESCE({row}.practice_minutes, 0)',
+        'new_words': f'{sign}COALESCE({row}.new_words, 0)',
+        'accuracy_total': f'{sign}COALESCE({row}.accuracy, 0)',
+        'accuracy_days': f'{sign}(COALESCE({row}.accuracy, 0) > 0)',
+    }
+
+
+def _rollup_triggers():
+    """Triggers keeping the daily, weekly and monthly rollups in step with every write"""
+    daily = ROLLUP_TABLES['day']
+    day = lambda row: f'{row}.date'
+    turn_day = lambda row: f'{row}.day'  # the turn's local day, stored by the writer
+    triggers = {
+        ('progress', 'INSERT'): [_rollup_add(daily, 'NEW.user_id', day('NEW'), _progress_delta('NEW'))],
+        ('progress', 'UPDATE'): [_rollup_add(daily, 'OLD.user_id', day('OLD'), _progress_delta('OLD', '-')),
+                                 _rollup_add(daily, 'NEW.user_id', day('NEW'), _progress_delta('NEW'))],
+        ('progress', 'DELETE'): [_rollup_add(daily, 'OLD.user_id', day('OLD'), _progress_delta('OLD', '-'))],
+        ('conversations', 'INSERT'): [_rollup_add(daily, 'NEW.user_id', turn_day('NEW'), {'conversations': '1'})],
+        ('conversations', 'UPDATE OF user_id, day'): [
+            _rollup_add(daily, 'OLD.user_id', turn_day('OLD'), {'conversations': '-1'}),
+            _rollup_add(daily, 'NEW.user_id', turn_day('NEW'), {'conversations': '1'})],
+        ('conversations', 'DELETE'): [_rollup_add(daily, 'OLD.user_id', turn_day('OLD'), {'conversations': '-1'})],
+    }
+
+    # Daily rows only ever change in place, so weekly/monthly take the difference
+    active = '(NEW.practice_minutes > 0 OR NEW.conversations > 0)'
+    was_active = '(OLD.practice_minutes > 0 OR OLD.conversations > 0)'
+    columns = ('practice_minutes', 'new_words', 'accuracy_total', 'accuracy_days', 'conversations')
+    inserted = {column: f'NEW.{column}' for column in columns}
+    inserted['active_days'] = active
+    changed = {column: f'NEW.{column} - OLD.{column}' for column in columns}
+    changed['active_days'] = f'{active} - {was_active}'
+    for bucket in ('week', 'month'):
+        period = PERIOD_START[bucket].format('NEW.period')
+        triggers.setdefault((daily, 'INSERT'), []).append(
+            _rollup_add(ROLLUP_TABLES[bucket], 'NEW.user_id', period, inserted))
+        triggers.setdefault((daily, 'UPDATE'), []).append(
+            _rollup_add(ROLLUP_TABLES[bucket], 'NEW.user_id', period, changed))
+
+    statements = []
+    for (table, event), body in triggers.items():
+        name = f"rollup_{table}_{event.split()[0].lower()}"
+        statements.append(f'''
+        CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table}
+        BEGIN
+            {chr(10).join('            ' + line for line in body).strip()}
+        END
+        ''')
+    return statements
+
+
+def _rebuild_rollups(conn, user_id=None):
+    """Recompute the rollups from progress and conversations (one user or everyone)"""
+    where, params = ('WHERE user_id = ?', (user_id,)) if user_id is not None else ('', ())
+    for table in ROLLUP_TABLES.values():
+        conn.execute(f'DELETE FROM {table} {where}', params)
+    # Inserting the daily rows fires the triggers that fill weekly and monthly
+    conn.execute(f'''
+        INSERT INTO {ROLLUP_TABLES['day']}
+            (user_id, period, practice_minutes, new_words, accuracy_total, accuracy_days, conversations)
+        SELECT user_id, day, SUM(minutes), SUM(words), SUM(accuracy), SUM(accuracy > 0), SUM(turns)
+        FROM (
+            SELECT user_id, date AS day, COALESCE(practice_minutes, 0) AS minutes,
+                   COALESCE(new_words, 0) AS words, COALESCE(accuracy, 0) AS accuracy, 0 AS turns
+            FROM progress {where}
+            UNION ALL
+            SELECT user_id, day, 0, 0, 0, 1 FROM conversations {where}
+        )
+        GROUP BY user_id, day
+    ''', params * 2)
+
+
+# Vocabulary search: an FTS5 index over word/meaning/example that reads its
+# text from the vocabulary table (external content), kept in sync by triggers
+VOCABULARY_FTS = 'vocabulary_fts'
+VOCABULARY_SORTS = {
+    'added': 'added_date DESC, id DESC',
+    'alphabetical': 'word COLLATE NOCASE, id',
+    'mastery': 'mastery, id',  # weakest words first
+}
+REVIEW_MASTERY = 50  # words below this mastery need review
+
+
+def _create_vocabulary_search(conn):
+    """Create and fill the FTS5 index; skipped when SQLite was built without FTS5 (search then uses LIKE)"""
+    if not conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0]:
+        return
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {VOCABULARY_FTS} USING fts5(
+            word, meaning, example,
+            content='vocabulary', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    remove = f"INSERT INTO {VOCABULARY_FTS} ({VOCABULARY_FTS}, rowid, word, meaning, example) " \
+             "VALUES ('delete', OLD.id, OLD.word, OLD.meaning, OLD.example);"
+    add = f"INSERT INTO {VOCABULARY_FTS} (rowid, word, meaning, example) " \
+          "VALUES (NEW.id, NEW.word, NEW.meaning, NEW.example);"
+    for name, event, body in (
+        ('insert', 'INSERT', add),
+        ('delete', 'DELETE', remove),
+        # Mastery changes don't touch the index
+        ('update', 'UPDATE OF word, meaning, example', remove + ' ' + add),
+    ):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS vocabulary_fts_{name} AFTER {event} ON vocabulary
+            BEGIN
+                {body}
+            END
+        ''')
+    conn.execute(f"INSERT INTO {VOCABULARY_FTS} ({VOCABULARY_FTS}) VALUES ('rebuild')")
+
+
+def _fts_query(text):
+    """FTS5 MATCH expression requiring every typed term, each as a prefix"""
+    return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', text))
+
+
+def _merge_duplicate_vocabulary(conn):
+    """Fold repeated (user_id, word) rows into the oldest one before the unique index.
+
+    The kept row takes the highest mastery among its duplicates and fills a
+    blank meaning, phonetic or example from the oldest duplicate that has one.
+    """
+    same_word = 'v.user_id = vocabulary.user_id AND v.word = vocabulary.word'
+    fill = ',\n'.join(
+        f"{column} = COALESCE(NULLIF({column}, ''), (SELECT v.{column} FROM vocabulary v "
+        f"WHERE {same_word} AND COALESCE(v.{column}, '') != '' ORDER BY v.id LIMIT 1))"
+        for column in ('meaning', 'phonetic', 'example')
+    )
+    merged = conn.execute(f'''
+        UPDATE vocabulary SET
+            mastery = (SELECT MAX(v.mastery) FROM vocabulary v WHERE {same_word}),
+            {fill}
+        WHERE id IN (SELECT MIN(id) FROM vocabulary GROUP BY user_id, word HAVING COUNT(*) > 1)
+    ''').rowcount
+    removed = conn.execute(
+        'DELETE FROM vocabulary WHERE id NOT IN (SELECT MIN(id) FROM vocabulary GROUP BY user_id, word)'
+    ).rowcount
+    if removed:
+        print(f"Removed {removed} duplicate vocabulary rows, merged into {merged} kept words")
+
+
+# Schema migrations, applied in order and recorded in schema_version
+MIGRATIONS = [
+    (1, 'initial schema', [
+        '''
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT UNIQUE,
@@ -17,10 +317,8 @@ def init_db():
             total_points INTEGER DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-    ''')
-    
-    # Create vocabulary table
-    c.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS vocabulary (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER,
@@ -34,10 +332,8 @@ def init_db():
             added_date TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
-    ''')
-    
-    # Create conversations table
-    c.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS conversations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER,
@@ -48,10 +344,8 @@ def init_db():
             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
-    ''')
-    
-    # Create progress table
-    c.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS progress (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER,
@@ -61,45 +355,800 @@ def init_db():
             accuracy REAL DEFAULT 0,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
+        ''',
+    ]),
+    (2, 'materialized user stats', [
+        '''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            vocabulary_count INTEGER DEFAULT 0,
+            conversation_count INTEGER DEFAULT 0,
+            practice_date DATE,
+            practice_minutes INTEGER DEFAULT 0
+        )
+        ''',
+        '''
+        INSERT OR REPLACE INTO user_stats
+            (user_id, vocabulary_count, conversation_count, practice_date, practice_minutes)
+        SELECT ids.user_id,
+               (SELECT COUNT(*) FROM vocabulary v WHERE v.user_id = ids.user_id),
+               (SELECT COUNT(*) FROM conversations c WHERE c.user_id = ids.user_id),
+               (SELECT MAX(date) FROM progress p WHERE p.user_id = ids.user_id),
+               (SELECT COALESCE(SUM(practice_minutes), 0) FROM progress p
+                WHERE p.user_id = ids.user_id
+                  AND p.date = (SELECT MAX(date) FROM progress q WHERE q.user_id = ids.user_id))
+        FROM (SELECT user_id FROM vocabulary
+              UNION SELECT user_id FROM conversations
+              UNION SELECT user_id FROM progress) ids
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS user_stats_vocabulary_insert AFTER INSERT ON vocabulary
+        BEGIN
+            INSERT INTO user_stats (user_id, vocabulary_count) VALUES (NEW.user_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET vocabulary_count = vocabulary_count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS user_stats_vocabulary_delete AFTER DELETE ON vocabulary
+        BEGIN
+            UPDATE user_stats SET vocabulary_count = vocabulary_count - 1
+            WHERE user_id = OLD.user_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS user_stats_conversations_insert AFTER INSERT ON conversations
+        BEGIN
+            INSERT INTO user_stats (user_id, conversation_count) VALUES (NEW.user_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET conversation_count = conversation_count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS user_stats_conversations_delete AFTER DELETE ON conversations
+        BEGIN
+            UPDATE user_stats SET conversation_count = conversation_count - 1
+            WHERE user_id = OLD.user_id;
+        END
+        ''',
+        # Only the most recent practice day is materialized; older days are
+        # ignored and a newer day resets the running total.
+        '''
+        CREATE TRIGGER IF NOT EXISTS user_stats_progress_insert AFTER INSERT ON progress
+        BEGIN
+            INSERT INTO user_stats (user_id, practice_date, practice_minutes)
+            VALUES (NEW.user_id, NEW.date, NEW.practice_minutes)
+            ON CONFLICT (user_id) DO UPDATE SET
+                practice_minutes = CASE
+                    WHEN practice_date = excluded.practice_date
+                        THEN practice_minutes + excluded.practice_minutes
+                    WHEN practice_date IS NULL OR practice_date < excluded.practice_date
+                        THEN excluded.practice_minutes
+                    ELSE practice_minutes
+                END,
+                practice_date = CASE
+                    WHEN practice_date IS NULL OR practice_date < excluded.practice_date
+                        THEN excluded.practice_date
+                    ELSE practice_date
+                END;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS user_stats_progress_update AFTER UPDATE OF practice_minutes ON progress
+        BEGIN
+            UPDATE user_stats
+            SET practice_minutes = practice_minutes + NEW.practice_minutes - OLD.practice_minutes
+            WHERE user_id = NEW.user_id AND practice_date = NEW.date;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS user_stats_progress_delete AFTER DELETE ON progress
+        BEGIN
+            UPDATE user_stats SET practice_minutes = practice_minutes - OLD.practice_minutes
+            WHERE user_id = OLD.user_id AND practice_date = OLD.date;
+        END
+        ''',
+    ]),
+    (3, 'secondary indexes and unique daily progress', [
+        # Fold duplicate (user_id, date) progress rows into the oldest one
+        '''
+        UPDATE progress SET
+            practice_minutes = (SELECT SUM(p.practice_minutes) FROM progress p
+                                WHERE p.user_id = progress.user_id AND p.date = progress.date),
+            new_words = (SELECT SUM(p.new_words) FROM progress p
+                         WHERE p.user_id = progress.user_id AND p.date = progress.date),
+            accuracy = (SELECT AVG(p.accuracy) FROM progress p
+                        WHERE p.user_id = progress.user_id AND p.date = progress.date)
+        WHERE id IN (SELECT MIN(id) FROM progress GROUP BY user_id, date HAVING COUNT(*) > 1)
+        ''',
+        'DELETE FROM progress WHERE id NOT IN (SELECT MIN(id) FROM progress GROUP BY user_id, date)',
+        _merge_duplicate_vocabulary,
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_progress_user_date ON progress (user_id, date)',
+        'CREATE INDEX IF NOT EXISTS idx_conversations_user_time ON conversations (user_id, timestamp)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_vocabulary_user_word ON vocabulary (user_id, word)',
+    ]),
+    (4, 'stored assessment results', [
+        '''
+        CREATE TABLE IF NOT EXISTS assessments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            user_id INTEGER,
+            grammar_score REAL,
+            vocabulary_score REAL,
+            complexity_score REAL,
+            error_count INTEGER,
+            word_count INTEGER,
+            result TEXT,
+            assessed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        # Re-scoring a text replaces its previous result
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_assessments_source ON assessments (source, source_id)',
+        'CREATE INDEX IF NOT EXISTS idx_assessments_user ON assessments (user_id)',
+    ]),
+    (5, 'per-user data version for cached charts', [
+        'ALTER TABLE user_stats ADD COLUMN data_version INTEGER DEFAULT 0',
+        *[_data_version_trigger(table, event)
+          for table in ('progress', 'vocabulary', 'conversations')
+          for event in ('INSERT', 'UPDATE', 'DELETE')],
+        _data_version_trigger('users', 'UPDATE', user_column='id'),
+    ]),
+    (6, 'daily, weekly and monthly progress rollups', [
+        _rollup_table(ROLLUP_TABLES['day'], active_days=False),
+        _rollup_table(ROLLUP_TABLES['week']),
+        _rollup_table(ROLLUP_TABLES['month']),
+        *_rollup_triggers(),
+        # Filled by migration 10, once conversations carry their local day
+    ]),
+    (7, 'streak tracking in the user\'s timezone', [
+        'ALTER TABLE users ADD COLUMN last_active_date DATE',
+        "ALTER TABLE users ADD COLUMN timezone TEXT DEFAULT 'UTC'",
+        lambda conn: _recompute_streaks(conn),  # backfill; defined with the streak functions below
+    ]),
+    (8, 'append-only activity events', [
+        '''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            kind TEXT NOT NULL,
+            payload TEXT,
+            points INTEGER DEFAULT 0,
+            created_at TIMESTAMP NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_events_user_time ON events (user_id, created_at)',
+        '''
+        CREATE TRIGGER IF NOT EXISTS events_no_update BEFORE UPDATE ON events
+        BEGIN
+            SELECT RAISE(ABORT, 'events are append-only');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS events_no_delete BEFORE DELETE ON events
+        BEGIN
+            SELECT RAISE(ABORT, 'events are append-only');
+        END
+        ''',
+    ]),
+    (9, 'vocabulary search and list indexes', [
+        'CREATE INDEX IF NOT EXISTS idx_vocabulary_user_added ON vocabulary (user_id, added_date)',
+        'CREATE INDEX IF NOT EXISTS idx_vocabulary_user_alpha ON vocabulary (user_id, word COLLATE NOCASE)',
+        'CREATE INDEX IF NOT EXISTS idx_vocabulary_user_mastery ON vocabulary (user_id, mastery)',
+        'CREATE INDEX IF NOT EXISTS idx_vocabulary_user_difficulty ON vocabulary (user_id, difficulty, mastery)',
+        'CREATE INDEX IF NOT EXISTS idx_vocabulary_user_category ON vocabulary (user_id, category, mastery)',
+        _create_vocabulary_search,
+    ]),
+    (10, 'conversation days in the user\'s timezone', [
+        'ALTER TABLE conversations ADD COLUMN day DATE',
+        # Backfill with the conversation rollup triggers out of the way, recreate them on the stored day, recount
+        'DROP TRIGGER IF EXISTS rollup_conversations_insert',
+        'DROP TRIGGER IF EXISTS rollup_conversations_update',
+        'DROP TRIGGER IF EXISTS rollup_conversations_delete',
+        lambda conn: _backfill_conversation_days(conn),  # defined with the timezone helpers below
+        *_rollup_triggers(),
+        _rebuild_rollups,
+    ]),
+]
+
+
+def _current_version(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
     ''')
-    
-    conn.commit()
-    conn.close()
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
 
-def get_user_stats(user_id=1):
-    """Get user statistics"""
-    conn = sqlite3.connect('english_practice.db')
-    c = conn.cursor()
-    
-    # Get user basic info
-    c.execute('SELECT streak, total_points FROM users WHERE id = ?', (user_id,))
-    user = c.fetchone()
-    
-    if user:
-        streak, total_points = user
+
+def migrate(conn):
+    """Apply pending migrations on the given connection"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        current = _current_version(conn)
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                         (version, description))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def init_db():
+    """Initialize SQLite database (runs migrations once per process)"""
+    if DB_PATH in _migrated:
+        return
+    with _migrate_lock:
+        if DB_PATH in _migrated:
+            return
+        with get_connection() as conn:
+            migrate(conn)
+        _migrated.add(DB_PATH)
+
+
+# Streaks and points
+#
+# Timestamps are written as timezone-aware UTC; naive ones are read as UTC.
+# Days (progress dates, last active dates) are calendar days in the user's
+# timezone.
+
+def utc_now():
+    """Current time as an aware UTC datetime, the form every write path stores"""
+    return datetime.now(timezone.utc)
+
+
+def _user_today(conn, user_id, at=None):
+    """Today's date (or the date of `at`) in the user's timezone"""
+    row = conn.execute('SELECT timezone FROM users WHERE id = ?', (user_id,)).fetchone()
+    return local_date(at or utc_now(), row['timezone'] if row else None)
+
+
+def user_today(user_id):
+    """Today's date in the user's timezone; pages use this, never the server clock"""
+    init_db()
+    with get_connection() as conn:
+        return _user_today(conn, user_id)
+
+
+def _backfill_conversation_days(conn):
+    """Store each conversation turn's local day, from its timestamp and the user's timezone"""
+    zones = dict(conn.execute('SELECT id, timezone FROM users').fetchall())
+    rows = conn.execute('SELECT id, user_id, timestamp FROM conversations WHERE timestamp IS NOT NULL').fetchall()
+    conn.executemany('UPDATE conversations SET day = ? WHERE id = ?',
+                     ((str(local_date(row[2], zones.get(row[1]))), row[0]) for row in rows))
+
+
+def _touch_activity(conn, user_id, points, at=None, day=None):
+    """Apply one activity event to the user's streak and points (O(1), inside the caller's transaction)"""
+    row = conn.execute('SELECT streak, last_active_date, timezone FROM users WHERE id = ?',
+                       (user_id,)).fetchone()
+    if row is None:
+        return
+    if day is None:
+        day = local_date(at or utc_now(), row['timezone'])
+    elif isinstance(day, str):
+        day = datetime.fromisoformat(day).date()
+    streak, last_active = advance_streak(row['streak'], row['last_active_date'], day)
+    conn.execute('''
+        UPDATE users SET streak = ?, last_active_date = ?, total_points = total_points + ?
+        WHERE id = ?
+    ''', (streak, str(last_active), points, user_id))
+
+
+def record_activity(user_id, kind, at=None, points=None):
+    """Count an activity (quiz answer, exercise, ...) towards the streak and points"""
+    with transaction() as conn:
+        _touch_activity(conn, user_id, POINTS.get(kind, 0) if points is None else points, at=at)
+    invalidate_user_stats(user_id)
+
+
+def _activity_history(conn, user_id=None):
+    """(user_ids, local days, points) arrays for every stored activity"""
+    import numpy as np
+    import pandas as pd
+
+    where, params = ('WHERE user_id = ?', (user_id,)) if user_id is not None else ('', ())
+    zones = dict(conn.execute('SELECT id, timezone FROM users').fetchall())
+    sources = [
+        f"SELECT user_id, timestamp, {POINTS['conversation']} FROM conversations {where}",
+        f"SELECT user_id, added_date, {POINTS['vocabulary']} FROM vocabulary {where}",
+    ]
+    # The events table arrives in a later migration than the streak backfill
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events'").fetchone():
+        sources.append(f'SELECT user_id, created_at, points FROM events {where}')
+    timed = pd.DataFrame(conn.execute(' UNION ALL '.join(sources), params * len(sources)).fetchall(),
+                         columns=['user_id', 'at', 'points'])
+    timed = timed.dropna()
+    # Timestamps -> local calendar days, one vectorized conversion per timezone
+    stamps = pd.to_datetime(timed['at'], format='ISO8601', utc=True)
+    days = np.empty(len(timed), dtype='datetime64[D]')
+    user_zones = timed['user_id'].map(zones).fillna('UTC').to_numpy()
+    for zone in set(user_zones):
+        mask = user_zones == zone
+        try:
+            local = stamps[mask].dt.tz_convert(zone)
+        except Exception:
+            local = stamps[mask]
+        days[mask] = local.dt.tz_localize(None).to_numpy().astype('datetime64[D]')
+
+    # Progress rows are already local days
+    practice = conn.execute(f'SELECT user_id, date, practice_minutes FROM progress {where}', params).fetchall()
+    return (
+        np.concatenate([timed['user_id'].to_numpy(dtype=np.int64), np.array([r[0] for r in practice], dtype=np.int64)]),
+        np.concatenate([days, np.array([r[1] for r in practice], dtype='datetime64[D]')]),
+        np.concatenate([timed['points'].to_numpy(dtype=np.int64),
+                        np.array([(r[2] or 0) * POINTS_PER_PRACTICE_MINUTE for r in practice], dtype=np.int64)]),
+    )
+
+
+def _recompute_streaks(conn, user_id=None):
+    """Replace streaks, last active days and points with values replayed from the full history"""
+    results = compute_streaks(*_activity_history(conn, user_id))
+    if user_id is None:
+        conn.execute('UPDATE users SET streak = 0, total_points = 0, last_active_date = NULL')
     else:
-        streak, total_points = 0, 0
-    
-    # Get vocabulary count
-    c.execute('SELECT COUNT(*) FROM vocabulary WHERE user_id = ?', (user_id,))
-    vocabulary_count = c.fetchone()[0]
-    
-    # Get today's practice minutes
-    today = datetime.now().date()
-    c.execute('SELECT SUM(practice_minutes) FROM progress WHERE user_id = ? AND date = ?', 
-              (user_id, today))
-    practice_minutes = c.fetchone()[0] or 0
-    
-    # Get conversation count
-    c.execute('SELECT COUNT(*) FROM conversations WHERE user_id = ?', (user_id,))
-    conversation_count = c.fetchone()[0]
-    
-    conn.close()
-    
+        conn.execute('UPDATE users SET streak = 0, total_points = 0, last_active_date = NULL WHERE id = ?',
+                     (user_id,))
+    conn.executemany('UPDATE users SET streak = ?, last_active_date = ?, total_points = ? WHERE id = ?',
+                     [(streak, str(day), points, uid) for uid, (streak, day, points) in results.items()])
+    return len(results)
+
+
+def recompute_streaks(user_id=None):
+    """Backfill streaks and points from stored history; returns the number of users updated"""
+    init_db()
+    with transaction() as conn:
+        count = _recompute_streaks(conn, user_id)
+    invalidate_user_stats(user_id)
+    return count
+
+
+# Users
+
+def get_or_create_user(username, level='B1 Intermediate'):
+    """Return the id of the named user, creating the row if needed"""
+    with transaction() as conn:
+        conn.execute('INSERT OR IGNORE INTO users (username, level) VALUES (?, ?)',
+                     (username, level))
+        row = conn.execute('SELECT id FROM users WHERE username = ?', (username,)).fetchone()
+    return row['id']
+
+
+def get_user(user_id):
+    """Get a user row as a dict (or None)"""
+    with get_connection() as conn:
+        row = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def update_user(user_id, **fields):
+    """Update columns on a user row"""
+    allowed = {'username', 'level', 'streak', 'total_points', 'timezone'}
+    fields = {k: v for k, v in fields.items() if k in allowed}
+    if not fields:
+        return
+    assignments = ', '.join(f'{name} = ?' for name in fields)
+    with transaction() as conn:
+        conn.execute(f'UPDATE users SET {assignments} WHERE id = ?',
+                     (*fields.values(), user_id))
+    invalidate_user_stats(user_id)
+
+
+# Vocabulary
+
+def add_vocabulary(user_id, word, meaning='', phonetic='', example='',
+                   category='General', difficulty='Beginner', mastery=0, added_date=None):
+    """Add a word to a user's vocabulary and return its row id (existing words are kept)"""
+    with transaction() as conn:
+        added_date = added_date or utc_now()
+        cur = conn.execute('''
+            INSERT INTO vocabulary
+                (user_id, word, meaning, phonetic, example, category, difficulty, mastery, added_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, word) DO NOTHING
+        ''', (user_id, word, meaning, phonetic, example, category, difficulty, mastery, added_date))
+        if cur.rowcount:
+            _touch_activity(conn, user_id, POINTS['vocabulary'], at=added_date)
+        row = conn.execute('SELECT id FROM vocabulary WHERE user_id = ? AND word = ?',
+                           (user_id, word)).fetchone()
+    invalidate_user_stats(user_id)
+    return row['id']
+
+
+def get_vocabulary(user_id):
+    """Get all of a user's words, newest first"""
+    with get_connection() as conn:
+        rows = conn.execute('SELECT * FROM vocabulary WHERE user_id = ? ORDER BY added_date DESC',
+                            (user_id,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _vocabulary_filter(conn, user_id, query=None, difficulty=None, needs_review=False):
+    """WHERE clause and parameters shared by the vocabulary list and its count"""
+    clauses, params = ['user_id = ?'], [user_id]
+    if difficulty:
+        clauses.append('difficulty = ?')
+        params.append(difficulty)
+    if needs_review:
+        clauses.append('mastery < ?')
+        params.append(REVIEW_MASTERY)
+    terms = re.findall(r'\w+', query or '')
+    if terms:
+        has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                               (VOCABULARY_FTS,)).fetchone()
+        if has_fts:
+            clauses.append(f'id IN (SELECT rowid FROM {VOCABULARY_FTS} WHERE {VOCABULARY_FTS} MATCH ?)')
+            params.append(_fts_query(query))
+        else:
+            for term in terms:
+                columns = ('word', 'meaning', 'example')
+                clauses.append('(' + ' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in columns) + ')')
+                params.extend(['%' + term.replace('_', '\\_') + '%'] * 3)
+    return ' AND '.join(clauses), params
+
+
+def search_vocabulary(user_id, query=None, difficulty=None, needs_review=False, sort='added',
+                      limit=30, offset=0):
+    """One page of a user's words plus the total number of matches.
+
+    `query` matches words, meanings and examples by word prefix ("amb" finds
+    "ambiguous"); `difficulty` and `needs_review` narrow the list; `sort` is
+    a key of VOCABULARY_SORTS. Returns (rows, total).
+    """
+    if sort not in VOCABULARY_SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    with get_connection() as conn:
+        where, params = _vocabulary_filter(conn, user_id, query, difficulty, needs_review)
+        rows = conn.execute(f'''
+            SELECT * FROM vocabulary WHERE {where}
+            ORDER BY {VOCABULARY_SORTS[sort]} LIMIT ? OFFSET ?
+        ''', (*params, limit, offset)).fetchall()
+        total = conn.execute(f'SELECT COUNT(*) FROM vocabulary WHERE {where}', params).fetchone()[0]
+    return [dict(row) for row in rows], total
+
+
+def get_vocabulary_summary(user_id):
+    """Word count, average mastery and words per category"""
+    with get_connection() as conn:
+        rows = conn.execute('''
+            SELECT COALESCE(category, 'General') AS category, COUNT(*) AS words, SUM(mastery) AS mastery
+            FROM vocabulary WHERE user_id = ?
+            GROUP BY 1 ORDER BY 2 DESC
+        ''', (user_id,)).fetchall()
+    total = sum(row['words'] for row in rows)
     return {
-        'streak': streak,
-        'points': total_points,
-        'vocabulary': vocabulary_count,
-        'practice_time': practice_minutes,
-        'conversations': conversation_count
-    }
\ No newline at end of file
+        'total': total,
+        'average_mastery': sum(row['mastery'] or 0 for row in rows) / total if total else 0,
+        'categories': {row['category']: row['words'] for row in rows},
+    }
+
+
+def update_mastery(user_id, word_id, mastery):
+    """Set the mastery score of a word"""
+    with transaction() as conn:
+        conn.execute('UPDATE vocabulary SET mastery = ? WHERE id = ? AND user_id = ?',
+                     (mastery, word_id, user_id))
+
+
+def delete_vocabulary(user_id, word_id):
+    """Remove a word from a user's vocabulary"""
+    with transaction() as conn:
+        conn.execute('DELETE FROM vocabulary WHERE id = ? AND user_id = ?', (word_id, user_id))
+    invalidate_user_stats(user_id)
+
+
+# Conversations
+
+def _insert_conversation(conn, user_id, topic, user_input, ai_response, feedback, timestamp):
+    """Insert one turn on its local day and score it (inside the caller's transaction)"""
+    if isinstance(feedback, (dict, list)):
+        feedback = json.dumps(feedback)
+    day = _user_today(conn, user_id, at=timestamp)
+    cur = conn.execute('''
+        INSERT INTO conversations (user_id, topic, user_input, ai_response, feedback, timestamp, day)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (user_id, topic, user_input, ai_response, feedback, timestamp, str(day)))
+    _touch_activity(conn, user_id, POINTS['conversation'], day=day)
+    return cur.lastrowid
+
+
+def add_conversation(user_id, topic, user_input, ai_response, feedback=None, timestamp=None):
+    """Store one conversation turn and return its row id"""
+    with transaction() as conn:
+        row_id = _insert_conversation(conn, user_id, topic, user_input, ai_response, feedback,
+                                      timestamp or utc_now())
+    invalidate_user_stats(user_id)
+    return row_id
+
+
+def get_conversations(user_id, limit=50):
+    """Get a user's most recent conversation turns"""
+    with get_connection() as conn:
+        rows = conn.execute('''
+            SELECT * FROM conversations WHERE user_id = ?
+            ORDER BY timestamp DESC LIMIT ?
+        ''', (user_id, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def iter_conversation_inputs(user_id=None, batch_size=1000):
+    """Yield (id, user_id, user_input) for stored conversation turns, streamed in batches"""
+    query = "SELECT id, user_id, user_input FROM conversations WHERE user_input IS NOT NULL AND user_input != ''"
+    params = []
+    if user_id is not None:
+        query += ' AND user_id = ?'
+        params.append(user_id)
+    with get_connection() as conn:
+        cur = conn.execute(query + ' ORDER BY id', params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row['id'], row['user_id'], row['user_input']
+
+
+# Events
+
+def append_events(events):
+    """Append (user_id, kind, payload, points, created_at) events in one transaction.
+
+    Each event also counts towards its user's streak and points. A
+    'conversation' event whose payload holds a turn (topic, user_input,
+    ai_response, feedback) is also stored in the conversations table, which
+    scores it. Returns the number of events written.
+    """
+    events = list(events)
+    if not events:
+        return 0
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT INTO events (user_id, kind, payload, points, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', events)
+        for user_id, kind, payload, points, created_at in events:
+            if user_id is None:
+                continue
+            turn = json.loads(payload) if kind == 'conversation' and payload else None
+            if isinstance(turn, dict) and 'user_input' in turn:
+                _insert_conversation(conn, user_id, turn.get('topic'), turn['user_input'],
+                                     turn.get('ai_response'), turn.get('feedback'), created_at)
+            _touch_activity(conn, user_id, points or 0, at=created_at)
+    for user_id in {event[0] for event in events}:
+        invalidate_user_stats(user_id)
+    return len(events)
+
+
+def get_events(user_id, kind=None, limit=100):
+    """A user's most recent events, newest first"""
+    query = 'SELECT * FROM events WHERE user_id = ?'
+    params = [user_id]
+    if kind:
+        query += ' AND kind = ?'
+        params.append(kind)
+    with get_connection() as conn:
+        rows = conn.execute(query + ' ORDER BY created_at DESC, id DESC LIMIT ?', (*params, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+# Assessments
+
+def save_assessments(rows):
+    """Store many assessment results in one transaction.
+
+    Each row is a dict with source, source_id, user_id, the scores and a
+    `result` dict; an existing result for the same (source, source_id) is
+    replaced.
+    """
+    params = [
+        (row['source'], str(row['source_id']), row.get('user_id'),
+         row.get('grammar_score'), row.get('vocabulary_score'), row.get('complexity_score'),
+         row.get('error_count'), row.get('word_count'), json.dumps(row.get('result')),
+         row.get('assessed_at') or utc_now())
+        for row in rows
+    ]
+    with transaction() as conn:
+        conn.executemany('''
+            INSERT INTO assessments
+                (source, source_id, user_id, grammar_score, vocabulary_score, complexity_score,
+                 error_count, word_count, result, assessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (source, source_id) DO UPDATE SET
+                user_id = excluded.user_id,
+                grammar_score = excluded.grammar_score,
+                vocabulary_score = excluded.vocabulary_score,
+                complexity_score = excluded.complexity_score,
+                error_count = excluded.error_count,
+                word_count = excluded.word_count,
+                result = excluded.result,
+                assessed_at = excluded.assessed_at
+        ''', params)
+    return len(params)
+
+
+def get_assessments(user_id, limit=50):
+    """Get a user's most recent stored assessments"""
+    with get_connection() as conn:
+        rows = conn.execute('''
+            SELECT * FROM assessments WHERE user_id = ?
+            ORDER BY assessed_at DESC LIMIT ?
+        ''', (user_id, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+# Progress
+
+def record_progress(user_id, practice_minutes=0, new_words=0, accuracy=None, date=None):
+    """Add practice time and new words to a user's progress for a day (default: today in their timezone)"""
+    with transaction() as conn:
+        date = date or _user_today(conn, user_id)
+        conn.execute('''
+            INSERT INTO progress (user_id, date, practice_minutes, new_words, accuracy)
+            VALUES (?, ?, ?, ?, COALESCE(?, 0))
+            ON CONFLICT (user_id, date) DO UPDATE SET
+                practice_minutes = practice_minutes + excluded.practice_minutes,
+                new_words = new_words + excluded.new_words,
+                accuracy = COALESCE(?, accuracy)
+        ''', (user_id, date, practice_minutes, new_words, accuracy, accuracy))
+        # Same local day as the progress row, so live and recomputed streaks agree
+        _touch_activity(conn, user_id, practice_minutes * POINTS_PER_PRACTICE_MINUTE, day=date)
+    invalidate_user_stats(user_id)
+
+
+def get_progress(user_id, start_date=None, end_date=None):
+    """Get a user's daily progress rows, oldest first"""
+    query = 'SELECT * FROM progress WHERE user_id = ?'
+    params = [user_id]
+    if start_date:
+        query += ' AND date >= ?'
+        params.append(start_date)
+    if end_date:
+        query += ' AND date <= ?'
+        params.append(end_date)
+    with get_connection() as conn:
+        rows = conn.execute(query + ' ORDER BY date', params).fetchall()
+    return [dict(row) for row in rows]
+
+
+# Rollups
+
+def rebuild_rollups(user_id=None):
+    """Recompute the progress rollups from scratch, e.g. after bulk edits or imports"""
+    init_db()
+    with transaction() as conn:
+        _rebuild_rollups(conn, user_id)
+        count = conn.execute(f'SELECT COUNT(*) FROM {ROLLUP_TABLES["day"]}').fetchone()[0]
+    return count
+
+
+def get_rollups(user_id, period='week', start=None, end=None):
+    """Rollup rows for a user ('day', 'week' or 'month'), oldest first.
+
+    `start` may fall mid-period; the period containing it is included.
+    """
+    init_db()
+    query = f'''
+        SELECT period, practice_minutes, new_words, conversations,
+               accuracy_total / NULLIF(accuracy_days, 0) AS accuracy
+        FROM {ROLLUP_TABLES[period]} WHERE user_id = ?
+    '''
+    params = [user_id]
+    if start:
+        query += f" AND period >= {PERIOD_START[period].format('?') if period in PERIOD_START else '?'}"
+        params.append(str(start))
+    if end:
+        query += ' AND period <= ?'
+        params.append(str(end))
+    with get_connection() as conn:
+        return conn.execute(query + ' ORDER BY period', params).fetchall()
+
+
+def get_progress_totals(user_id):
+    """All-time practice minutes, new words, conversations, mean accuracy and active days"""
+    init_db()
+    with get_connection() as conn:
+        row = conn.execute(f'''
+            SELECT COALESCE(SUM(practice_minutes), 0) AS practice_minutes,
+                   COALESCE(SUM(new_words), 0) AS new_words,
+                   COALESCE(SUM(conversations), 0) AS conversations,
+                   SUM(accuracy_total) / NULLIF(SUM(accuracy_days), 0) AS accuracy,
+                   COALESCE(SUM(active_days), 0) AS active_days
+            FROM {ROLLUP_TABLES['month']} WHERE user_id = ?
+        ''', (user_id,)).fetchone()
+    return dict(row)
+
+
+# User stats
+
+STATS_TTL = 30  # seconds
+_stats_cache = {}
+_stats_lock = threading.Lock()
+
+
+def invalidate_user_stats(user_id=None):
+    """Drop cached stats for one user (or everyone)"""
+    with _stats_lock:
+        if user_id is None:
+            _stats_cache.clear()
+        else:
+            _stats_cache.pop(user_id, None)
+
+
+def get_user_stats(user_id=1):
+    """Get user statistics (cached, refreshed on write or after STATS_TTL)"""
+    now = time.monotonic()
+    with _stats_lock:
+        cached = _stats_cache.get(user_id)
+    if cached and cached[0] > now:
+        return dict(cached[1])
+
+    init_db()
+
+    # One lookup against the users row and the trigger-maintained stats row
+    with get_connection() as conn:
+        row = conn.execute('''
+            SELECT u.streak, u.total_points, u.level, u.last_active_date, u.timezone,
+                   s.vocabulary_count, s.conversation_count,
+                   s.practice_date, s.practice_minutes
+            FROM (SELECT ? AS id) k
+            LEFT JOIN users u ON u.id = k.id
+            LEFT JOIN user_stats s ON s.user_id = k.id
+        ''', (user_id,)).fetchone()
+
+    today = local_date(utc_now(), row['timezone'])
+    stats = {
+        # A streak lapses once a whole day in the user's timezone passes without activity
+        'streak': current_streak(row['streak'], row['last_active_date'], today),
+        'points': row['total_points'] or 0,
+        'vocabulary': row['vocabulary_count'] or 0,
+        'practice_time': (row['practice_minutes'] or 0) if row['practice_date'] == str(today) else 0,
+        'conversations': row['conversation_count'] or 0,
+        'level': row['level'] or 'B1 Intermediate'
+    }
+
+    with _stats_lock:
+        _stats_cache[user_id] = (now + STATS_TTL, stats)
+    return dict(stats)
+
+
+def get_data_version(user_id):
+    """Counter that changes whenever the user's progress, vocabulary, conversations or profile change"""
+    init_db()
+    with get_connection() as conn:
+        row = conn.execute('SELECT data_version FROM user_stats WHERE user_id = ?',
+                           (user_id,)).fetchone()
+    return (row['data_version'] or 0) if row else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Database maintenance")
+    commands = parser.add_subparsers(dest='command', required=True)
+    rebuild = commands.add_parser('rebuild-rollups', help="recompute the daily/weekly/monthly progress rollups")
+    rebuild.add_argument('--user-id', type=int, help="only this user's rollups")
+    streaks = commands.add_parser('recompute-streaks', help="replay stored activity into streaks and points")
+    streaks.add_argument('--user-id', type=int, help="only this user")
+    parser.add_argument('--database', help="SQLite file (default: DATABASE_PATH)")
+    args = parser.parse_args(argv)
+
+    if args.database:
+        set_database_path(args.database)
+    started = time.perf_counter()
+    if args.command == 'rebuild-rollups':
+        count = rebuild_rollups(args.user_id)
+        print(f"Rebuilt rollups ({count} daily rows) in {time.perf_counter() - started:.2f}s")
+    elif args.command == 'recompute-streaks':
+        count = recompute_streaks(args.user_id)
+        print(f"Recomputed streaks and points for {count} users in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Append-only activity log with batched, off-thread writes.
+
+Pages call `record_event()`, which only puts the event on an in-process
+queue. A writer thread drains the queue and appends to the `events` table
+in one transaction per batch: every `batch_size` events or every
+`flush_interval` seconds, whichever comes first. A rerun therefore never
+waits on a database write. Pending events are flushed at interpreter exit.
+Conversation turns are persisted the same way (see `record_conversation()`).
+"""
+import atexit
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from utils import database
+from utils.streaks import POINTS
+
+
+class EventLog:
+    """Queue in front of database.append_events, written by one background thread"""
+
+    def __init__(self, batch_size=200, flush_interval=0.25, max_pending=10000, write=None, retries=3):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self._write = write or database.append_events
+        # Bounded so a stalled database applies back-pressure instead of growing memory
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {'recorded': 0, 'written': 0, 'batches': 0, 'dropped': 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='event-log-writer', daemon=True)
+                self._thread.start()
+
+    def record(self, user_id, kind, payload=None, points=None, at=None):
+        """Queue one event; returns immediately unless max_pending events are already waiting"""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        at = at or datetime.now(timezone.utc)
+        self._queue.put((
+            user_id,
+            kind,
+            json.dumps(payload, default=str) if payload is not None else None,
+            POINTS.get(kind, 0) if points is None else points,
+            at,
+        ))
+        self.stats['recorded'] += 1
+
+    def _take_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            # When stopping, take whatever is queued without waiting
+            remaining = 0 if self._stop.is_set() else deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        try:
+            for attempt in range(self.retries):
+                try:
+                    self._write(batch)
+                    self.stats['written'] += len(batch)
+                    self.stats['batches'] += 1
+                    return
+                except Exception as e:
+                    print(f"Event log write error (attempt {attempt + 1}): {e}")
+                    time.sleep(0.05 * (attempt + 1))
+            self.stats['dropped'] += len(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._take_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def flush(self):
+        """Block until every event recorded so far has been written"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self, timeout=10):
+        """Write out everything still queued and stop the writer thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        # No writer (never started or already gone): drain here
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._write_batch(batch)
+
+
+_event_log = None
+_event_log_lock = threading.Lock()
+
+
+def get_event_log():
+    """Get the process-wide event log, flushed automatically at exit"""
+    global _event_log
+    with _event_log_lock:
+        if _event_log is None:
+            _event_log = EventLog()
+            atexit.register(_event_log.close)
+        return _event_log
+
+
+def record_event(user_id, kind, payload=None, points=None):
+    """Queue an activity event (conversation, vocabulary, quiz, exercise, ...)"""
+    get_event_log().record(user_id, kind, payload, points)
+
+
+def record_conversation(user_id, topic, user_input, ai_response, feedback=None):
+    """Queue a conversation turn; the writer thread also stores it in the conversations table.
+
+    The stored turn earns the conversation points, so the event itself
+    carries none.
+    """
+    record_event(user_id, 'conversation', {'topic': topic, 'user_input': user_input,
+                                           'ai_response': ai_response, 'feedback': feedback}, points=0)
+
+
+def record_answer(user_id, kind, question, answer, correct, seen, default=None):
+    """Log a quiz or exercise answer once per change.
+
+    Streamlit re-evaluates every widget on each rerun, so `seen` (a dict
+    kept in session state) remembers the last answer logged per question.
+    `default` is a widget's preselected value (e.g. a radio's first option),
+    which isn't logged until the student changes it.
+    """
+    if not answer or answer == seen.get(question, default):
+        return False
+    seen[question] = answer
+    record_event(user_id, kind, {'question': question, 'answer': answer, 'correct': bool(correct)},
+                 points=POINTS.get(kind, 0) if correct else 0)
+    return True
@@ -0,0 +1,161 @@
+import json
+import os
+import re
+from collections import namedtuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), 'grammar_rules.json')
+
+Rule = namedtuple('Rule', ['id', 'pattern', 'message', 'ignore_case'])
+
+
+def load_rules(path):
+    """Load rules from a JSON file: a list of {id, pattern, message, ignore_case}"""
+    with open(path, encoding='utf-8') as f:
+        return [
+            Rule(item['id'], item['pattern'], item['message'], item.get('ignore_case', False))
+            for item in json.load(f)
+        ]
+
+
+def _first_chars(items, ignore_case):
+    """Characters a parsed pattern can start with, or None if unknown"""
+    c = sre_parse
+    for op, av in items:
+        if op is c.AT:
+            continue
+        if op is c.LITERAL:
+            chars = {chr(av)}
+        elif op is c.IN:
+            chars = set()
+            for in_op, in_av in av:
+                if in_op is c.LITERAL:
+                    chars.add(chr(in_av))
+                elif in_op is c.RANGE and in_av[1] - in_av[0] < 256:
+                    chars.update(chr(i) for i in range(in_av[0], in_av[1] + 1))
+                else:
+                    return None
+        elif op is c.SUBPATTERN:
+            group_ignore_case = ignore_case or bool(av[1] & re.IGNORECASE)
+            return _first_chars(av[-1], group_ignore_case)
+        elif op is c.BRANCH:
+            chars = set()
+            for branch in av[1]:
+                branch_chars = _first_chars(branch, ignore_case)
+                if not branch_chars:
+                    return None
+                chars |= branch_chars
+            return chars
+        elif op in (c.MAX_REPEAT, c.MIN_REPEAT) and av[0] > 0:
+            return _first_chars(av[2], ignore_case)
+        else:
+            return None
+        if ignore_case:
+            chars |= {ch.swapcase() for ch in chars}
+        return chars
+    return None
+
+
+def _starts_at_word_boundary(items):
+    for op, av in items:
+        if op is sre_parse.AT:
+            return av is sre_parse.AT_BOUNDARY
+        if op is sre_parse.SUBPATTERN:
+            return _starts_at_word_boundary(av[-1])
+        return False
+    return False
+
+
+class RuleEngine:
+    """Runs every grammar rule over a text in a single regex pass.
+
+    All rules are compiled into one alternation wrapped in a lookahead, so
+    the scan visits each position once and still reports rules that overlap
+    or start inside another rule's match. When the rules allow it, the scan
+    is guarded by a word boundary and the set of possible first characters,
+    which lets the regex engine skip most positions cheaply.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._patterns = [
+            re.compile(rule.pattern, re.IGNORECASE if rule.ignore_case else 0)
+            for rule in self.rules
+        ]
+
+        alternatives = []
+        self._group_rule = {}
+        self._outer_group = []
+        group = 0
+        for index, (rule, pattern) in enumerate(zip(self.rules, self._patterns)):
+            flags = '(?i:' if rule.ignore_case else '(?:'
+            alternatives.append(f'({flags}{rule.pattern}))')
+            self._outer_group.append(group + 1)
+            # The rule's own group plus any groups inside its pattern
+            for offset in range(pattern.groups + 1):
+                self._group_rule[group + 1 + offset] = index
+            group += pattern.groups + 1
+
+        guard = ''
+        parsed = [sre_parse.parse(rule.pattern) for rule in self.rules]
+        first = [_first_chars(p, rule.ignore_case) for p, rule in zip(parsed, self.rules)]
+        if self.rules and all(first):
+            chars = ''.join(sorted(set().union(*first)))
+            guard = f'(?=[{re.escape(chars)}])'
+            if all(_starts_at_word_boundary(p) for p in parsed):
+                guard += r'\b'
+        self._combined = re.compile(guard + '(?=' + '|'.join(alternatives) + ')')
+
+    @classmethod
+    def from_files(cls, *paths):
+        rules = []
+        for path in paths:
+            rules.extend(load_rules(path))
+        return cls(rules)
+
+    def _hit(self, index, start, end, text):
+        rule = self.rules[index]
+        return {
+            "rule": rule.id,
+            "message": rule.message,
+            "start": start,
+            "end": end,
+            "text": text[start:end]
+        }
+
+    def scan(self, text):
+        """Return every rule hit as a dict with rule id, message and span"""
+        hits = []
+        for m in self._combined.finditer(text):
+            pos = m.start()
+            first = self._group_rule[m.lastindex]
+            hits.append(self._hit(first, pos, m.end(self._outer_group[first]), text))
+
+            # Later alternatives may also match at this position
+            for index in range(first + 1, len(self.rules)):
+                other = self._patterns[index].match(text, pos)
+                if other:
+                    hits.append(self._hit(index, pos, other.end(), text))
+        return hits
+
+    def messages(self, hits):
+        """Distinct messages for a list of hits, in rule order"""
+        seen = {hit["rule"] for hit in hits}
+        return [rule.message for rule in self.rules if rule.id in seen]
+
+
+def _default_paths():
+    paths = [DEFAULT_RULES_PATH]
+    # Extra rule files, separated like PATH entries
+    extra = os.getenv('GRAMMAR_RULES_PATH')
+    if extra:
+        paths.extend(p for p in extra.split(os.pathsep) if p)
+    return paths
+
+
+# Compiled once at import
+DEFAULT_ENGINE = RuleEngine.from_files(*_default_paths())
@@ -0,0 +1,207 @@
+"""Word frequency ranks, CEFR bands and vectorized vocabulary scoring.
+
+The bundled list (assets/word_frequency.npy) is the top 50,000 English words
+from wordfreq, packed as one uint8 array of newline-separated words in rank
+order so it loads with a single memory-mapped read. It is CC BY-SA 4.0 data,
+not MIT; see assets/NOTICE. Rebuild it with:
+
+    python -m utils.lexicon --build   # needs `pip install wordfreq`
+"""
+import argparse
+import os
+import re
+import threading
+
+import numpy as np
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'word_frequency.npy')
+
+# Approximate CEFR bands by frequency rank (upper rank of each band)
+CEFR_BANDS = (('A1', 1000), ('A2', 2000), ('B1', 3500), ('B2', 6000), ('C1', 10000), ('C2', None))
+OFF_LIST = 'Off-list'
+
+# Words past this rank count as advanced, past RARE_RANK as rare
+ADVANCED_RANK = 2000
+RARE_RANK = 6000
+
+
+class Lexicon:
+    """Frequency-rank word list with vectorized scoring.
+
+    Word lookups go through a hash table (cheaper than converting tokens
+    to a NumPy string array for a binary search); everything after the
+    lookup works on integer rank arrays for the whole batch at once.
+    Rank 0 means the word is not on the list.
+    """
+
+    def __init__(self, words):
+        words = list(words)
+        # Built from the end so a repeated word keeps its first (best) rank
+        self._rank_of = dict(zip(reversed(words), range(len(words), 0, -1)))
+        self.size = len(self._rank_of)
+        self._band_edges = np.array([limit for _, limit in CEFR_BANDS[:-1]], dtype=np.int32)
+        self.bands = [name for name, _ in CEFR_BANDS] + [OFF_LIST]
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_LEXICON_PATH):
+        """Load a word list in rank order: a packed .npy, or text with one word per line ('#' lines are comments)"""
+        if path.endswith('.npy'):
+            return cls(np.load(path, mmap_mode='r').tobytes().decode('utf-8').split('\n'))
+        return cls(read_word_list(path))
+
+    @staticmethod
+    def pack(words, path):
+        """Write words in rank order as a packed .npy list"""
+        np.save(path, np.frombuffer('\n'.join(words).encode('utf-8'), dtype=np.uint8))
+
+    def ranks(self, words):
+        """Frequency rank of each word (1 = most frequent, 0 = not listed)"""
+        get = self._rank_of.get
+        return np.array([get(word, 0) for word in words], dtype=np.int32)
+
+    def rank(self, word):
+        return int(self.ranks([word.lower()])[0])
+
+    def band_indices(self, ranks):
+        """Index into `self.bands` for each rank; unlisted words get the Off-list band"""
+        ranks = np.asarray(ranks)
+        bands = np.searchsorted(self._band_edges, ranks, side='left')
+        return np.where(ranks > 0, bands, len(self.bands) - 1)
+
+    def band(self, word):
+        return self.bands[int(self.band_indices([self.rank(word)])[0])]
+
+    def profile_batch(self, token_lists):
+        """Lexical profile of many tokenized texts at once.
+
+        The alphabetic tokens of every text are looked up together and
+        scored with array operations over the whole batch; returns one dict per text with word counts,
+        type-token ratio, advanced/rare/off-list shares, the CEFR band
+        distribution and an estimated level.
+        """
+        words = [[token.lower() for token in tokens if token.isalpha()] for tokens in token_lists]
+        n_texts = len(words)
+        n_bands = len(self.bands)
+        lengths = np.array([len(w) for w in words], dtype=np.int64)
+        flat = [word for text_words in words for word in text_words]
+
+        text_ids = np.repeat(np.arange(n_texts), lengths)
+        ranks = self.ranks(flat)
+        bands = self.band_indices(ranks)
+
+        band_counts = np.bincount(text_ids * n_bands + bands, minlength=n_texts * n_bands)
+        band_counts = band_counts.reshape(n_texts, n_bands)
+
+        # Distinct (text, word) pairs give the number of types per text
+        ids = {}
+        word_ids = np.array([ids.setdefault(word, len(ids)) for word in flat], dtype=np.int64)
+        pairs = np.unique(text_ids * max(len(ids), 1) + word_ids)
+        types = np.bincount(pairs // max(len(ids), 1), minlength=n_texts)
+
+        known = ranks > 0
+        advanced = np.bincount(text_ids, weights=known & (ranks > ADVANCED_RANK), minlength=n_texts)
+        rare = np.bincount(text_ids, weights=known & (ranks > RARE_RANK), minlength=n_texts)
+        off_list = band_counts[:, -1]
+
+        safe_lengths = np.maximum(lengths, 1)
+        ttr = types / safe_lengths
+        advanced_share = advanced / safe_lengths
+        rare_share = rare / safe_lengths
+        off_list_share = off_list / safe_lengths
+        # Varied wording and words past the A2 core both raise the score
+        scores = np.where(lengths > 0, np.minimum(100, 60 * ttr + 200 * advanced_share), 0)
+
+        levels = self._estimate_levels(text_ids, ranks, n_texts)
+        distributions = band_counts / safe_lengths[:, None]
+
+        return [
+            {
+                "total_words": int(lengths[i]),
+                "unique_words": int(types[i]),
+                "uncommon_words": int(advanced[i]),
+                "type_token_ratio": round(float(ttr[i]), 3),
+                "advanced_word_share": round(float(advanced_share[i]), 3),
+                "rare_word_share": round(float(rare_share[i]), 3),
+                "off_list_share": round(float(off_list_share[i]), 3),
+                "cefr_distribution": {band: round(float(share), 3)
+                                      for band, share in zip(self.bands, distributions[i])},
+                "cefr_level": levels[i],
+                "vocabulary_score": round(float(scores[i]), 1)
+            }
+            for i in range(n_texts)
+        ]
+
+    def _estimate_levels(self, text_ids, ranks, n_texts, coverage=0.9):
+        """Band needed to cover `coverage` of each text's listed words"""
+        known = ranks > 0
+        text_ids, ranks = text_ids[known], ranks[known]
+        levels = [None] * n_texts
+        if not ranks.size:
+            return levels
+        # Sort by text, then rank; each text's words are then a contiguous run
+        order = np.lexsort((ranks, text_ids))
+        text_ids, ranks = text_ids[order], ranks[order]
+        starts = np.searchsorted(text_ids, np.arange(n_texts), side='left')
+        ends = np.searchsorted(text_ids, np.arange(n_texts), side='right')
+        has_words = ends > starts
+        picks = starts + np.ceil((ends - starts) * coverage).astype(np.int64) - 1
+        picks = np.clip(picks, starts, np.maximum(ends - 1, starts))
+        bands = self.band_indices(ranks[np.minimum(picks, len(ranks) - 1)])
+        for i in np.flatnonzero(has_words):
+            levels[i] = self.bands[int(bands[i])]
+        return levels
+
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon():
+    """The process-wide lexicon, loaded on first use (LEXICON_PATH overrides the bundled list)"""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = Lexicon.from_file(os.getenv('LEXICON_PATH', DEFAULT_LEXICON_PATH))
+    return _lexicon
+
+
+def read_word_list(path):
+    """Words from a text list, one per line ('#' lines are comments)"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def wordfreq_words(n=50000):
+    """The top `n` lowercase English words from wordfreq, in rank order"""
+    from wordfreq import top_n_list
+
+    # Plain words and single-apostrophe contractions ("it's"), no numbers or symbols
+    word = re.compile(r"[a-z]+(?:'[a-z]+)?")
+    words, size = [], n
+    while len(words) < n:
+        size *= 2
+        words = [w for w in top_n_list('en', size) if word.fullmatch(w)]
+    return words[:n]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the packed word frequency list')
+    parser.add_argument('--build', action='store_true', help='regenerate the list from wordfreq')
+    parser.add_argument('--size', type=int, default=50000)
+    parser.add_argument('--from-text', help='pack a text word list (one word per line) instead')
+    parser.add_argument('--output', default=DEFAULT_LEXICON_PATH)
+    args = parser.parse_args(argv)
+
+    if args.from_text:
+        words = read_word_list(args.from_text)
+    elif args.build:
+        words = wordfreq_words(args.size)
+    else:
+        parser.error('pass --build or --from-text')
+    Lexicon.pack(words, args.output)
+    print(f"Wrote {len(words):,} words to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+
+if __name__ == '__main__':
+    main()
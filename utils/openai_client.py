@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import queue
+import random
+import threading
+
+import httpx
+
+DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class OpenAIError(Exception):
+    """Raised when the API returns an error that is not worth retrying"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AsyncOpenAIClient:
+    """Minimal async client for OpenAI-compatible chat completion endpoints.
+
+    One instance owns a keep-alive connection pool and a concurrency
+    semaphore, so requests from many sessions share a few connections.
+    Both are created lazily on the event loop that first uses the client.
+    """
+
+    def __init__(self, api_key, base_url=None, timeout=30.0, connect_timeout=5.0,
+                 max_connections=10, max_concurrency=8, max_retries=3,
+                 backoff_base=0.5, backoff_max=8.0):
+        self.api_key = api_key
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_connections)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client = None
+        self._semaphore = None
+
+    def _ensure_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={'Authorization': f'Bearer {self.api_key}'},
+                timeout=self.timeout,
+                limits=self.limits,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _post(self, path, payload):
+        client = self._ensure_client()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await client.post(path, json=payload)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                if attempt >= self.max_retries:
+                    raise OpenAIError(f'Request failed: {e}') from e
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, response.headers.get('retry-after')))
+                attempt += 1
+                continue
+
+            if response.status_code >= 400:
+                raise OpenAIError(f'API error {response.status_code}: {response.text[:200]}',
+                                  response.status_code)
+            return response.json()
+
+    async def chat(self, messages, model='gpt-3.5-turbo', **params):
+        """Create a chat completion and return the decoded JSON response"""
+        payload = {'model': model, 'messages': messages, **params}
+        return await self._post('/chat/completions', payload)
+
+    async def stream_chat(self, messages, model='gpt-3.5-turbo', **params):
+        """Create a streamed chat completion, yielding content deltas as they arrive"""
+        payload = {'model': model, 'messages': messages, 'stream': True, **params}
+        client = self._ensure_client()
+        attempt = 0
+        started = False
+        while True:
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with client.stream('POST', '/chat/completions', json=payload) as response:
+                        if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                            retry_after = response.headers.get('retry-after')
+                        elif response.status_code >= 400:
+                            await response.aread()
+                            raise OpenAIError(f'API error {response.status_code}: {response.text[:200]}',
+                                              response.status_code)
+                        else:
+                            async for line in response.aiter_lines():
+                                if not line.startswith('data:'):
+                                    continue
+                                data = line[5:].strip()
+                                if data == '[DONE]':
+                                    return
+                                choices = json.loads(data).get('choices') or []
+                                delta = choices[0].get('delta', {}).get('content') if choices else None
+                                if delta:
+                                    started = True
+                                    yield delta
+                            return
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                # Retrying after output has been yielded would repeat text
+                if started or attempt >= self.max_retries:
+                    raise OpenAIError(f'Request failed: {e}') from e
+
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class OpenAIClient:
+    """Blocking facade over AsyncOpenAIClient.
+
+    Coroutines run on one background event loop, so every caller thread
+    (e.g. each Streamlit session) multiplexes over the same connection pool.
+    """
+
+    def __init__(self, api_key, request_timeout=60.0, **kwargs):
+        self.async_client = AsyncOpenAIClient(api_key, **kwargs)
+        self.request_timeout = request_timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name='openai-client', daemon=True)
+        self._thread.start()
+
+    def run(self, coro):
+        """Run a coroutine on the client's event loop and wait for the result"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(self.request_timeout)
+
+    def chat(self, messages, model='gpt-3.5-turbo', **params):
+        """Create a chat completion and return the decoded JSON response"""
+        return self.run(self.async_client.chat(messages, model=model, **params))
+
+    async def achat(self, messages, model='gpt-3.5-turbo', **params):
+        """Awaitable chat completion that can be used from any event loop"""
+        coro = self.async_client.chat(messages, model=model, **params)
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def stream_chat(self, messages, model='gpt-3.5-turbo', **params):
+        """Blocking generator over a streamed chat completion's content deltas"""
+        deltas = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for delta in self.async_client.stream_chat(messages, model=model, **params):
+                    deltas.put(delta)
+            except Exception as e:
+                deltas.put(e)
+            finally:
+                deltas.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            while True:
+                item = deltas.get(timeout=self.request_timeout)
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Stop the request if the consumer goes away mid-stream
+            future.cancel()
+
+    def close(self):
+        self.run(self.async_client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key):
+    """Get the process-wide client for an API key, configured from the environment"""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = OpenAIClient(
+                api_key,
+                base_url=os.getenv('OPENAI_BASE_URL', DEFAULT_BASE_URL),
+                timeout=float(os.getenv('OPENAI_TIMEOUT', 30)),
+                max_concurrency=int(os.getenv('OPENAI_MAX_CONCURRENCY', 8)),
+                max_retries=int(os.getenv('OPENAI_MAX_RETRIES', 3)),
+            )
+            _clients[api_key] = client
+        return client
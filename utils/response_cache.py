@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from utils.database import ConnectionPool
+
+# Phrasings that should share a cache entry
+CANONICAL_PHRASES = [
+    (re.compile(r'^(hi|hey|hello|hiya|good (morning|afternoon|evening))\b'), 'hello'),
+    (re.compile(r'\bhow r u\b|\bhow are u\b'), 'how are you'),
+    (re.compile(r'\bthx\b|\bthanks\b'), 'thank you'),
+]
+
+
+def normalize_text(text):
+    """Fold case, punctuation, whitespace and common greetings into a cache key form"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = re.sub(r"[^\w\s']", ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    for pattern, replacement in CANONICAL_PHRASES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def make_key(kind, text, context=None, model=None, temperature=None):
+    """Build a cache key from the normalized prompt and the request settings"""
+    parts = [kind, normalize_text(text), normalize_text(context or ''), model, temperature]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache: an in-process LRU in front of an on-disk SQLite table.
+
+    Entries expire after `ttl` seconds; each tier evicts its least recently
+    used entries once it holds more than its size bound.
+    """
+
+    def __init__(self, path='response_cache.db', ttl=7 * 24 * 3600,
+                 max_memory_entries=1024, max_disk_entries=50000):
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        self._pool = ConnectionPool(path, max_idle=4) if path else None
+        if self._pool:
+            conn = self._pool.acquire()
+            try:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        value TEXT,
+                        created_at REAL,
+                        accessed_at REAL
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)')
+                conn.commit()
+            finally:
+                self._pool.release(conn)
+
+    def _remember(self, key, value, created_at):
+        with self._lock:
+            self._memory[key] = (value, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached value for a key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                self.stats['memory_hits'] += 1
+                return entry[0]
+            if entry:
+                del self._memory[key]
+
+        if self._pool:
+            conn = self._pool.acquire()
+            try:
+                row = conn.execute('SELECT value, created_at FROM responses WHERE key = ?',
+                                   (key,)).fetchone()
+                if row and now - row['created_at'] < self.ttl:
+                    conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+                    conn.commit()
+                    value = json.loads(row['value'])
+                    self._remember(key, value, row['created_at'])
+                    with self._lock:
+                        self.stats['hits'] += 1
+                        self.stats['disk_hits'] += 1
+                    return value
+                if row:
+                    conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    conn.commit()
+            finally:
+                self._pool.release(conn)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under a key"""
+        now = time.time()
+        self._remember(key, value, now)
+        if not self._pool:
+            return
+
+        conn = self._pool.acquire()
+        try:
+            conn.execute('INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                         (key, json.dumps(value), now, now))
+            self._writes += 1
+            # Trimming needs a COUNT, so only do it every so often
+            if self._writes % 100 == 0:
+                conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+                conn.execute('''
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY accessed_at
+                        LIMIT MAX(0, (SELECT COUNT(*) FROM responses) - ?)
+                    )
+                ''', (self.max_disk_entries,))
+            conn.commit()
+        finally:
+            self._pool.release(conn)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._pool:
+            conn = self._pool.acquire()
+            try:
+                conn.execute('DELETE FROM responses')
+                conn.commit()
+            finally:
+                self._pool.release(conn)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Get the process-wide response cache, configured from the environment"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                path=os.getenv('RESPONSE_CACHE_PATH', 'response_cache.db'),
+                ttl=float(os.getenv('RESPONSE_CACHE_TTL', 7 * 24 * 3600)),
+                max_memory_entries=int(os.getenv('RESPONSE_CACHE_MEMORY_ENTRIES', 1024)),
+                max_disk_entries=int(os.getenv('RESPONSE_CACHE_DISK_ENTRIES', 50000)),
+            )
+        return _cache
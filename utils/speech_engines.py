@@ -0,0 +1,557 @@
+"""Text-to-speech and speech-to-text engines behind SpeechHandler.
+
+Engines register themselves by name; a deployment picks one with the
+TTS_ENGINE / STT_ENGINE environment variables (defaults: gtts / google).
+Local engines need their optional packages or binaries installed:
+
+    TTS: gtts (remote), pyttsx3, espeak (espeak-ng binary), tone (offline placeholder)
+    STT: google (remote), sphinx (pocketsphinx), vosk (VOSK_MODEL_PATH),
+         whisper_cpp (WHISPER_CPP_BIN and WHISPER_CPP_MODEL)
+
+Compare engines on a fixed corpus with:
+    python -m utils.speech_engines --tts gtts,espeak,tone --stt vosk,sphinx
+
+Without --corpus, STT engines run on BENCHMARK_PHRASES rendered by an
+offline TTS engine (espeak, else pyttsx3, else tone), so the comparison is
+the same on any CPU-only machine. --corpus recordings/ uses real clips.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+
+import speech_recognition as sr
+
+TTS_ENGINES = {}
+STT_ENGINES = {}
+
+
+def register_tts_engine(cls):
+    TTS_ENGINES[cls.name] = cls
+    return cls
+
+
+def register_stt_engine(cls):
+    STT_ENGINES[cls.name] = cls
+    return cls
+
+
+def _temp_audio_path(suffix):
+    # Imported here to avoid a cycle: speech_utils builds on this module
+    from utils.speech_utils import AUDIO_TEMP_DIR
+
+    os.makedirs(AUDIO_TEMP_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=AUDIO_TEMP_DIR, suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def wav_duration(wav_bytes):
+    """Length of a WAV clip in seconds"""
+    with wave.open(io.BytesIO(wav_bytes)) as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
+
+def to_audio_data(audio):
+    """Accept sr.AudioData or WAV/AIFF/FLAC bytes"""
+    if isinstance(audio, sr.AudioData):
+        return audio
+    with sr.AudioFile(io.BytesIO(audio)) as source:
+        return sr.Recognizer().record(source)
+
+
+# Text-to-speech
+
+class TTSEngine:
+    """Turns text into encoded audio bytes"""
+
+    name = None
+    mime_type = 'audio/wav'
+
+    def available(self):
+        return True
+
+    def synthesize(self, text, lang='en', slow=False):
+        raise NotImplementedError
+
+
+@register_tts_engine
+class GTTSEngine(TTSEngine):
+    """Google Translate's TTS service (needs network)"""
+
+    name = 'gtts'
+    mime_type = 'audio/mp3'
+
+    def available(self):
+        try:
+            import gtts
+        except ImportError:
+            return False
+        return True
+
+    def synthesize(self, text, lang='en', slow=False):
+        from gtts import gTTS
+
+        # Synthesize straight into memory, no temporary file
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=slow).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+@register_tts_engine
+class Pyttsx3Engine(TTSEngine):
+    """The platform voice via pyttsx3 (SAPI5, NSSpeechSynthesizer or eSpeak)"""
+
+    name = 'pyttsx3'
+
+    def __init__(self):
+        self._engine = None
+        self._lock = threading.Lock()  # pyttsx3 drivers aren't thread-safe
+
+    def available(self):
+        try:
+            import pyttsx3
+        except ImportError:
+            return False
+        return True
+
+    def synthesize(self, text, lang='en', slow=False):
+        import pyttsx3
+
+        # pyttsx3 can only render to a file; it is removed right after reading
+        path = _temp_audio_path('.wav')
+        try:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = pyttsx3.init()
+                self._engine.setProperty('rate', 120 if slow else 175)
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+@register_tts_engine
+class EspeakEngine(TTSEngine):
+    """eSpeak NG command-line synthesizer, WAV on stdout"""
+
+    name = 'espeak'
+
+    def _binary(self):
+        return shutil.which('espeak-ng') or shutil.which('espeak')
+
+    def available(self):
+        return self._binary() is not None
+
+    def synthesize(self, text, lang='en', slow=False):
+        command = [self._binary(), '--stdout', '-v', lang, '-s', '120' if slow else '170', text]
+        return subprocess.run(command, check=True, capture_output=True, timeout=30).stdout
+
+
+@register_tts_engine
+class ToneEngine(TTSEngine):
+    """Offline placeholder: a short tone per word, for development and benchmarks"""
+
+    name = 'tone'
+    sample_rate = 16000
+
+    def synthesize(self, text, lang='en', slow=False):
+        import numpy as np
+
+        word_seconds = 0.45 if slow else 0.3
+        samples = []
+        for i, _ in enumerate(text.split() or ['']):
+            t = np.arange(int(self.sample_rate * word_seconds)) / self.sample_rate
+            tone = 0.3 * np.sin(2 * np.pi * (220 + 20 * (i % 5)) * t) * np.hanning(t.size)
+            samples.append(tone)
+            samples.append(np.zeros(int(self.sample_rate * 0.05)))
+        pcm = (np.concatenate(samples) * 32767).astype('<i2').tobytes()
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
+
+
+# Speech-to-text
+
+class STTEngine:
+    """Turns recorded audio into text.
+
+    `transcribe` raises sr.UnknownValueError when nothing intelligible was
+    said and sr.RequestError when the engine itself fails, like the
+    speech_recognition recognizers do.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def available(self):
+        return True
+
+    def transcribe(self, audio):
+        raise NotImplementedError
+
+    def start_stream(self, sample_rate=16000):
+        """Incremental recognizer for 16-bit mono PCM (see BufferedStream)"""
+        return BufferedStream(self, sample_rate)
+
+
+class BufferedStream:
+    """Streaming wrapper for engines that only transcribe whole clips.
+
+    `accept` collects PCM and re-transcribes the utterance so far at most
+    every `partial_interval` seconds of new audio, which gives partial
+    results; `finish` transcribes the whole utterance once more.
+    Engines with a native incremental decoder override `start_stream`.
+    """
+
+    def __init__(self, engine, sample_rate=16000, partial_interval=1.0):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.partial_bytes = int(partial_interval * sample_rate) * 2
+        self._pcm = bytearray()
+        self._since_partial = 0
+
+    def _transcribe(self):
+        try:
+            return self.engine.transcribe(sr.AudioData(bytes(self._pcm), self.sample_rate, 2))
+        except sr.UnknownValueError:
+            return ''
+
+    def accept(self, pcm):
+        """Add audio; returns a partial transcript when one was computed, else None"""
+        self._pcm.extend(pcm)
+        self._since_partial += len(pcm)
+        if self.partial_bytes and self._since_partial >= self.partial_bytes:
+            self._since_partial = 0
+            return self._transcribe() or None
+        return None
+
+    def finish(self):
+        """Final transcript of everything accepted ('' if nothing was understood)"""
+        return self._transcribe() if self._pcm else ''
+
+
+@register_stt_engine
+class GoogleSTTEngine(STTEngine):
+    """Google Web Speech API (needs network)"""
+
+    name = 'google'
+
+    def transcribe(self, audio):
+        return self.recognizer.recognize_google(to_audio_data(audio))
+
+
+@register_stt_engine
+class SphinxSTTEngine(STTEngine):
+    """CMU PocketSphinx, fully offline"""
+
+    name = 'sphinx'
+
+    def available(self):
+        try:
+            import pocketsphinx
+        except ImportError:
+            return False
+        return True
+
+    def transcribe(self, audio):
+        return self.recognizer.recognize_sphinx(to_audio_data(audio))
+
+
+@register_stt_engine
+class VoskSTTEngine(STTEngine):
+    """Vosk/Kaldi recognizer on the CPU; point VOSK_MODEL_PATH at an unpacked model"""
+
+    name = 'vosk'
+    sample_rate = 16000
+
+    def __init__(self, model_path=None):
+        super().__init__()
+        self.model_path = model_path or os.getenv('VOSK_MODEL_PATH', '')
+        self._model = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        try:
+            import vosk
+        except ImportError:
+            return False
+        return os.path.isdir(self.model_path)
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                import vosk
+
+                if not os.path.isdir(self.model_path):
+                    raise sr.RequestError('VOSK_MODEL_PATH does not point at a Vosk model directory')
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(self.model_path)
+        return self._model
+
+    def transcribe(self, audio):
+        import vosk
+
+        pcm = to_audio_data(audio).get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+        recognizer = vosk.KaldiRecognizer(self._get_model(), self.sample_rate)
+        recognizer.AcceptWaveform(pcm)
+        text = json.loads(recognizer.FinalResult()).get('text', '')
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def start_stream(self, sample_rate=16000):
+        import vosk
+
+        return VoskStream(vosk.KaldiRecognizer(self._get_model(), sample_rate))
+
+
+class VoskStream:
+    """Native incremental decoding: each chunk is decoded as it arrives"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._segments = []
+
+    def accept(self, pcm):
+        if self.recognizer.AcceptWaveform(bytes(pcm)):
+            # Vosk found a pause inside the utterance and finalized a segment
+            self._segments.append(json.loads(self.recognizer.Result()).get('text', ''))
+            partial = ''
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return ' '.join(self._segments + [partial]).strip() or None
+
+    def finish(self):
+        final = json.loads(self.recognizer.FinalResult()).get('text', '')
+        return ' '.join(self._segments + [final]).strip()
+
+
+@register_stt_engine
+class WhisperCppSTTEngine(STTEngine):
+    """whisper.cpp command-line binary (WHISPER_CPP_BIN) with a ggml model (WHISPER_CPP_MODEL)"""
+
+    name = 'whisper_cpp'
+
+    def __init__(self, binary=None, model=None, threads=None):
+        super().__init__()
+        self.binary = binary or os.getenv('WHISPER_CPP_BIN', 'whisper-cli')
+        self.model = model or os.getenv('WHISPER_CPP_MODEL', '')
+        self.threads = threads or os.cpu_count() or 1
+
+    def available(self):
+        return shutil.which(self.binary) is not None and os.path.isfile(self.model)
+
+    def transcribe(self, audio):
+        wav_bytes = to_audio_data(audio).get_wav_data(convert_rate=16000, convert_width=2)
+        path = _temp_audio_path('.wav')
+        try:
+            with open(path, 'wb') as f:
+                f.write(wav_bytes)
+            result = subprocess.run(
+                [self.binary, '-m', self.model, '-f', path, '-l', 'en', '-t', str(self.threads), '-nt', '-np'],
+                capture_output=True, text=True, timeout=120
+            )
+        finally:
+            os.remove(path)
+        if result.returncode != 0:
+            raise sr.RequestError(result.stderr.strip() or 'whisper.cpp failed')
+        text = ' '.join(result.stdout.split())
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+def _get_engine(registry, engine, env_name, default):
+    if engine is not None and not isinstance(engine, str):
+        return engine
+    name = engine or os.getenv(env_name, default)
+    if name not in registry:
+        raise ValueError(f"Unknown speech engine '{name}' (choose from {', '.join(sorted(registry))})")
+    return registry[name]()
+
+
+def get_tts_engine(engine=None):
+    """A TTS engine instance from a name, an instance, or TTS_ENGINE"""
+    return _get_engine(TTS_ENGINES, engine, 'TTS_ENGINE', 'gtts')
+
+
+def get_stt_engine(engine=None):
+    """An STT engine instance from a name, an instance, or STT_ENGINE"""
+    return _get_engine(STT_ENGINES, engine, 'STT_ENGINE', 'google')
+
+
+# Benchmarks
+
+BENCHMARK_PHRASES = [
+    "Hello, how are you today?",
+    "Could you repeat that, please?",
+    "The quick brown fox jumps over the lazy dog.",
+    "She sells seashells by the seashore.",
+    "Mobile phones have become ubiquitous in modern society.",
+    "I slit the sheet, the sheet I slit, and on the slitted sheet I sit.",
+]
+
+
+def _summary(latencies):
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": round(1000 * statistics.fmean(ordered), 1),
+        "p50_ms": round(1000 * ordered[len(ordered) // 2], 1),
+        "p95_ms": round(1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+    }
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance divided by the reference length"""
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_word != hyp_word))
+    return row[-1] / max(len(ref), 1)
+
+
+def benchmark_tts(engine, phrases=BENCHMARK_PHRASES, repeat=3):
+    """Latency and throughput of a TTS engine over a fixed phrase list"""
+    engine.synthesize(phrases[0])  # warm up models and connections
+    latencies = []
+    audio_bytes = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for phrase in phrases:
+            t = time.perf_counter()
+            audio = engine.synthesize(phrase)
+            latencies.append(time.perf_counter() - t)
+            audio_bytes += len(audio)
+    elapsed = time.perf_counter() - started
+    result = {"engine": engine.name, "clips": len(latencies), **_summary(latencies),
+              "clips_per_sec": round(len(latencies) / elapsed, 2),
+              "chars_per_sec": round(repeat * sum(len(p) for p in phrases) / elapsed, 1),
+              "avg_kb": round(audio_bytes / len(latencies) / 1024, 1)}
+    return result
+
+
+def load_corpus(directory):
+    """(name, wav_bytes, transcript or None) for each .wav in a directory"""
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.wav'):
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            audio = f.read()
+        transcript_path = os.path.join(directory, name[:-4] + '.txt')
+        transcript = None
+        if os.path.exists(transcript_path):
+            with open(transcript_path, encoding='utf-8') as f:
+                transcript = f.read().strip()
+        corpus.append((name, audio, transcript))
+    return corpus
+
+
+# Offline engines that render WAV, in order of preference for a generated corpus
+CORPUS_TTS_ENGINES = ('espeak', 'pyttsx3', 'tone')
+
+
+def build_corpus(directory, engine=None, phrases=BENCHMARK_PHRASES):
+    """Render phrases to <directory>/phraseNN.wav with .txt transcripts; returns the engine used"""
+    if engine is None:
+        engine = next(name for name in CORPUS_TTS_ENGINES if get_tts_engine(name).available())
+    tts = get_tts_engine(engine)
+    os.makedirs(directory, exist_ok=True)
+    for i, phrase in enumerate(phrases, 1):
+        with open(os.path.join(directory, f'phrase{i:02d}.wav'), 'wb') as f:
+            f.write(tts.synthesize(phrase))
+        with open(os.path.join(directory, f'phrase{i:02d}.txt'), 'w', encoding='utf-8') as f:
+            f.write(phrase)
+    return tts.name
+
+
+def benchmark_stt(engine, corpus, repeat=1):
+    """Latency, real-time factor and word error rate of an STT engine over a corpus"""
+    latencies = []
+    audio_seconds = 0.0
+    errors = []
+    for _ in range(repeat):
+        for _, audio, transcript in corpus:
+            t = time.perf_counter()
+            try:
+                text = engine.transcribe(audio)
+            except sr.UnknownValueError:
+                text = ''
+            latencies.append(time.perf_counter() - t)
+            audio_seconds += wav_duration(audio)
+            if transcript is not None:
+                errors.append(word_error_rate(transcript, text))
+    result = {"engine": engine.name, "clips": len(latencies), **_summary(latencies),
+              "real_time_factor": round(sum(latencies) / audio_seconds, 3) if audio_seconds else None}
+    if errors:
+        result["wer"] = round(statistics.fmean(errors), 3)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare speech engines on a fixed corpus")
+    parser.add_argument('--tts', default='', help="comma-separated TTS engines (default: all available)")
+    parser.add_argument('--stt', default='', help="comma-separated STT engines (default: all available)")
+    parser.add_argument('--corpus', help="directory of .wav files (with optional .txt transcripts) for STT "
+                                         "(default: the benchmark phrases rendered offline)")
+    parser.add_argument('--corpus-engine', choices=CORPUS_TTS_ENGINES,
+                        help="offline TTS engine for the generated corpus (default: first available)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    tts_names = [n for n in args.tts.split(',') if n] or sorted(TTS_ENGINES)
+    for name in tts_names:
+        engine = get_tts_engine(name)
+        if not engine.available():
+            print(json.dumps({"engine": name, "skipped": "not installed"}))
+            continue
+        try:
+            print(json.dumps(benchmark_tts(engine, repeat=args.repeat)))
+        except Exception as e:
+            print(json.dumps({"engine": name, "error": str(e)}))
+
+    scratch = None
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        scratch = tempfile.mkdtemp(prefix='stt-corpus-')
+        source = build_corpus(scratch, args.corpus_engine)
+        corpus = load_corpus(scratch)
+        print(json.dumps({"corpus": f"BENCHMARK_PHRASES rendered by {source}", "clips": len(corpus)}))
+    try:
+        stt_names = [n for n in args.stt.split(',') if n] or sorted(STT_ENGINES)
+        for name in stt_names:
+            engine = get_stt_engine(name)
+            if not engine.available():
+                print(json.dumps({"engine": name, "skipped": "not installed"}))
+                continue
+            try:
+                print(json.dumps(benchmark_stt(engine, corpus, repeat=args.repeat)))
+            except Exception as e:
+                print(json.dumps({"engine": name, "error": str(e)}))
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
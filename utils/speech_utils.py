@@ -1,12 +1,90 @@
 import speech_recognition as sr
-from gtts import gTTS
+import streamlit as st
 import os
 import tempfile
+import threading
+import time
 import base64
+from utils.audio_cache import get_audio_cache
+from utils.speech_engines import get_stt_engine, get_tts_engine
+from utils.streaming_stt import StreamingRecognizer
+
+# Audio that has to live on disk (e.g. for an external player) goes here, never loose in /tmp
+AUDIO_TEMP_DIR = os.getenv('AUDIO_TEMP_DIR', os.path.join(tempfile.gettempdir(), 'english_practice_audio'))
+AUDIO_TEMP_MAX_AGE = int(os.getenv('AUDIO_TEMP_MAX_AGE', 3600))  # seconds
+AUDIO_TEMP_MAX_BYTES = int(os.getenv('AUDIO_TEMP_MAX_BYTES', 100 * 1024 * 1024))
+SWEEP_INTERVAL = 300  # seconds between automatic sweeps
+
+_last_sweep = 0
+_sweep_lock = threading.Lock()
+
+
+def sweep_audio_files(directory=AUDIO_TEMP_DIR, max_age=AUDIO_TEMP_MAX_AGE, max_bytes=AUDIO_TEMP_MAX_BYTES):
+    """Delete audio files older than max_age, then the oldest until under max_bytes.
+
+    Returns (files_removed, bytes_removed).
+    """
+    if not os.path.isdir(directory):
+        return 0, 0
+    now = time.time()
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file():
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    removed = removed_bytes = 0
+    for mtime, size, path in files:
+        if now - mtime < max_age and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+        removed_bytes += size
+    return removed, removed_bytes
+
+
+def maybe_sweep_audio_files():
+    """Run the sweeper at most once per SWEEP_INTERVAL per process"""
+    global _last_sweep
+    now = time.monotonic()
+    with _sweep_lock:
+        if _last_sweep and now - _last_sweep < SWEEP_INTERVAL:
+            return
+        _last_sweep = now
+    sweep_audio_files()
+
+
+def save_audio_file(audio_bytes, suffix='.mp3'):
+    """Write audio bytes to the swept audio directory and return the path"""
+    os.makedirs(AUDIO_TEMP_DIR, exist_ok=True)
+    maybe_sweep_audio_files()
+    with tempfile.NamedTemporaryFile(dir=AUDIO_TEMP_DIR, suffix=suffix, delete=False) as fp:
+        fp.write(audio_bytes)
+        return fp.name
+
 
 class SpeechHandler:
-    def __init__(self):
+    def __init__(self, audio_cache=None, tts_engine=None, stt_engine=None):
         self.recognizer = sr.Recognizer()
+        self.audio_cache = audio_cache or get_audio_cache()
+        # Engine names (or instances); defaults come from TTS_ENGINE / STT_ENGINE
+        self.tts = get_tts_engine(tts_engine)
+        self.stt = get_stt_engine(stt_engine)
+    
+    @property
+    def engine(self):
+        return self.tts.name
+    
+    @property
+    def audio_format(self):
+        """MIME type of the audio text_to_speech returns"""
+        return self.tts.mime_type
     
     def record_audio(self, duration=5):
         """Record audio from microphone"""
@@ -22,10 +100,24 @@ class SpeechHandler:
             st.error(f"Recording error: {str(e)}")
             return None
     
+    def listen_streaming(self, max_seconds=15, sample_rate=16000, chunk_ms=100):
+        """Yield partial and final transcripts from the microphone while the student speaks"""
+        streamer = StreamingRecognizer(self.stt, sample_rate)
+        chunk = sample_rate * chunk_ms // 1000
+        with sr.Microphone(sample_rate=sample_rate, chunk_size=chunk) as source:
+            deadline = time.monotonic() + max_seconds
+            while time.monotonic() < deadline:
+                for event in streamer.feed(source.stream.read(chunk)):
+                    yield event
+                    # Stop at the end of the first utterance
+                    if event['type'] == 'final':
+                        return
+        yield from streamer.close()
+    
     def speech_to_text(self, audio):
         """Convert speech to text"""
         try:
-            text = self.recognizer.recognize_google(audio)
+            text = self.stt.transcribe(audio)
             return text
         except sr.UnknownValueError:
             return "Sorry, I couldn't understand the audio."
@@ -34,32 +126,51 @@ class SpeechHandler:
         except Exception as e:
             return f"Error: {str(e)}"
     
-    def text_to_speech(self, text, lang='en', slow=False):
-        """Convert text to speech and save as MP3"""
+    def synthesize(self, text, lang='en', slow=False):
+        """Render speech with the TTS engine, bypassing the cache"""
+        return self.tts.synthesize(text, lang, slow)
+    
+    def text_to_speech(self, text, lang='en', slow=False, use_cache=True):
+        """Convert text to speech and return the encoded audio bytes (for st.audio)"""
         try:
-            tts = gTTS(text=text, lang=lang, slow=slow)
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                tts.save(fp.name)
-                return fp.name
+            if not use_cache:
+                return self.synthesize(text, lang, slow)
+            # Shared across sessions: each distinct clip is synthesized once
+            return self.audio_cache.get_or_render(
+                text, lambda: self.synthesize(text, lang, slow),
+                lang=lang, slow=slow, engine=self.engine
+            )
         except Exception as e:
             st.error(f"Text-to-speech error: {str(e)}")
             return None
     
-    def get_audio_html(self, audio_file):
-        """Get HTML for playing audio"""
-        if not audio_file or not os.path.exists(audio_file):
+    def text_to_speech_file(self, text, lang='en', slow=False):
+        """Convert text to speech and save it as a file that the sweeper cleans up"""
+        audio_bytes = self.text_to_speech(text, lang, slow)
+        suffix = '.' + self.audio_format.split('/')[-1]
+        return save_audio_file(audio_bytes, suffix) if audio_bytes else None
+    
+    def get_audio_html(self, audio):
+        """Get HTML for playing audio bytes (or an audio file path)"""
+        if isinstance(audio, str):
+            if not os.path.exists(audio):
+                return ""
+            with open(audio, "rb") as f:
+                audio = f.read()
+        if not audio:
             return ""
         
-        with open(audio_file, "rb") as f:
-            audio_bytes = f.read()
-        
-        audio_b64 = base64.b64encode(audio_bytes).decode()
+        audio_b64 = base64.b64encode(audio).decode()
         audio_html = f"""
             <audio controls autoplay>
-                <source src="data:audio/mp3;base64,{audio_b64}" type="audio/mp3">
+                <source src="data:{self.audio_format};base64,{audio_b64}" type="{self.audio_format}">
                 Your browser does not support the audio element.
             </audio>
         """
-        return audio_html
\ No newline at end of file
+        return audio_html
+
+
+@st.cache_resource
+def get_speech_handler():
+    """Shared speech handler for all sessions"""
+    return SpeechHandler()
@@ -0,0 +1,110 @@
+"""Streak and points rules.
+
+A streak counts consecutive local days with at least one activity. Days
+are taken in the user's own timezone, so practising at 23:30 and again at
+00:10 the next evening counts as two days for them, wherever the server
+is. Naive timestamps are treated as UTC.
+
+`advance_streak` is the O(1) per-event rule the database applies on each
+write. `compute_streaks` replays a whole event history in one vectorized
+pass for backfills; both give the same result for in-order events.
+"""
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = 'UTC'
+
+# Points per activity event
+POINTS = {
+    'conversation': 10,
+    'vocabulary': 5,
+    'quiz': 5,
+    'exercise': 10,
+    'pronunciation': 10,
+}
+POINTS_PER_PRACTICE_MINUTE = 1
+
+
+def get_zone(name):
+    """ZoneInfo for an IANA name, falling back to UTC for unknown or empty names"""
+    try:
+        return ZoneInfo(name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def local_date(at, tz_name=DEFAULT_TIMEZONE):
+    """Calendar date of a moment in the given timezone"""
+    if isinstance(at, str):
+        at = datetime.fromisoformat(at)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.astimezone(get_zone(tz_name)).date()
+
+
+def advance_streak(streak, last_active, day):
+    """(streak, last_active) after an activity on `day`.
+
+    Same day: unchanged. The next day: +1. After a gap: back to 1. An
+    event older than the last active day (late delivery, backfill) leaves
+    the streak alone; a full recompute places it correctly.
+    """
+    if isinstance(last_active, str):
+        last_active = date.fromisoformat(last_active)
+    if last_active is None or day > last_active + timedelta(days=1):
+        return 1, day
+    if day == last_active + timedelta(days=1):
+        return (streak or 0) + 1, day
+    return streak or 1, last_active
+
+
+def current_streak(streak, last_active, today):
+    """Streak to show today: it lapses once a whole local day passes without activity"""
+    if isinstance(last_active, str):
+        last_active = date.fromisoformat(last_active)
+    if last_active is None or today - last_active > timedelta(days=1):
+        return 0
+    return streak or 0
+
+
+def compute_streaks(user_ids, days, points):
+    """Streak, last active day and total points per user from a full event history.
+
+    `user_ids`, `days` (local dates as datetime64[D] or day ordinals) and
+    `points` are parallel arrays in any order. Returns
+    {user_id: (streak, last_active_date, total_points)}; the streak is the
+    length of the run of consecutive days ending on the last active day.
+    """
+    # Imported here so NumPy stays off the import path of utils.database
+    import numpy as np
+
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    if not len(user_ids):
+        return {}
+    days = np.asarray(days)
+    if np.issubdtype(days.dtype, np.datetime64):
+        days = days.astype('datetime64[D]').astype(np.int64)
+    days = days.astype(np.int64)
+
+    users, inverse = np.unique(user_ids, return_inverse=True)
+    totals = np.bincount(inverse, weights=np.asarray(points, dtype=np.float64), minlength=len(users))
+
+    # Distinct (user, day) pairs, sorted by user then day, packed into one int64 key
+    first_day = days.min()
+    span = int(days.max() - first_day) + 1
+    keys = np.unique(inverse * span + (days - first_day))
+    user_index, active_days = keys // span, keys % span + first_day
+    n = len(keys)
+
+    # A run starts at each user's first day and after every gap
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = (user_index[1:] != user_index[:-1]) | (active_days[1:] - active_days[:-1] != 1)
+    run_start = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    last = np.flatnonzero(np.append(user_index[1:] != user_index[:-1], True))
+    streaks = last - run_start[last] + 1
+    last_days = active_days[last].astype('datetime64[D]')
+
+    return {
+        int(users[u]): (int(streak), last_day.item(), int(round(totals[u])))
+        for u, streak, last_day in zip(user_index[last], streaks, last_days)
+    }
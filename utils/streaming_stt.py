@@ -0,0 +1,192 @@
+"""Streaming speech recognition: ring buffer -> VAD -> incremental recognizer.
+
+Audio arrives in arbitrary chunks of 16-bit mono PCM. It is kept in a ring
+buffer and cut into fixed frames. An energy VAD spots the start and end of
+an utterance, and each speech frame goes straight to the engine's
+incremental recognizer. Partial transcripts are emitted while the student
+is still speaking. When the utterance ends, only the final chunk is left
+to decode.
+"""
+import time
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of int16 samples, addressed by absolute sample index"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self.total = 0  # samples written since creation
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        start = self.total % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        self.total += len(samples)
+
+    def read(self, start, end=None):
+        """Samples [start, end) by absolute index, clipped to what is still buffered"""
+        end = self.total if end is None else min(end, self.total)
+        start = max(start, self.total - self.capacity, 0)
+        if start >= end:
+            return np.zeros(0, dtype=np.int16)
+        i, j = start % self.capacity, end % self.capacity
+        if i < j:
+            return self._data[i:j].copy()
+        return np.concatenate([self._data[i:], self._data[:j]])
+
+
+class EnergyVAD:
+    """Frame-level voice activity detection with an adaptive noise floor.
+
+    A frame is voiced when its RMS is `ratio` times above the running noise
+    floor (and above `min_rms`). The floor starts as the quietest of the
+    first `calibration_ms` of frames. Until then the student may already be
+    talking, so a frame counts as voiced on the absolute `min_rms` threshold
+    alone, provided it isn't hiss-like (zero-crossing rate below
+    `max_zcr`). Afterwards the floor follows quieter frames down quickly and
+    rises slowly on unvoiced ones. Speech starts after `start_ms` of voiced
+    frames and ends after `end_silence_ms` of unvoiced ones.
+    """
+
+    def __init__(self, frame_ms=30, start_ms=90, end_silence_ms=600, ratio=3.0, min_rms=300.0,
+                 calibration_ms=300, max_zcr=0.35):
+        self.frame_ms = frame_ms
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.max_zcr = max_zcr
+        self.noise_floor = None
+        self.in_speech = False
+        self._calibration = []
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    def is_voiced(self, frame):
+        rms = float(np.sqrt(np.mean(frame.astype(np.float32) ** 2))) if len(frame) else 0.0
+        if len(self._calibration) < self.calibration_frames:
+            self._calibration.append(rms)
+            self.noise_floor = min(self._calibration)
+            signs = np.signbit(frame)
+            zcr = np.count_nonzero(signs[1:] != signs[:-1]) / max(len(frame) - 1, 1)
+            return rms > self.min_rms and zcr < self.max_zcr
+        voiced = rms > max(self.min_rms, self.noise_floor * self.ratio)
+        if rms < self.noise_floor:
+            # A quieter frame than the floor, which was measured during speech: follow it down fast
+            self.noise_floor = 0.5 * self.noise_floor + 0.5 * rms
+        elif not voiced:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return voiced
+
+    def process(self, frame):
+        """Return 'start', 'speech', 'end' or None (silence) for one frame"""
+        voiced = self.is_voiced(frame)
+        if not self.in_speech:
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                self.in_speech = True
+                self._silent_run = 0
+                return 'start'
+            return None
+        self._silent_run = 0 if voiced else self._silent_run + 1
+        if self._silent_run >= self.end_frames:
+            self.in_speech = False
+            self._voiced_run = 0
+            return 'end'
+        return 'speech'
+
+
+class StreamingRecognizer:
+    """Feeds PCM chunks through the VAD into an engine's incremental recognizer.
+
+    `feed` returns a list of events as dicts:
+        {'type': 'partial', 'text': ...}
+        {'type': 'final', 'text': ..., 'start': s, 'end': s, 'latency': s, 'samples': int16 array}
+    where start/end are seconds into the stream, `latency` is the time
+    from detecting the end of speech to having the final transcript and
+    `samples` is the utterance audio.
+    """
+
+    def __init__(self, engine, sample_rate=16000, frame_ms=30, preroll_ms=300,
+                 buffer_seconds=30, vad=None):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.preroll = sample_rate * preroll_ms // 1000
+        self.vad = vad or EnergyVAD(frame_ms=frame_ms)
+        self.ring = RingBuffer(sample_rate * buffer_seconds)
+        self._pending = bytearray()
+        self._framed = 0  # samples already cut into frames
+        self._stream = None
+        self._utterance_start = None
+        self._last_partial = None
+
+    def feed(self, pcm):
+        """Add a chunk of 16-bit mono PCM bytes; returns the events it produced"""
+        self._pending.extend(pcm)
+        usable = len(self._pending) // 2 * 2
+        if usable:
+            self.ring.write(np.frombuffer(bytes(self._pending[:usable]), dtype='<i2'))
+            del self._pending[:usable]
+
+        events = []
+        while self.ring.total - self._framed >= self.frame_samples:
+            start = self._framed
+            frame = self.ring.read(start, start + self.frame_samples)
+            self._framed += self.frame_samples
+            self._process_frame(frame, start, events)
+        return events
+
+    def _process_frame(self, frame, start, events):
+        state = self.vad.process(frame)
+        if state == 'start':
+            # Include the audio just before the VAD triggered
+            self._utterance_start = max(0, start - self.preroll)
+            self._stream = self.engine.start_stream(self.sample_rate)
+            self._last_partial = None
+            self._accept(self.ring.read(self._utterance_start, start + len(frame)), events)
+        elif state == 'speech':
+            self._accept(frame, events)
+        elif state == 'end':
+            self._accept(frame, events)
+            events.append(self._finish(start + len(frame)))
+
+    def _accept(self, samples, events):
+        partial = self._stream.accept(samples.astype('<i2').tobytes())
+        if partial and partial != self._last_partial:
+            self._last_partial = partial
+            events.append({'type': 'partial', 'text': partial})
+
+    def _finish(self, end):
+        detected = time.perf_counter()
+        text = self._stream.finish()
+        event = {
+            'type': 'final',
+            'text': text,
+            'start': self._utterance_start / self.sample_rate,
+            'end': end / self.sample_rate,
+            'latency': time.perf_counter() - detected,
+            'samples': self.ring.read(self._utterance_start, end)
+        }
+        self._stream = None
+        return event
+
+    def close(self):
+        """Flush an utterance that is still open when the audio stops"""
+        if self._stream is None:
+            return []
+        self.vad.in_speech = False
+        return [self._finish(self._framed)]
+
+
+def iter_pcm_chunks(pcm, sample_rate=16000, chunk_ms=100):
+    """Split PCM bytes into chunks, e.g. to replay a recording as a stream"""
+    step = sample_rate * chunk_ms // 1000 * 2
+    for i in range(0, len(pcm), step):
+        yield pcm[i:i + step]
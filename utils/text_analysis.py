@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+from functools import lru_cache
+
+# Optional vendored NLTK data (e.g. assets/nltk_data/tokenizers/punkt)
+BUNDLED_NLTK_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'nltk_data')
+
+# word_tokenize rewrites double quotes; map them back when locating tokens
+_QUOTE_TOKENS = {'``': '"', "''": '"'}
+
+# Regex fallback, close to NLTK's Treebank conventions ("don't" -> "do", "n't")
+_WORD_RE = re.compile(r"""
+    \d+(?:[.,]\d+)*               # numbers
+  | [A-Za-z]+(?=n't\b)            # verb before a negative contraction
+  | n't\b                         # the contraction itself
+  | '(?:s|re|ve|ll|d|m)\b         # clitics: 's 're 've 'll 'd 'm
+  | \w+(?:-\w+)*                  # words, keeping hyphenated compounds
+  | \.\.\.|[^\w\s]                # ellipsis or single punctuation mark
+""", re.VERBOSE | re.IGNORECASE)
+_ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'vs', 'etc', 'e.g', 'i.e', 'jr', 'sr'}
+_SENTENCE_END_RE = re.compile(r'[.!?]+["\')\]]*(?=\s+|$)')
+
+
+def regex_word_tokenize(text):
+    """Word tokenizer that needs no downloaded models"""
+    return _WORD_RE.findall(text)
+
+
+def regex_sent_tokenize(text):
+    """Sentence splitter that needs no downloaded models"""
+    sentences = []
+    start = 0
+    for m in _SENTENCE_END_RE.finditer(text):
+        words = text[start:m.start()].split()
+        last_word = words[-1] if words else ''
+        # Don't split after "Dr." or "e.g." or initials like "J."
+        is_initial = len(last_word) == 1 and last_word.isupper() and last_word != 'I'
+        if m.group().startswith('.') and (last_word.lower() in _ABBREVIATIONS or is_initial):
+            continue
+        sentence = text[start:m.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = m.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+_tokenizers = None
+_tokenizers_lock = threading.Lock()
+
+
+def _load_nltk():
+    """NLTK's tokenizers if punkt is available locally, else None"""
+    try:
+        import nltk
+    except ImportError:
+        return None
+
+    if os.path.isdir(BUNDLED_NLTK_DATA) and BUNDLED_NLTK_DATA not in nltk.data.path:
+        nltk.data.path.insert(0, BUNDLED_NLTK_DATA)
+    try:
+        nltk.data.find('tokenizers/punkt')
+    except LookupError:
+        # Downloading needs network, so it is opt-in
+        if os.getenv('NLTK_AUTO_DOWNLOAD', '').lower() not in ('1', 'true', 'yes'):
+            return None
+        if not nltk.download('punkt', quiet=True):
+            return None
+
+    from nltk.tokenize import sent_tokenize, word_tokenize
+    return sent_tokenize, word_tokenize
+
+
+def get_tokenizers():
+    """(sent_tokenize, word_tokenize), resolved once per process on first use"""
+    global _tokenizers
+    if _tokenizers is None:
+        with _tokenizers_lock:
+            if _tokenizers is None:
+                if os.getenv('TOKENIZER', '').lower() == 'regex':
+                    loaded = None
+                else:
+                    loaded = _load_nltk()
+                _tokenizers = loaded or (regex_sent_tokenize, regex_word_tokenize)
+    return _tokenizers
+
+
+class AnalyzedText:
+    """A text tokenized once, shared by every Assessment scorer"""
+
+    def __init__(self, text):
+        sent_tokenize, word_tokenize = get_tokenizers()
+        self.text = text
+        self.sentences = tuple(sent_tokenize(text))
+        self.tokens = tuple(word_tokenize(text))
+        self.lower_tokens = tuple(token.lower() for token in self.tokens)
+        self.offsets = self._locate(text, self.tokens)
+
+    @staticmethod
+    def _locate(text, tokens):
+        """(start, end) of each token in the text; (-1, -1) if it can't be found"""
+        offsets = []
+        pos = 0
+        for token in tokens:
+            needle = _QUOTE_TOKENS.get(token, token)
+            start = text.find(needle, pos)
+            if start < 0:
+                offsets.append((-1, -1))
+                continue
+            pos = start + len(needle)
+            offsets.append((start, pos))
+        return tuple(offsets)
+
+    @property
+    def word_count(self):
+        return len(self.tokens)
+
+    @property
+    def sentence_count(self):
+        return len(self.sentences)
+
+
+@lru_cache(maxsize=256)
+def analyze_text(text):
+    """Tokenize a text once; repeated calls with the same content are free"""
+    return AnalyzedText(text)
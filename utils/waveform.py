@@ -0,0 +1,66 @@
+"""Downsampled waveform and pitch data for plotting a recording.
+
+A 10 s recording at 16 kHz is 160k samples, far more than a chart a few
+hundred pixels wide can show. The waveform is reduced to a min/max envelope
+per pixel bucket. That keeps every peak visible, which plain striding would
+drop. The pitch track is reduced to its median per bucket.
+"""
+import numpy as np
+
+# Points per trace; about one per horizontal pixel of a full-width chart
+DEFAULT_WIDTH = 800
+
+
+def _buckets(values, width, fill):
+    """(width, bucket) view of values, padding the tail with `fill`"""
+    bucket = -(-len(values) // width)  # ceil
+    padded = np.full(bucket * width, fill, dtype=np.float64)
+    padded[:len(values)] = values
+    return padded.reshape(width, bucket), bucket
+
+
+def minmax_envelope(samples, width=DEFAULT_WIDTH):
+    """Per-bucket minimum and maximum of a signal.
+
+    Returns (index, low, high), where `index` is each bucket's centre
+    sample. Signals already shorter than the budget come back unchanged.
+    """
+    samples = np.asarray(samples)
+    if len(samples) <= width:
+        index = np.arange(len(samples), dtype=np.float64)
+        return index, samples.astype(np.float64), samples.astype(np.float64)
+    # Pad with the last sample so the partial bucket doesn't pick up a fake 0
+    grid, bucket = _buckets(samples, width, samples[-1])
+    index = (np.arange(width) + 0.5) * bucket
+    return np.minimum(index, len(samples) - 1), grid.min(axis=1), grid.max(axis=1)
+
+
+def downsample_contour(values, width=DEFAULT_WIDTH):
+    """Median per bucket of a contour where 0 means unvoiced (NaN in the output, so lines break)"""
+    values = np.where(np.asarray(values, dtype=np.float64) > 0, values, np.nan)
+    if len(values) <= width:
+        return np.arange(len(values), dtype=np.float64), values
+    grid, bucket = _buckets(values, width, np.nan)
+    index = (np.arange(width) + 0.5) * bucket
+    voiced = ~np.isnan(grid).all(axis=1)
+    contour = np.full(width, np.nan)
+    contour[voiced] = np.nanmedian(grid[voiced], axis=1)
+    return np.minimum(index, len(values) - 1), contour
+
+
+def waveform_view(samples, sample_rate=16000, pitch_track=None, hop_seconds=None, width=DEFAULT_WIDTH):
+    """Plot-ready arrays for a recording: time axis, min/max envelope and pitch contour"""
+    index, low, high = minmax_envelope(samples, width)
+    view = {
+        "time": index / sample_rate,
+        "low": low / 32768.0,
+        "high": high / 32768.0,
+        "duration": len(samples) / sample_rate,
+        "pitch_time": np.zeros(0),
+        "pitch": np.zeros(0),
+    }
+    if pitch_track is not None and len(pitch_track) and hop_seconds:
+        frames, pitch = downsample_contour(pitch_track, width)
+        view["pitch_time"] = frames * hop_seconds
+        view["pitch"] = pitch
+    return view